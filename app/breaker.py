@@ -0,0 +1,134 @@
+import random
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+DEFAULT_FAILURE_THRESHOLD = 3
+DEFAULT_BASE_SEC = 5.0
+DEFAULT_MAX_SEC = 300.0
+DEFAULT_JITTER = 0.2
+DEFAULT_PROBE_SEC = 30.0
+
+
+class CircuitOpenError(Exception):
+    def __init__(self, name: str, retry_after: float) -> None:
+        super().__init__(f"circuit for {name} is open; retry in {retry_after:.1f}s")
+        self.name = name
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = DEFAULT_FAILURE_THRESHOLD,
+        base_sec: float = DEFAULT_BASE_SEC,
+        max_sec: float = DEFAULT_MAX_SEC,
+        jitter: float = DEFAULT_JITTER,
+        probe_sec: float = DEFAULT_PROBE_SEC,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.name = name
+        self.failure_threshold = max(failure_threshold, 1)
+        self.base_sec = base_sec
+        self.max_sec = max_sec
+        self.jitter = jitter
+        self.probe_sec = probe_sec
+        self._clock = clock
+        self.state = CLOSED
+        self.failures = 0
+        self.trips = 0
+        self.open_until = 0.0
+        self.probe_started = 0.0
+        self.opens = 0
+        self.rejected = 0
+        self.last_failure = ""
+
+    def allow(self) -> bool:
+        if self.state == CLOSED:
+            return True
+        now = self._clock()
+        if self.state == OPEN and now >= self.open_until:
+            self.state = HALF_OPEN
+            self.probe_started = 0.0
+        if self.state == HALF_OPEN and (not self.probe_started or now - self.probe_started >= self.probe_sec):
+            self.probe_started = now
+            return True
+        self.rejected += 1
+        return False
+
+    def check(self) -> None:
+        if not self.allow():
+            raise CircuitOpenError(self.name, self.retry_after())
+
+    def retry_after(self) -> float:
+        if self.state == CLOSED:
+            return 0.0
+        return max(self.open_until - self._clock(), 0.0)
+
+    def record_success(self) -> None:
+        self.state = CLOSED
+        self.failures = 0
+        self.trips = 0
+        self.probe_started = 0.0
+
+    def record_failure(self, reason: str = "", retry_after: Optional[float] = None) -> None:
+        self.failures += 1
+        self.last_failure = reason
+        if self.state == HALF_OPEN or self.failures >= self.failure_threshold or retry_after:
+            self._trip(retry_after)
+
+    def reset(self) -> None:
+        self.record_success()
+
+    def backoff(self) -> float:
+        delay = min(self.base_sec * (2 ** max(self.trips - 1, 0)), self.max_sec)
+        return delay * random.uniform(1 - self.jitter, 1 + self.jitter)
+
+    def _trip(self, retry_after: Optional[float]) -> None:
+        self.trips += 1
+        delay = self.backoff()
+        if retry_after:
+            delay = max(delay, min(retry_after, self.max_sec))
+        self.state = OPEN
+        self.open_until = self._clock() + delay
+        self.probe_started = 0.0
+        self.opens += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "state": self.state,
+            "failures": self.failures,
+            "retry_after_sec": round(self.retry_after(), 1),
+            "opens": self.opens,
+            "rejected": self.rejected,
+            "last_failure": self.last_failure,
+        }
+
+
+class BreakerRegistry:
+    def __init__(self, factory: Callable[[str], CircuitBreaker] = CircuitBreaker) -> None:
+        self._factory = factory
+        self._breakers: Dict[str, CircuitBreaker] = {}
+
+    def get(self, name: str) -> CircuitBreaker:
+        breaker = self._breakers.get(name)
+        if breaker is None:
+            breaker = self._factory(name)
+            self._breakers[name] = breaker
+        return breaker
+
+    def reset(self, name: Optional[str] = None) -> None:
+        for key, breaker in self._breakers.items():
+            if name is None or key == name:
+                breaker.reset()
+
+    def states(self) -> Dict[str, str]:
+        return {name: breaker.state for name, breaker in self._breakers.items()}
+
+    def snapshot(self) -> List[Dict[str, Any]]:
+        return [breaker.snapshot() for _, breaker in sorted(self._breakers.items())]
@@ -0,0 +1,111 @@
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+
+class _Entry:
+    __slots__ = ("value", "has_value", "fresh_until", "stale_until", "task")
+
+    def __init__(self) -> None:
+        self.value: Any = None
+        self.has_value = False
+        self.fresh_until = 0.0
+        self.stale_until = 0.0
+        self.task: Optional[asyncio.Task] = None
+
+
+class TTLCache:
+    def __init__(self, ttl_sec: float, stale_sec: float = 0.0, max_entries: int = 64) -> None:
+        self.ttl_sec = ttl_sec
+        self.stale_sec = stale_sec
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.loads = 0
+
+    def peek(self, key: str) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None or not entry.has_value:
+            return None
+        return entry.value
+
+    def defer(self, key: str, seconds: float) -> None:
+        entry = self._entries.get(key)
+        if entry is None:
+            entry = self._insert(key)
+        until = time.monotonic() + max(seconds, 0.0)
+        entry.fresh_until = max(entry.fresh_until, until)
+        entry.stale_until = max(entry.stale_until, until)
+
+    def invalidate(self, key: Optional[str] = None) -> None:
+        if key is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(key, None)
+
+    async def get(self, key: str, loader: Callable[[], Awaitable[Any]]) -> Any:
+        now = time.monotonic()
+        entry = self._entries.get(key)
+        if entry is not None and entry.has_value:
+            self._entries.move_to_end(key)
+            if now < entry.fresh_until:
+                self.hits += 1
+                return entry.value
+            if now < entry.stale_until:
+                self.stale_hits += 1
+                if entry.task is None:
+                    entry.task = self._spawn(entry, loader)
+                    entry.task.add_done_callback(_consume_exception)
+                return entry.value
+        if entry is None:
+            entry = self._insert(key)
+        if entry.task is None:
+            self.misses += 1
+            entry.task = self._spawn(entry, loader)
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(entry.task)
+
+    def stats(self) -> Dict[str, Any]:
+        served = self.hits + self.stale_hits + self.misses + self.coalesced
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "loads": self.loads,
+            "hit_ratio": round((self.hits + self.stale_hits + self.coalesced) / served, 4) if served else 0.0,
+        }
+
+    def _insert(self, key: str) -> _Entry:
+        entry = _Entry()
+        self._entries[key] = entry
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return entry
+
+    def _spawn(self, entry: _Entry, loader: Callable[[], Awaitable[Any]]) -> asyncio.Task:
+        return asyncio.create_task(self._load(entry, loader))
+
+    async def _load(self, entry: _Entry, loader: Callable[[], Awaitable[Any]]) -> Any:
+        self.loads += 1
+        try:
+            value = await loader()
+            now = time.monotonic()
+            entry.value = value
+            entry.has_value = True
+            entry.fresh_until = max(entry.fresh_until, now + self.ttl_sec)
+            entry.stale_until = max(entry.stale_until, entry.fresh_until + self.stale_sec)
+            return value
+        finally:
+            entry.task = None
+
+
+def _consume_exception(task: asyncio.Task) -> None:
+    if not task.cancelled():
+        task.exception()
@@ -0,0 +1,342 @@
+import bisect
+import calendar
+import functools
+import sys
+import threading
+from collections import OrderedDict
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
+
+MONTH_NAMES = {
+    "jan": 1,
+    "feb": 2,
+    "mar": 3,
+    "apr": 4,
+    "may": 5,
+    "jun": 6,
+    "jul": 7,
+    "aug": 8,
+    "sep": 9,
+    "oct": 10,
+    "nov": 11,
+    "dec": 12,
+}
+WEEKDAY_NAMES = {"sun": 0, "mon": 1, "tue": 2, "wed": 3, "thu": 4, "fri": 5, "sat": 6}
+CRON_FIELDS = ("minute", "hour", "day_of_month", "month", "day_of_week")
+MAX_SEARCH_DAYS = 366 * 5
+OCCURRENCE_CACHE_MAX_ENTRIES = 512
+OCCURRENCE_CACHE_MAX_BYTES = 32 * 1024 * 1024
+_DATETIME_BYTES = sys.getsizeof(datetime(2000, 1, 1, tzinfo=timezone.utc)) + 8
+
+
+def parse_field(
+    value: Any,
+    min_value: int,
+    max_value: int,
+    mapping: Optional[Dict[str, int]] = None,
+    normalize: Optional[Any] = None,
+    wrap: bool = False,
+) -> Tuple[bool, int]:
+    raw = "" if value is None else str(value).strip().lower()
+    if not raw or raw in {"*", "?"}:
+        mask = 0
+        for num in range(min_value, max_value + 1):
+            mask |= 1 << num
+        return True, mask
+    normalize_fn = normalize or (lambda num: num)
+    mapping = mapping or {}
+    mask = 0
+
+    def resolve_token(token: str) -> Optional[int]:
+        if not token:
+            return None
+        token = token.strip().lower()
+        if token in mapping:
+            return int(mapping[token])
+        if token == "*":
+            return None
+        try:
+            return int(token)
+        except ValueError:
+            return None
+
+    def add_value(num: int) -> None:
+        nonlocal mask
+        normalized = normalize_fn(num)
+        if not isinstance(normalized, int):
+            return
+        if normalized < min_value or normalized > max_value:
+            return
+        mask |= 1 << normalized
+
+    for part in [chunk.strip() for chunk in raw.split(",") if chunk.strip()]:
+        range_part, step_part = (part.split("/", 1) + [""])[:2]
+        step = 1
+        if step_part:
+            try:
+                step = int(step_part)
+            except ValueError:
+                continue
+            if step <= 0:
+                continue
+
+        if range_part == "*":
+            start = min_value
+            end = max_value
+        elif "-" in range_part:
+            start_token, end_token = (segment.strip() for segment in range_part.split("-", 1))
+            start_value = resolve_token(start_token)
+            end_value = resolve_token(end_token)
+            if start_value is None or end_value is None:
+                continue
+            start = start_value
+            end = end_value
+        else:
+            single = resolve_token(range_part)
+            if single is None:
+                continue
+            start = single
+            end = single
+
+        if start > end and wrap:
+            for num in range(start, max_value + 1, step):
+                add_value(num)
+            for num in range(min_value, end + 1, step):
+                add_value(num)
+            continue
+
+        for num in range(start, end + 1, step):
+            add_value(num)
+
+    return False, mask
+
+
+def _bits(mask: int) -> List[int]:
+    values: List[int] = []
+    while mask:
+        low = mask & -mask
+        values.append(low.bit_length() - 1)
+        mask ^= low
+    return values
+
+
+class CronExpression:
+    __slots__ = (
+        "expression",
+        "minutes",
+        "hours",
+        "days",
+        "months",
+        "weekdays",
+        "days_any",
+        "weekdays_any",
+        "times",
+        "_weekday_masks",
+        "_month_masks",
+    )
+
+    def __init__(self, expression: str) -> None:
+        fields = (expression.split() + ["*"] * 5)[:5]
+        self.expression = " ".join(fields)
+        _, self.minutes = parse_field(fields[0], 0, 59)
+        _, self.hours = parse_field(fields[1], 0, 23)
+        self.days_any, self.days = parse_field(fields[2], 1, 31)
+        _, self.months = parse_field(fields[3], 1, 12, mapping=MONTH_NAMES)
+        self.weekdays_any, self.weekdays = parse_field(
+            fields[4],
+            0,
+            6,
+            mapping=WEEKDAY_NAMES,
+            normalize=lambda value: 0 if value == 7 else value,
+            wrap=True,
+        )
+        self.times = tuple(hour * 60 + minute for hour in _bits(self.hours) for minute in _bits(self.minutes))
+        self._weekday_masks = tuple(self._weekday_mask(first) for first in range(7))
+        self._month_masks: Dict[Tuple[int, int], int] = {}
+
+    def __repr__(self) -> str:
+        return f"CronExpression({self.expression!r})"
+
+    def _weekday_mask(self, first_weekday: int) -> int:
+        mask = 0
+        for day in range(1, 32):
+            if self.weekdays >> ((first_weekday + day - 1) % 7) & 1:
+                mask |= 1 << day
+        return mask
+
+    def month_mask(self, year: int, month: int) -> int:
+        key = (year, month)
+        cached = self._month_masks.get(key)
+        if cached is not None:
+            return cached
+        mask = 0
+        if self.times and self.months >> month & 1:
+            first_weekday, last_day = calendar.monthrange(year, month)
+            weekday_mask = self._weekday_masks[(first_weekday + 1) % 7]
+            if self.days_any and self.weekdays_any:
+                mask = self.days
+            elif self.days_any:
+                mask = weekday_mask
+            elif self.weekdays_any:
+                mask = self.days
+            else:
+                mask = self.days | weekday_mask
+            mask &= (1 << (last_day + 1)) - 2
+        if len(self._month_masks) >= 240:
+            self._month_masks.clear()
+        self._month_masks[key] = mask
+        return mask
+
+    def matches_day(self, value: date) -> bool:
+        return bool(self.month_mask(value.year, value.month) >> value.day & 1)
+
+    def iter_between(self, start: datetime, end: datetime) -> Iterator[datetime]:
+        if not self.times or start >= end:
+            return
+        first = start.astimezone(timezone.utc)
+        last = end.astimezone(timezone.utc)
+        year, month = first.year, first.month
+        while (year, month) <= (last.year, last.month):
+            mask = self.month_mask(year, month)
+            while mask:
+                low = mask & -mask
+                day = low.bit_length() - 1
+                mask ^= low
+                for minute_of_day in self.times:
+                    occurrence = datetime(year, month, day, minute_of_day // 60, minute_of_day % 60, tzinfo=timezone.utc)
+                    if occurrence < start:
+                        continue
+                    if occurrence >= end:
+                        return
+                    yield occurrence
+            month += 1
+            if month > 12:
+                year += 1
+                month = 1
+
+    def iter_after(self, value: datetime, horizon_days: int = MAX_SEARCH_DAYS) -> Iterator[datetime]:
+        candidate = value.astimezone(timezone.utc).replace(second=0, microsecond=0) + timedelta(minutes=1)
+        return self.iter_between(candidate, candidate + timedelta(days=horizon_days))
+
+    def next_after(self, value: datetime) -> Optional[datetime]:
+        return next(self.iter_after(value), None)
+
+
+@functools.lru_cache(maxsize=512)
+def compile_cron(expression: str) -> CronExpression:
+    return CronExpression(expression)
+
+
+def cron_expression(cron: Dict[str, Any]) -> str:
+    parts = []
+    for key in CRON_FIELDS:
+        value = cron.get(key)
+        parts.append("*" if value is None or str(value).strip() == "" else str(value).strip().replace(" ", ""))
+    return " ".join(parts)
+
+
+class OccurrenceCache:
+    def __init__(
+        self,
+        max_entries: int = OCCURRENCE_CACHE_MAX_ENTRIES,
+        max_bytes: int = OCCURRENCE_CACHE_MAX_BYTES,
+    ) -> None:
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[Tuple[str, datetime, datetime], Tuple[datetime, ...]]" = OrderedDict()
+        self._by_expression: Dict[str, Set[Tuple[str, datetime, datetime]]] = {}
+        self._lock = threading.Lock()
+        self.bytes = 0
+        self.hits = 0
+        self.partial_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, expression: str, start: datetime, end: datetime) -> Tuple[datetime, ...]:
+        key = (expression, start, end)
+        with self._lock:
+            cached = self._entries.get(key)
+            if cached is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return cached
+            base = self._find_overlap(expression, start, end)
+        compiled = compile_cron(expression)
+        if base is None:
+            occurrences = tuple(compiled.iter_between(start, end))
+        else:
+            (_, base_start, base_end), base_values = base
+            head = tuple(compiled.iter_between(start, base_start)) if start < base_start else ()
+            middle = base_values[bisect.bisect_left(base_values, start) : bisect.bisect_left(base_values, end)]
+            tail = tuple(compiled.iter_between(base_end, end)) if end > base_end else ()
+            occurrences = head + middle + tail
+        with self._lock:
+            if base is None:
+                self.misses += 1
+            else:
+                self.partial_hits += 1
+            self._store(key, occurrences)
+        return occurrences
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._by_expression.clear()
+            self.bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.partial_hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self.bytes,
+                "hits": self.hits,
+                "partial_hits": self.partial_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_ratio": round((self.hits + self.partial_hits) / lookups, 4) if lookups else 0.0,
+            }
+
+    def _find_overlap(
+        self, expression: str, start: datetime, end: datetime
+    ) -> Optional[Tuple[Tuple[str, datetime, datetime], Tuple[datetime, ...]]]:
+        best = None
+        best_overlap = timedelta(0)
+        for key in self._by_expression.get(expression, ()):
+            overlap = min(end, key[2]) - max(start, key[1])
+            if overlap > best_overlap:
+                best = key
+                best_overlap = overlap
+        if best is None:
+            return None
+        return best, self._entries[best]
+
+    def _store(self, key: Tuple[str, datetime, datetime], occurrences: Tuple[datetime, ...]) -> None:
+        size = _entry_bytes(occurrences)
+        if size > self.max_bytes:
+            return
+        if key in self._entries:
+            self._discard(key)
+        self._entries[key] = occurrences
+        self._by_expression.setdefault(key[0], set()).add(key)
+        self.bytes += size
+        while len(self._entries) > self.max_entries or self.bytes > self.max_bytes:
+            oldest = next(iter(self._entries))
+            self._discard(oldest)
+            self.evictions += 1
+
+    def _discard(self, key: Tuple[str, datetime, datetime]) -> None:
+        occurrences = self._entries.pop(key)
+        self.bytes -= _entry_bytes(occurrences)
+        keys = self._by_expression.get(key[0])
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._by_expression[key[0]]
+
+
+def _entry_bytes(occurrences: Tuple[datetime, ...]) -> int:
+    return sys.getsizeof(occurrences) + len(occurrences) * _DATETIME_BYTES
+
+
+occurrence_cache = OccurrenceCache()
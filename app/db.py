@@ -1,11 +1,36 @@
+import asyncio
+import functools
 import json
 import os
+import secrets
 import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from datetime import datetime
-from typing import Any, Dict, Iterable, List, Optional
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, TypeVar
+from . import metrics, tracing
 
 DB_ENV = "UPTIME_ATLAS_DB"
 DEFAULT_DB_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "uptime_atlas.db")
+DB_BUSY_TIMEOUT_MS = 5000
+DB_CACHE_SIZE_KIB = 16 * 1024
+DB_MMAP_SIZE_BYTES = 128 * 1024 * 1024
+DB_EXECUTOR_WORKERS = 4
+OAUTH_ALLOWLIST_FIELDS = {"google": "google_emails", "discord": "discord_ids", "steam": "steam_ids"}
+KUMA_HISTORY_RETENTION_SEC = {60: 2 * 86400, 3600: 90 * 86400, 86400: 3 * 365 * 86400}
+KUMA_STATUS_UP = 1
+KUMA_STATUS_DOWN = 0
+
+T = TypeVar("T")
+
+_local = threading.local()
+_pool_lock = threading.Lock()
+_pool: List[sqlite3.Connection] = []
+_pool_generation = 0
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
 
 
 def _utc_now() -> str:
@@ -19,22 +44,117 @@ def get_db_path() -> str:
 def connect() -> sqlite3.Connection:
     path = get_db_path()
     os.makedirs(os.path.dirname(path), exist_ok=True)
-    conn = sqlite3.connect(path)
+    conn = sqlite3.connect(path, isolation_level=None, check_same_thread=False)
     conn.row_factory = sqlite3.Row
+    conn.execute(f"PRAGMA busy_timeout = {DB_BUSY_TIMEOUT_MS}")
+    conn.execute("PRAGMA journal_mode = WAL")
+    conn.execute("PRAGMA synchronous = NORMAL")
+    conn.execute(f"PRAGMA cache_size = -{DB_CACHE_SIZE_KIB}")
+    conn.execute(f"PRAGMA mmap_size = {DB_MMAP_SIZE_BYTES}")
+    conn.execute("PRAGMA temp_store = MEMORY")
     return conn
 
 
-def _ensure_column(conn: sqlite3.Connection, table: str, column: str, ddl: str) -> None:
-    cur = conn.cursor()
+def get_connection() -> sqlite3.Connection:
+    path = get_db_path()
+    conn = getattr(_local, "conn", None)
+    if conn is not None and _local.path == path and _local.generation == _pool_generation:
+        return conn
+    conn = connect()
+    with _pool_lock:
+        _pool.append(conn)
+        _local.generation = _pool_generation
+    _local.conn = conn
+    _local.path = path
+    return conn
+
+
+def close_connections() -> None:
+    global _pool_generation
+    with _pool_lock:
+        connections = list(_pool)
+        _pool.clear()
+        _pool_generation += 1
+    for conn in connections:
+        try:
+            conn.close()
+        except sqlite3.Error:
+            continue
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=DB_EXECUTOR_WORKERS, thread_name_prefix="uptime-atlas-db")
+        return _executor
+
+
+async def run(operation: str, func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    loop = asyncio.get_running_loop()
+    call = functools.partial(_timed_call, time.perf_counter(), operation, func, args, kwargs)
+    with tracing.span("db", operation):
+        return await loop.run_in_executor(_get_executor(), call)
+
+
+def _timed_call(
+    submitted: float, operation: str, func: Callable[..., T], args: tuple, kwargs: Dict[str, Any]
+) -> T:
+    started = time.perf_counter()
+    metrics.DB_QUEUE_SECONDS.observe(started - submitted)
+    try:
+        return func(*args, **kwargs)
+    except BaseException:
+        metrics.DB_ERRORS.inc(operation=operation)
+        raise
+    finally:
+        metrics.DB_CALL_SECONDS.observe(time.perf_counter() - started, operation=operation)
+
+
+def shutdown_executor() -> None:
+    global _executor
+    with _executor_lock:
+        executor = _executor
+        _executor = None
+    if executor is not None:
+        executor.shutdown(wait=True)
+
+
+@contextmanager
+def cursor() -> Iterator[sqlite3.Cursor]:
+    cur = get_connection().cursor()
+    try:
+        yield cur
+    finally:
+        cur.close()
+
+
+@contextmanager
+def transaction() -> Iterator[sqlite3.Cursor]:
+    conn = get_connection()
+    if conn.in_transaction:
+        with cursor() as cur:
+            yield cur
+        return
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        with cursor() as cur:
+            yield cur
+    except BaseException:
+        conn.rollback()
+        raise
+    conn.commit()
+
+
+def _ensure_column(cur: sqlite3.Cursor, table: str, column: str, ddl: str) -> None:
     cur.execute(f"PRAGMA table_info({table})")
     columns = {row["name"] for row in cur.fetchall()}
     if column not in columns:
         cur.execute(f"ALTER TABLE {table} ADD COLUMN {ddl}")
 
 
-def _get_or_create_game_id(conn: sqlite3.Connection, name: str) -> int:
+def _get_or_create_game_id(cur: sqlite3.Cursor, name: str) -> int:
     game_name = (name or "").strip() or "General"
-    cur = conn.cursor()
     cur.execute(
         """
         INSERT OR IGNORE INTO games (name, created_at)
@@ -48,178 +168,250 @@ def _get_or_create_game_id(conn: sqlite3.Connection, name: str) -> int:
 
 
 def init_db() -> None:
-    conn = connect()
-    cur = conn.cursor()
-    cur.execute(
-        """
-        CREATE TABLE IF NOT EXISTS users (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            username TEXT NOT NULL UNIQUE,
-            password_hash TEXT NOT NULL,
-            created_at TEXT NOT NULL
+    with transaction() as cur:
+        cur.execute(
+            """
+            CREATE TABLE IF NOT EXISTS users (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                username TEXT NOT NULL UNIQUE,
+                password_hash TEXT NOT NULL,
+                created_at TEXT NOT NULL
+            )
+            """
         )
-        """
-    )
-    cur.execute(
-        """
-        CREATE TABLE IF NOT EXISTS settings (
-            key TEXT PRIMARY KEY,
-            value TEXT NOT NULL,
-            updated_at TEXT NOT NULL
+        cur.execute(
+            """
+            CREATE TABLE IF NOT EXISTS settings (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                updated_at TEXT NOT NULL
+            )
+            """
         )
-        """
-    )
-    cur.execute(
-        """
-        CREATE TABLE IF NOT EXISTS games (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            name TEXT NOT NULL UNIQUE,
-            created_at TEXT NOT NULL
+        cur.execute(
+            """
+            CREATE TABLE IF NOT EXISTS cache_versions (
+                name TEXT PRIMARY KEY,
+                version INTEGER NOT NULL
+            )
+            """
         )
-        """
-    )
-    cur.execute(
-        """
-        CREATE TABLE IF NOT EXISTS widgets (
-            widget_key TEXT PRIMARY KEY,
-            enabled INTEGER NOT NULL,
-            x INTEGER NOT NULL,
-            y INTEGER NOT NULL,
-            w INTEGER NOT NULL,
-            h INTEGER NOT NULL,
-            config_json TEXT NOT NULL,
-            updated_at TEXT NOT NULL
+        cur.execute(
+            "INSERT OR IGNORE INTO cache_versions (name, version) VALUES ('epoch', ?)",
+            (secrets.randbits(31),),
         )
-        """
-    )
-    cur.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='calendar_events'")
-    has_events = cur.fetchone() is not None
-    if has_events:
-        cur.execute("PRAGMA table_info(calendar_events)")
-        columns = [row["name"] for row in cur.fetchall()]
-        needs_migration = any(column not in columns for column in ("id", "game_id", "event_name", "is_deleted"))
-        if needs_migration:
-            cur.execute("ALTER TABLE calendar_events RENAME TO calendar_events_old")
-            cur.execute(
-                """
-                CREATE TABLE calendar_events (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    schedule_id TEXT NOT NULL,
-                    game_id INTEGER NOT NULL,
-                    event_name TEXT NOT NULL,
-                    start_utc TEXT NOT NULL,
-                    stop_utc TEXT,
-                    description TEXT,
-                    created_by TEXT,
-                    is_deleted INTEGER NOT NULL DEFAULT 0
-                )
-                """
+        cur.execute(
+            """
+            CREATE TABLE IF NOT EXISTS games (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                name TEXT NOT NULL UNIQUE,
+                created_at TEXT NOT NULL
             )
-            cur.execute(
-                "CREATE UNIQUE INDEX IF NOT EXISTS idx_calendar_events_schedule_start ON calendar_events (schedule_id, start_utc)"
+            """
+        )
+        cur.execute(
+            """
+            CREATE TABLE IF NOT EXISTS widgets (
+                widget_key TEXT PRIMARY KEY,
+                enabled INTEGER NOT NULL,
+                x INTEGER NOT NULL,
+                y INTEGER NOT NULL,
+                w INTEGER NOT NULL,
+                h INTEGER NOT NULL,
+                config_json TEXT NOT NULL,
+                updated_at TEXT NOT NULL
             )
-            default_game_id = _get_or_create_game_id(conn, "Imported")
-            cur.execute(
-                """
-                INSERT INTO calendar_events (
-                    schedule_id,
-                    game_id,
-                    event_name,
-                    start_utc,
-                    stop_utc,
-                    description,
-                    created_by,
-                    is_deleted
+            """
+        )
+        cur.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='calendar_events'")
+        has_events = cur.fetchone() is not None
+        if has_events:
+            cur.execute("PRAGMA table_info(calendar_events)")
+            columns = [row["name"] for row in cur.fetchall()]
+            needs_migration = any(column not in columns for column in ("id", "game_id", "event_name", "is_deleted"))
+            if needs_migration:
+                cur.execute("ALTER TABLE calendar_events RENAME TO calendar_events_old")
+                cur.execute(
+                    """
+                    CREATE TABLE calendar_events (
+                        id INTEGER PRIMARY KEY AUTOINCREMENT,
+                        schedule_id TEXT NOT NULL,
+                        game_id INTEGER NOT NULL,
+                        event_name TEXT NOT NULL,
+                        start_utc TEXT NOT NULL,
+                        stop_utc TEXT,
+                        description TEXT,
+                        created_by TEXT,
+                        is_deleted INTEGER NOT NULL DEFAULT 0
+                    )
+                    """
                 )
-                SELECT
-                    schedule_id,
-                    ?,
-                    COALESCE(schedule_id, 'Legacy Event'),
-                    start_utc,
-                    stop_utc,
-                    description,
-                    created_by,
-                    0
-                FROM calendar_events_old
-                """,
-                (default_game_id,),
+                cur.execute(
+                    "CREATE UNIQUE INDEX IF NOT EXISTS idx_calendar_events_schedule_start ON calendar_events (schedule_id, start_utc)"
+                )
+                default_game_id = _get_or_create_game_id(cur, "Imported")
+                cur.execute(
+                    """
+                    INSERT INTO calendar_events (
+                        schedule_id,
+                        game_id,
+                        event_name,
+                        start_utc,
+                        stop_utc,
+                        description,
+                        created_by,
+                        is_deleted
+                    )
+                    SELECT
+                        schedule_id,
+                        ?,
+                        COALESCE(schedule_id, 'Legacy Event'),
+                        start_utc,
+                        stop_utc,
+                        description,
+                        created_by,
+                        0
+                    FROM calendar_events_old
+                    """,
+                    (default_game_id,),
+                )
+                cur.execute("DROP TABLE calendar_events_old")
+        cur.execute(
+            """
+            CREATE TABLE IF NOT EXISTS calendar_events (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                schedule_id TEXT NOT NULL,
+                game_id INTEGER NOT NULL,
+                event_name TEXT NOT NULL,
+                start_utc TEXT NOT NULL,
+                stop_utc TEXT,
+                description TEXT,
+                created_by TEXT,
+                is_deleted INTEGER NOT NULL DEFAULT 0
             )
-            cur.execute("DROP TABLE calendar_events_old")
-    cur.execute(
-        """
-        CREATE TABLE IF NOT EXISTS calendar_events (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            schedule_id TEXT NOT NULL,
-            game_id INTEGER NOT NULL,
-            event_name TEXT NOT NULL,
-            start_utc TEXT NOT NULL,
-            stop_utc TEXT,
-            description TEXT,
-            created_by TEXT,
-            is_deleted INTEGER NOT NULL DEFAULT 0
+            """
         )
-        """
-    )
-    cur.execute(
-        "CREATE UNIQUE INDEX IF NOT EXISTS idx_calendar_events_schedule_start ON calendar_events (schedule_id, start_utc)"
-    )
-    cur.execute("DROP TABLE IF EXISTS schedule_meta")
-    cur.execute("DROP TABLE IF EXISTS schedule_exclusions")
-    cur.execute("DROP TABLE IF EXISTS source_exclusions")
-    cur.execute("DROP TABLE IF EXISTS schedule_cache")
-    cur.execute("DROP TABLE IF EXISTS local_schedules")
-    conn.commit()
-    _ensure_column(conn, "users", "role", "role TEXT NOT NULL DEFAULT 'admin'")
-    _ensure_column(conn, "users", "timezone", "timezone TEXT NOT NULL DEFAULT 'America/New_York'")
-    conn.close()
-
-
-def get_setting(key: str) -> Optional[Any]:
-    conn = connect()
-    cur = conn.cursor()
-    cur.execute("SELECT value FROM settings WHERE key = ?", (key,))
+        cur.execute(
+            "CREATE UNIQUE INDEX IF NOT EXISTS idx_calendar_events_schedule_start ON calendar_events (schedule_id, start_utc)"
+        )
+        cur.execute(
+            "CREATE INDEX IF NOT EXISTS idx_calendar_events_active_start ON calendar_events (is_deleted, start_utc)"
+        )
+        cur.execute("CREATE INDEX IF NOT EXISTS idx_calendar_events_start ON calendar_events (start_utc)")
+        cur.execute(
+            "CREATE INDEX IF NOT EXISTS idx_calendar_events_game ON calendar_events (game_id, is_deleted, schedule_id)"
+        )
+        cur.execute(
+            """
+            CREATE TABLE IF NOT EXISTS pelican_schedule_state (
+                schedule_id TEXT PRIMARY KEY,
+                fingerprint TEXT NOT NULL,
+                synced_at TEXT NOT NULL
+            )
+            """
+        )
+        cur.execute(
+            """
+            CREATE TABLE IF NOT EXISTS oauth_allowlist (
+                provider TEXT NOT NULL,
+                claim TEXT NOT NULL,
+                created_at TEXT NOT NULL,
+                PRIMARY KEY (provider, claim)
+            ) WITHOUT ROWID
+            """
+        )
+        cur.execute(
+            """
+            CREATE TABLE IF NOT EXISTS kuma_monitors (
+                id INTEGER PRIMARY KEY,
+                name TEXT NOT NULL UNIQUE
+            )
+            """
+        )
+        cur.execute(
+            """
+            CREATE TABLE IF NOT EXISTS kuma_history (
+                resolution INTEGER NOT NULL,
+                bucket INTEGER NOT NULL,
+                monitor_id INTEGER NOT NULL,
+                samples INTEGER NOT NULL,
+                up INTEGER NOT NULL,
+                down INTEGER NOT NULL,
+                response_sum INTEGER NOT NULL,
+                response_samples INTEGER NOT NULL,
+                response_max INTEGER,
+                PRIMARY KEY (resolution, bucket, monitor_id)
+            ) WITHOUT ROWID
+            """
+        )
+        _migrate_oauth_allowlist_setting(cur)
+        cur.execute("DROP TABLE IF EXISTS schedule_meta")
+        cur.execute("DROP TABLE IF EXISTS schedule_exclusions")
+        cur.execute("DROP TABLE IF EXISTS source_exclusions")
+        cur.execute("DROP TABLE IF EXISTS schedule_cache")
+        cur.execute("DROP TABLE IF EXISTS local_schedules")
+        _ensure_column(cur, "users", "role", "role TEXT NOT NULL DEFAULT 'admin'")
+        _ensure_column(cur, "users", "timezone", "timezone TEXT NOT NULL DEFAULT 'America/New_York'")
+    _settings.invalidate()
+    _oauth_allowlist.invalidate()
+
+
+def _migrate_oauth_allowlist_setting(cur: sqlite3.Cursor) -> None:
+    cur.execute("SELECT value FROM settings WHERE key = 'oauth_allowlist'")
     row = cur.fetchone()
-    conn.close()
     if not row:
-        return None
+        return
     try:
-        return json.loads(row["value"])
+        legacy = json.loads(row["value"])
     except json.JSONDecodeError:
-        return row["value"]
+        legacy = {}
+    if isinstance(legacy, dict):
+        now = _utc_now()
+        cur.executemany(
+            "INSERT OR IGNORE INTO oauth_allowlist (provider, claim, created_at) VALUES (?, ?, ?)",
+            [
+                (provider, claim, now)
+                for provider, field in OAUTH_ALLOWLIST_FIELDS.items()
+                for claim in split_allowlist(legacy.get(field))
+            ],
+        )
+    cur.execute("DELETE FROM settings WHERE key = 'oauth_allowlist'")
+    _bump_cache_version(cur, "settings")
+    _bump_cache_version(cur, "oauth_allowlist")
+
+
+def get_setting(key: str) -> Optional[Any]:
+    return _copy_setting(_settings.get().get(key))
 
 
 def get_game_by_id(game_id: int) -> Optional[Dict[str, Any]]:
     if not game_id:
         return None
-    conn = connect()
-    cur = conn.cursor()
-    cur.execute("SELECT id, name FROM games WHERE id = ?", (int(game_id),))
-    row = cur.fetchone()
-    conn.close()
+    with cursor() as cur:
+        cur.execute("SELECT id, name FROM games WHERE id = ?", (int(game_id),))
+        row = cur.fetchone()
     if not row:
         return None
     return {"id": row["id"], "name": row["name"]}
 
 
 def list_games_with_stats() -> List[Dict[str, Any]]:
-    conn = connect()
-    cur = conn.cursor()
-    cur.execute(
-        """
-        SELECT
-            games.id AS id,
-            games.name AS name,
-            COALESCE(SUM(CASE WHEN calendar_events.is_deleted = 0 THEN 1 ELSE 0 END), 0) AS active_count,
-            COALESCE(SUM(CASE WHEN calendar_events.is_deleted = 1 THEN 1 ELSE 0 END), 0) AS deleted_count,
-            COALESCE(SUM(CASE WHEN calendar_events.schedule_id NOT LIKE 'local_%' THEN 1 ELSE 0 END), 0) AS pelican_count
-        FROM games
-        LEFT JOIN calendar_events ON calendar_events.game_id = games.id
-        GROUP BY games.id
-        ORDER BY games.name
-        """
-    )
-    rows = cur.fetchall()
-    conn.close()
+    with cursor() as cur:
+        cur.execute(
+            """
+            SELECT
+                games.id AS id,
+                games.name AS name,
+                COALESCE(SUM(CASE WHEN calendar_events.is_deleted = 0 THEN 1 ELSE 0 END), 0) AS active_count,
+                COALESCE(SUM(CASE WHEN calendar_events.is_deleted = 1 THEN 1 ELSE 0 END), 0) AS deleted_count,
+                COALESCE(SUM(CASE WHEN calendar_events.schedule_id NOT LIKE 'local_%' THEN 1 ELSE 0 END), 0) AS pelican_count
+            FROM games
+            LEFT JOIN calendar_events ON calendar_events.game_id = games.id
+            GROUP BY games.id
+            ORDER BY games.name
+            """
+        )
+        rows = cur.fetchall()
     return [
         {
             "id": row["id"],
@@ -233,71 +425,200 @@ def list_games_with_stats() -> List[Dict[str, Any]]:
 
 
 def get_settings(keys: Iterable[str]) -> Dict[str, Optional[Any]]:
-    key_list = list(keys)
-    if not key_list:
-        return {}
-    conn = connect()
-    cur = conn.cursor()
-    placeholders = ",".join("?" for _ in key_list)
-    cur.execute(f"SELECT key, value FROM settings WHERE key IN ({placeholders})", key_list)
-    rows = cur.fetchall()
-    conn.close()
-    result: Dict[str, Any] = {}
-    for row in rows:
-        try:
-            result[row["key"]] = json.loads(row["value"])
-        except json.JSONDecodeError:
-            result[row["key"]] = row["value"]
-    for key in key_list:
-        result.setdefault(key, None)
-    return result
+    snapshot = _settings.get()
+    return {key: _copy_setting(snapshot.get(key)) for key in keys}
 
 
 def set_setting(key: str, value: Any) -> None:
-    conn = connect()
-    cur = conn.cursor()
+    with _settings.write() as cur:
+        cur.execute(
+            """
+            INSERT INTO settings (key, value, updated_at)
+            VALUES (?, ?, ?)
+            ON CONFLICT(key) DO UPDATE SET value = excluded.value, updated_at = excluded.updated_at
+            """,
+            (key, json.dumps(value), _utc_now()),
+        )
+
+
+def get_all_settings() -> Dict[str, Any]:
+    return {key: _copy_setting(value) for key, value in _settings.get().items()}
+
+
+def get_all_settings_with_defaults(defaults: Dict[str, Any]) -> Dict[str, Any]:
+    merged = _settings.derive("with_defaults", _merge_setting_defaults, defaults)
+    return {key: _copy_setting(value) for key, value in merged.items()}
+
+
+def _merge_setting_defaults(settings: Dict[str, Any], defaults: Dict[str, Any]) -> Dict[str, Any]:
+    merged = dict(settings)
+    for key, value in defaults.items():
+        if key not in merged:
+            merged[key] = value
+        elif isinstance(value, dict) and isinstance(merged[key], dict):
+            merged[key] = {**value, **merged[key]}
+    return merged
+
+
+def _copy_setting(value: Any) -> Any:
+    if isinstance(value, dict):
+        return value.copy()
+    if isinstance(value, list):
+        return list(value)
+    return value
+
+
+def _bump_cache_version(cur: sqlite3.Cursor, name: str) -> None:
     cur.execute(
         """
-        INSERT INTO settings (key, value, updated_at)
-        VALUES (?, ?, ?)
-        ON CONFLICT(key) DO UPDATE SET value = excluded.value, updated_at = excluded.updated_at
+        INSERT INTO cache_versions (name, version) VALUES (?, 1)
+        ON CONFLICT(name) DO UPDATE SET version = version + 1
         """,
-        (key, json.dumps(value), _utc_now()),
+        (name,),
     )
-    conn.commit()
-    conn.close()
 
 
-def get_all_settings() -> Dict[str, Any]:
-    conn = connect()
-    cur = conn.cursor()
+def get_cache_versions(names: Iterable[str]) -> Dict[str, int]:
+    name_list = list(names)
+    with cursor() as cur:
+        cur.execute(
+            "SELECT name, version FROM cache_versions WHERE name IN (SELECT value FROM json_each(?))",
+            (json.dumps(name_list),),
+        )
+        versions = {row["name"]: int(row["version"]) for row in cur.fetchall()}
+    return {name: versions.get(name, 0) for name in name_list}
+
+
+def _cache_version(cur: sqlite3.Cursor, name: str) -> int:
+    cur.execute("SELECT version FROM cache_versions WHERE name = ?", (name,))
+    row = cur.fetchone()
+    return int(row["version"]) if row else 0
+
+
+class _VersionedSnapshot:
+    def __init__(self, name: str, loader: Callable[[sqlite3.Cursor], Any]) -> None:
+        self.name = name
+        self._loader = loader
+        self._lock = threading.Lock()
+        self._generation = 0
+        self._snapshot: Optional[Tuple[int, int, Any]] = None
+        self._derived: Dict[str, Tuple[Tuple[Any, ...], Any]] = {}
+        self.hits = 0
+        self.loads = 0
+
+    def get(self) -> Any:
+        conn = get_connection()
+        data_version = conn.execute("PRAGMA data_version").fetchone()[0]
+        seen = (conn, data_version)
+        with self._lock:
+            snapshot = self._snapshot
+            generation = self._generation
+        if snapshot is not None and snapshot[1] == generation:
+            if self._seen() == seen:
+                self._count_hit()
+                return snapshot[2]
+            with cursor() as cur:
+                version = _cache_version(cur, self.name)
+            if version == snapshot[0]:
+                self._mark_seen(seen)
+                self._count_hit()
+                return snapshot[2]
+        return self._load(conn, seen, generation)
+
+    def derive(self, name: str, build: Callable[..., Any], *inputs: Any) -> Any:
+        sources = (self.get(), *inputs)
+        with self._lock:
+            cached = self._derived.get(name)
+        if cached is not None and all(old is new for old, new in zip(cached[0], sources)):
+            return cached[1]
+        result = build(*sources)
+        with self._lock:
+            self._derived[name] = (sources, result)
+        return result
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._generation += 1
+
+    @contextmanager
+    def write(self) -> Iterator[sqlite3.Cursor]:
+        try:
+            with transaction() as cur:
+                yield cur
+                _bump_cache_version(cur, self.name)
+        finally:
+            self.invalidate()
+
+    def _seen(self) -> Optional[Tuple[sqlite3.Connection, int]]:
+        return getattr(_local, "snapshot_seen", {}).get(self.name)
+
+    def _mark_seen(self, seen: Tuple[sqlite3.Connection, int]) -> None:
+        if not hasattr(_local, "snapshot_seen"):
+            _local.snapshot_seen = {}
+        _local.snapshot_seen[self.name] = seen
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            hits, loads = self.hits, self.loads
+        lookups = hits + loads
+        return {
+            "hits": hits,
+            "loads": loads,
+            "hit_ratio": round(hits / lookups, 4) if lookups else 0.0,
+        }
+
+    def _count_hit(self) -> None:
+        with self._lock:
+            self.hits += 1
+
+    def _load(self, conn: sqlite3.Connection, seen: Tuple[sqlite3.Connection, int], generation: int) -> Any:
+        with self._lock:
+            self.loads += 1
+        own_transaction = not conn.in_transaction
+        if own_transaction:
+            conn.execute("BEGIN")
+        try:
+            with cursor() as cur:
+                version = _cache_version(cur, self.name)
+                value = self._loader(cur)
+        finally:
+            if own_transaction:
+                conn.commit()
+        with self._lock:
+            current = self._snapshot
+            if self._generation == generation and (
+                current is None or current[1] != generation or current[0] <= version
+            ):
+                self._snapshot = (version, generation, value)
+                self._mark_seen(seen)
+        return value
+
+
+def _read_settings(cur: sqlite3.Cursor) -> Dict[str, Any]:
     cur.execute("SELECT key, value FROM settings")
-    rows = cur.fetchall()
-    conn.close()
-    result: Dict[str, Any] = {}
-    for row in rows:
+    settings: Dict[str, Any] = {}
+    for row in cur.fetchall():
         try:
-            result[row["key"]] = json.loads(row["value"])
+            settings[row["key"]] = json.loads(row["value"])
         except json.JSONDecodeError:
-            result[row["key"]] = row["value"]
-    return result
+            settings[row["key"]] = row["value"]
+    return settings
+
+
+_settings = _VersionedSnapshot("settings", _read_settings)
 
 
 def has_users() -> bool:
-    conn = connect()
-    cur = conn.cursor()
-    cur.execute("SELECT 1 FROM users LIMIT 1")
-    row = cur.fetchone()
-    conn.close()
+    with cursor() as cur:
+        cur.execute("SELECT 1 FROM users LIMIT 1")
+        row = cur.fetchone()
     return row is not None
 
 
 def get_user_by_username(username: str) -> Optional[Dict[str, Any]]:
-    conn = connect()
-    cur = conn.cursor()
-    cur.execute("SELECT * FROM users WHERE username = ?", (username,))
-    row = cur.fetchone()
-    conn.close()
+    with cursor() as cur:
+        cur.execute("SELECT * FROM users WHERE username = ?", (username,))
+        row = cur.fetchone()
     if not row:
         return None
     return {
@@ -309,56 +630,43 @@ def get_user_by_username(username: str) -> Optional[Dict[str, Any]]:
     }
 
 def create_user(username: str, password_hash: str, role: str = "admin", timezone: str = "America/New_York") -> None:
-    conn = connect()
-    cur = conn.cursor()
-    cur.execute(
-        "INSERT INTO users (username, password_hash, role, timezone, created_at) VALUES (?, ?, ?, ?, ?)",
-        (username, password_hash, role, timezone, _utc_now()),
-    )
-    conn.commit()
-    conn.close()
+    with transaction() as cur:
+        cur.execute(
+            "INSERT INTO users (username, password_hash, role, timezone, created_at) VALUES (?, ?, ?, ?, ?)",
+            (username, password_hash, role, timezone, _utc_now()),
+        )
 
 
 def get_or_create_user(
     username: str, password_hash: str, role: str = "user", timezone: str = "America/New_York"
 ) -> Dict[str, Any]:
-    existing = get_user_by_username(username)
-    if existing:
-        return existing
-    create_user(username, password_hash, role=role, timezone=timezone)
-    return get_user_by_username(username) or {"username": username, "password_hash": password_hash}
+    with transaction():
+        existing = get_user_by_username(username)
+        if existing:
+            return existing
+        create_user(username, password_hash, role=role, timezone=timezone)
+        return get_user_by_username(username) or {"username": username, "password_hash": password_hash}
 
 
 def update_user_role(username: str, role: str) -> None:
-    conn = connect()
-    cur = conn.cursor()
-    cur.execute("UPDATE users SET role = ? WHERE username = ?", (role, username))
-    conn.commit()
-    conn.close()
+    with transaction() as cur:
+        cur.execute("UPDATE users SET role = ? WHERE username = ?", (role, username))
 
 
 def update_user_timezone(username: str, timezone: str) -> None:
-    conn = connect()
-    cur = conn.cursor()
-    cur.execute("UPDATE users SET timezone = ? WHERE username = ?", (timezone, username))
-    conn.commit()
-    conn.close()
+    with transaction() as cur:
+        cur.execute("UPDATE users SET timezone = ? WHERE username = ?", (timezone, username))
 
 
 def update_user_password(username: str, password_hash: str) -> None:
-    conn = connect()
-    cur = conn.cursor()
-    cur.execute("UPDATE users SET password_hash = ? WHERE username = ?", (password_hash, username))
-    conn.commit()
-    conn.close()
+    with transaction() as cur:
+        cur.execute("UPDATE users SET password_hash = ? WHERE username = ?", (password_hash, username))
 
 
 def list_users() -> List[Dict[str, Any]]:
-    conn = connect()
-    cur = conn.cursor()
-    cur.execute("SELECT username, role, timezone, created_at FROM users ORDER BY created_at ASC")
-    rows = cur.fetchall()
-    conn.close()
+    with cursor() as cur:
+        cur.execute("SELECT username, role, timezone, created_at FROM users ORDER BY created_at ASC")
+        rows = cur.fetchall()
     return [
         {"username": row["username"], "role": row["role"], "timezone": row["timezone"], "created_at": row["created_at"]}
         for row in rows
@@ -366,11 +674,8 @@ def list_users() -> List[Dict[str, Any]]:
 
 
 def get_or_create_game_id(name: str) -> int:
-    conn = connect()
-    game_id = _get_or_create_game_id(conn, name)
-    conn.commit()
-    conn.close()
-    return game_id
+    with transaction() as cur:
+        return _get_or_create_game_id(cur, name)
 
 
 def insert_calendar_event(
@@ -384,38 +689,93 @@ def insert_calendar_event(
 ) -> int:
     if not schedule_id or not start_utc or not event_name or not game_id:
         return 0
-    conn = connect()
-    cur = conn.cursor()
-    cur.execute(
-        """
-        INSERT INTO calendar_events (
-            schedule_id,
-            game_id,
-            event_name,
-            start_utc,
-            stop_utc,
-            description,
-            created_by,
-            is_deleted
-        )
-        VALUES (?, ?, ?, ?, ?, ?, ?, 0)
-        """,
-        (
-            str(schedule_id),
-            int(game_id),
-            str(event_name),
-            str(start_utc),
-            stop_utc,
-            description or None,
-            created_by or None,
-        ),
-    )
-    event_id = int(cur.lastrowid or 0)
-    conn.commit()
-    conn.close()
+    with transaction() as cur:
+        _bump_cache_version(cur, "calendar_events")
+        cur.execute(
+            """
+            INSERT INTO calendar_events (
+                schedule_id,
+                game_id,
+                event_name,
+                start_utc,
+                stop_utc,
+                description,
+                created_by,
+                is_deleted
+            )
+            VALUES (?, ?, ?, ?, ?, ?, ?, 0)
+            """,
+            (
+                str(schedule_id),
+                int(game_id),
+                str(event_name),
+                str(start_utc),
+                stop_utc,
+                description or None,
+                created_by or None,
+            ),
+        )
+        event_id = int(cur.lastrowid or 0)
     return event_id
 
 
+_UPSERT_CALENDAR_EVENT_SQL = """
+    INSERT INTO calendar_events (
+        schedule_id,
+        game_id,
+        event_name,
+        start_utc,
+        stop_utc,
+        description,
+        created_by,
+        is_deleted
+    )
+    VALUES (?, ?, ?, ?, ?, ?, ?, 0)
+    ON CONFLICT(schedule_id, start_utc) DO UPDATE SET
+        game_id = excluded.game_id,
+        event_name = excluded.event_name,
+        stop_utc = excluded.stop_utc,
+        description = excluded.description,
+        created_by = excluded.created_by
+    WHERE calendar_events.is_deleted = 0
+"""
+
+
+def _calendar_event_params(event: Dict[str, Any], game_id: int) -> Optional[tuple]:
+    schedule_id = event.get("schedule_id")
+    event_name = event.get("event_name")
+    start_utc = event.get("start_utc")
+    if not schedule_id or not start_utc or not event_name or not game_id:
+        return None
+    return (
+        str(schedule_id),
+        int(game_id),
+        str(event_name),
+        str(start_utc),
+        event.get("stop_utc"),
+        event.get("description") or None,
+        event.get("created_by") or None,
+    )
+
+
+def _upsert_calendar_events(cur: sqlite3.Cursor, events: Iterable[Dict[str, Any]]) -> int:
+    game_ids: Dict[str, int] = {}
+    rows: List[tuple] = []
+    for event in events:
+        game_id = event.get("game_id")
+        if not game_id:
+            game_name = event.get("game_name") or ""
+            if game_name not in game_ids:
+                game_ids[game_name] = _get_or_create_game_id(cur, game_name)
+            game_id = game_ids[game_name]
+        params = _calendar_event_params(event, game_id)
+        if params is not None:
+            rows.append(params)
+    if rows:
+        cur.executemany(_UPSERT_CALENDAR_EVENT_SQL, rows)
+    return len(rows)
+
+
 def upsert_calendar_event(
     schedule_id: str,
     game_id: int,
@@ -425,43 +785,28 @@ def upsert_calendar_event(
     description: str,
     created_by: str,
 ) -> None:
-    if not schedule_id or not start_utc or not event_name or not game_id:
-        return
-    conn = connect()
-    cur = conn.cursor()
-    cur.execute(
-        """
-        INSERT INTO calendar_events (
-            schedule_id,
-            game_id,
-            event_name,
-            start_utc,
-            stop_utc,
-            description,
-            created_by,
-            is_deleted
-        )
-        VALUES (?, ?, ?, ?, ?, ?, ?, 0)
-        ON CONFLICT(schedule_id, start_utc) DO UPDATE SET
-            game_id = excluded.game_id,
-            event_name = excluded.event_name,
-            stop_utc = excluded.stop_utc,
-            description = excluded.description,
-            created_by = excluded.created_by
-        WHERE calendar_events.is_deleted = 0
-        """,
-        (
-            str(schedule_id),
-            int(game_id),
-            str(event_name),
-            str(start_utc),
-            stop_utc,
-            description or None,
-            created_by or None,
-        ),
+    params = _calendar_event_params(
+        {
+            "schedule_id": schedule_id,
+            "event_name": event_name,
+            "start_utc": start_utc,
+            "stop_utc": stop_utc,
+            "description": description,
+            "created_by": created_by,
+        },
+        game_id,
     )
-    conn.commit()
-    conn.close()
+    if params is None:
+        return
+    with transaction() as cur:
+        _bump_cache_version(cur, "calendar_events")
+        cur.execute(_UPSERT_CALENDAR_EVENT_SQL, params)
+
+
+def upsert_calendar_events(events: Iterable[Dict[str, Any]]) -> int:
+    with transaction() as cur:
+        _bump_cache_version(cur, "calendar_events")
+        return _upsert_calendar_events(cur, events)
 
 
 def list_calendar_events(
@@ -469,39 +814,37 @@ def list_calendar_events(
     end_utc: Optional[str] = None,
     include_deleted: bool = False,
 ) -> List[Dict[str, Any]]:
-    conn = connect()
-    cur = conn.cursor()
-    clauses = []
-    params: List[Any] = []
-    if not include_deleted:
-        clauses.append("calendar_events.is_deleted = 0")
-    if start_utc:
-        clauses.append("calendar_events.start_utc >= ?")
-        params.append(start_utc)
-    if end_utc:
-        clauses.append("calendar_events.start_utc < ?")
-        params.append(end_utc)
-    where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
-    cur.execute(
-        """
-        SELECT
-            calendar_events.id,
-            calendar_events.schedule_id,
-            calendar_events.game_id,
-            games.name AS game_name,
-            calendar_events.event_name,
-            calendar_events.start_utc,
-            calendar_events.stop_utc,
-            calendar_events.description,
-            calendar_events.created_by
-        FROM calendar_events
-        LEFT JOIN games ON games.id = calendar_events.game_id
-        """
-        f"{where} ORDER BY calendar_events.start_utc ASC",
-        params,
-    )
-    rows = cur.fetchall()
-    conn.close()
+    with cursor() as cur:
+        clauses = []
+        params: List[Any] = []
+        if not include_deleted:
+            clauses.append("calendar_events.is_deleted = 0")
+        if start_utc:
+            clauses.append("calendar_events.start_utc >= ?")
+            params.append(start_utc)
+        if end_utc:
+            clauses.append("calendar_events.start_utc < ?")
+            params.append(end_utc)
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        cur.execute(
+            """
+            SELECT
+                calendar_events.id,
+                calendar_events.schedule_id,
+                calendar_events.game_id,
+                games.name AS game_name,
+                calendar_events.event_name,
+                calendar_events.start_utc,
+                calendar_events.stop_utc,
+                calendar_events.description,
+                calendar_events.created_by
+            FROM calendar_events
+            LEFT JOIN games ON games.id = calendar_events.game_id
+            """
+            f"{where} ORDER BY calendar_events.start_utc ASC",
+            params,
+        )
+        rows = cur.fetchall()
     return [
         {
             "id": row["id"],
@@ -521,29 +864,27 @@ def list_calendar_events(
 def get_calendar_event_by_id(event_id: int) -> Optional[Dict[str, Any]]:
     if not event_id:
         return None
-    conn = connect()
-    cur = conn.cursor()
-    cur.execute(
-        """
-        SELECT
-            calendar_events.id,
-            calendar_events.schedule_id,
-            calendar_events.game_id,
-            games.name AS game_name,
-            calendar_events.event_name,
-            calendar_events.start_utc,
-            calendar_events.stop_utc,
-            calendar_events.description,
-            calendar_events.created_by,
-            calendar_events.is_deleted
-        FROM calendar_events
-        LEFT JOIN games ON games.id = calendar_events.game_id
-        WHERE calendar_events.id = ?
-        """,
-        (int(event_id),),
-    )
-    row = cur.fetchone()
-    conn.close()
+    with cursor() as cur:
+        cur.execute(
+            """
+            SELECT
+                calendar_events.id,
+                calendar_events.schedule_id,
+                calendar_events.game_id,
+                games.name AS game_name,
+                calendar_events.event_name,
+                calendar_events.start_utc,
+                calendar_events.stop_utc,
+                calendar_events.description,
+                calendar_events.created_by,
+                calendar_events.is_deleted
+            FROM calendar_events
+            LEFT JOIN games ON games.id = calendar_events.game_id
+            WHERE calendar_events.id = ?
+            """,
+            (int(event_id),),
+        )
+        row = cur.fetchone()
     if not row:
         return None
     return {
@@ -563,33 +904,27 @@ def get_calendar_event_by_id(event_id: int) -> Optional[Dict[str, Any]]:
 def mark_calendar_event_deleted(event_id: int) -> None:
     if not event_id:
         return
-    conn = connect()
-    cur = conn.cursor()
-    cur.execute("UPDATE calendar_events SET is_deleted = 1 WHERE id = ?", (int(event_id),))
-    conn.commit()
-    conn.close()
+    with transaction() as cur:
+        _bump_cache_version(cur, "calendar_events")
+        cur.execute("UPDATE calendar_events SET is_deleted = 1 WHERE id = ?", (int(event_id),))
 
 
 def mark_calendar_events_deleted_by_game(game_id: int) -> int:
     if not game_id:
         return 0
-    conn = connect()
-    cur = conn.cursor()
-    cur.execute("UPDATE calendar_events SET is_deleted = 1 WHERE game_id = ?", (int(game_id),))
-    updated = cur.rowcount or 0
-    conn.commit()
-    conn.close()
+    with transaction() as cur:
+        _bump_cache_version(cur, "calendar_events")
+        cur.execute("UPDATE calendar_events SET is_deleted = 1 WHERE game_id = ?", (int(game_id),))
+        updated = cur.rowcount or 0
     return updated
 
 
 def delete_calendar_events_by_game(game_id: int) -> None:
     if not game_id:
         return
-    conn = connect()
-    cur = conn.cursor()
-    cur.execute("DELETE FROM calendar_events WHERE game_id = ?", (int(game_id),))
-    conn.commit()
-    conn.close()
+    with transaction() as cur:
+        _bump_cache_version(cur, "calendar_events")
+        cur.execute("DELETE FROM calendar_events WHERE game_id = ?", (int(game_id),))
 
 
 def delete_calendar_events_in_range(
@@ -600,29 +935,159 @@ def delete_calendar_events_in_range(
 ) -> None:
     if not start_utc or not end_utc:
         return
-    conn = connect()
-    cur = conn.cursor()
-    clauses = ["start_utc >= ?", "start_utc < ?"]
-    params: List[Any] = [start_utc, end_utc]
-    if not include_deleted:
-        clauses.append("is_deleted = 0")
-    if exclude_local:
-        clauses.append("schedule_id NOT LIKE ?")
-        params.append("local_%")
-    cur.execute(
-        f"DELETE FROM calendar_events WHERE {' AND '.join(clauses)}",
-        params,
-    )
-    conn.commit()
-    conn.close()
+    with transaction() as cur:
+        _bump_cache_version(cur, "calendar_events")
+        clauses = ["start_utc >= ?", "start_utc < ?"]
+        params: List[Any] = [start_utc, end_utc]
+        if not include_deleted:
+            clauses.append("is_deleted = 0")
+        if exclude_local:
+            clauses.append("schedule_id NOT LIKE ?")
+            params.append("local_%")
+        cur.execute(
+            f"DELETE FROM calendar_events WHERE {' AND '.join(clauses)}",
+            params,
+        )
+
+
+def get_schedule_fingerprints() -> Dict[str, str]:
+    with cursor() as cur:
+        cur.execute("SELECT schedule_id, fingerprint FROM pelican_schedule_state")
+        rows = cur.fetchall()
+    return {row["schedule_id"]: row["fingerprint"] for row in rows}
+
+
+def reconcile_calendar_events(
+    start_utc: str,
+    end_utc: str,
+    events: Iterable[Dict[str, Any]],
+    schedule_ids: Iterable[str],
+    fingerprints: Dict[str, str],
+    include_deleted: bool = False,
+) -> Dict[str, int]:
+    counts = {"inserted": 0, "updated": 0, "deleted": 0, "unchanged": 0, "total": 0}
+    if not start_utc or not end_utc:
+        return counts
+    changed = sorted({str(schedule_id) for schedule_id in schedule_ids})
+    changed_ids = json.dumps(changed)
+    current_ids = json.dumps(sorted(fingerprints))
+    deleted_clause = "" if include_deleted else " AND is_deleted = 0"
+    with transaction() as cur:
+        cur.execute(
+            f"""
+            DELETE FROM calendar_events
+            WHERE start_utc >= ? AND start_utc < ?
+                AND schedule_id NOT LIKE 'local_%'
+                AND schedule_id NOT IN (SELECT value FROM json_each(?)){deleted_clause}
+            """,
+            (start_utc, end_utc, current_ids),
+        )
+        counts["deleted"] += cur.rowcount or 0
+        cur.execute(
+            """
+            SELECT id, schedule_id, start_utc, game_id, event_name, stop_utc, is_deleted
+            FROM calendar_events
+            WHERE schedule_id IN (SELECT value FROM json_each(?))
+                AND start_utc >= ? AND start_utc < ?
+            """,
+            (changed_ids, start_utc, end_utc),
+        )
+        existing = {(row["schedule_id"], row["start_utc"]): row for row in cur.fetchall()}
+
+        game_ids: Dict[str, int] = {}
+        inserts: List[tuple] = []
+        updates: List[tuple] = []
+        seen: set = set()
+        for event in events:
+            game_name = event.get("game_name") or ""
+            if game_name not in game_ids:
+                game_ids[game_name] = _get_or_create_game_id(cur, game_name)
+            params = _calendar_event_params(event, game_ids[game_name])
+            if params is None:
+                continue
+            key = (params[0], params[3])
+            if key in seen:
+                continue
+            seen.add(key)
+            row = existing.get(key)
+            if row is None:
+                inserts.append(params)
+                continue
+            if row["is_deleted"] and not include_deleted:
+                counts["unchanged"] += 1
+                continue
+            if (
+                not row["is_deleted"]
+                and row["game_id"] == params[1]
+                and row["event_name"] == params[2]
+                and row["stop_utc"] == params[4]
+            ):
+                counts["unchanged"] += 1
+                continue
+            updates.append((params[1], params[2], params[4], params[5], params[6], row["id"]))
+        deletes = [
+            (row["id"],)
+            for key, row in existing.items()
+            if key not in seen and (include_deleted or not row["is_deleted"])
+        ]
+        if inserts:
+            cur.executemany(_UPSERT_CALENDAR_EVENT_SQL, inserts)
+        if updates:
+            cur.executemany(
+                """
+                UPDATE calendar_events
+                SET game_id = ?, event_name = ?, stop_utc = ?, description = ?, created_by = ?, is_deleted = 0
+                WHERE id = ?
+                """,
+                updates,
+            )
+        if deletes:
+            cur.executemany("DELETE FROM calendar_events WHERE id = ?", deletes)
+        counts["inserted"] = len(inserts)
+        counts["updated"] = len(updates)
+        counts["deleted"] += len(deletes)
+        if counts["inserted"] or counts["updated"] or counts["deleted"]:
+            _bump_cache_version(cur, "calendar_events")
+
+        now = _utc_now()
+        cur.execute(
+            "DELETE FROM pelican_schedule_state WHERE schedule_id NOT IN (SELECT value FROM json_each(?))",
+            (current_ids,),
+        )
+        cur.executemany(
+            """
+            INSERT INTO pelican_schedule_state (schedule_id, fingerprint, synced_at)
+            VALUES (?, ?, ?)
+            ON CONFLICT(schedule_id) DO UPDATE SET
+                fingerprint = excluded.fingerprint,
+                synced_at = excluded.synced_at
+            """,
+            [(schedule_id, fingerprints[schedule_id], now) for schedule_id in changed if schedule_id in fingerprints],
+        )
+        cur.execute(
+            """
+            SELECT COUNT(*) AS total FROM calendar_events
+            WHERE is_deleted = 0 AND start_utc >= ? AND start_utc < ? AND schedule_id NOT LIKE 'local_%'
+            """,
+            (start_utc, end_utc),
+        )
+        counts["total"] = int(cur.fetchone()["total"] or 0)
+    return counts
+
+
+def replace_calendar_events_for_game(game_id: int, events: Iterable[Dict[str, Any]]) -> int:
+    if not game_id:
+        return 0
+    with transaction() as cur:
+        _bump_cache_version(cur, "calendar_events")
+        cur.execute("DELETE FROM calendar_events WHERE game_id = ?", (int(game_id),))
+        return _upsert_calendar_events(cur, ({**event, "game_id": int(game_id)} for event in events))
 
 
 def get_widgets() -> List[Dict[str, Any]]:
-    conn = connect()
-    cur = conn.cursor()
-    cur.execute("SELECT * FROM widgets ORDER BY widget_key")
-    rows = cur.fetchall()
-    conn.close()
+    with cursor() as cur:
+        cur.execute("SELECT * FROM widgets ORDER BY widget_key")
+        rows = cur.fetchall()
     widgets: List[Dict[str, Any]] = []
     for row in rows:
         config = {}
@@ -654,61 +1119,214 @@ def upsert_widget(
     h: int,
     config: Optional[Dict[str, Any]] = None,
 ) -> None:
-    conn = connect()
-    cur = conn.cursor()
-    cur.execute(
-        """
-        INSERT INTO widgets (widget_key, enabled, x, y, w, h, config_json, updated_at)
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-        ON CONFLICT(widget_key) DO UPDATE SET
-            enabled = excluded.enabled,
-            x = excluded.x,
-            y = excluded.y,
-            w = excluded.w,
-            h = excluded.h,
-            config_json = excluded.config_json,
-            updated_at = excluded.updated_at
-        """,
-        (
-            widget_key,
-            1 if enabled else 0,
-            x,
-            y,
-            w,
-            h,
-            json.dumps(config or {}),
-            _utc_now(),
-        ),
-    )
-    conn.commit()
-    conn.close()
+    with transaction() as cur:
+        _bump_cache_version(cur, "widgets")
+        cur.execute(
+            """
+            INSERT INTO widgets (widget_key, enabled, x, y, w, h, config_json, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(widget_key) DO UPDATE SET
+                enabled = excluded.enabled,
+                x = excluded.x,
+                y = excluded.y,
+                w = excluded.w,
+                h = excluded.h,
+                config_json = excluded.config_json,
+                updated_at = excluded.updated_at
+            """,
+            (
+                widget_key,
+                1 if enabled else 0,
+                x,
+                y,
+                w,
+                h,
+                json.dumps(config or {}),
+                _utc_now(),
+            ),
+        )
 
 
 def update_widget_layouts(layouts: Iterable[Dict[str, Any]]) -> None:
-    conn = connect()
-    cur = conn.cursor()
-    now = _utc_now()
-    for item in layouts:
-        cur.execute(
+    with transaction() as cur:
+        _bump_cache_version(cur, "widgets")
+        now = _utc_now()
+        cur.executemany(
             """
             UPDATE widgets
             SET x = ?, y = ?, w = ?, h = ?, updated_at = ?
             WHERE widget_key = ?
             """,
-            (item["x"], item["y"], item["w"], item["h"], now, item["widget_key"]),
+            [(item["x"], item["y"], item["w"], item["h"], now, item["widget_key"]) for item in layouts],
         )
-    conn.commit()
-    conn.close()
 
 
 def update_widget_enabled(widget_key: str, enabled: bool) -> None:
-    conn = connect()
-    cur = conn.cursor()
+    with transaction() as cur:
+        _bump_cache_version(cur, "widgets")
+        cur.execute(
+            """
+            UPDATE widgets SET enabled = ?, updated_at = ? WHERE widget_key = ?
+            """,
+            (1 if enabled else 0, _utc_now(), widget_key),
+        )
+
+
+def split_allowlist(value: Any) -> List[str]:
+    if isinstance(value, (list, tuple, set, frozenset)):
+        entries = [str(entry) for entry in value]
+    elif value:
+        entries = str(value).split(",")
+    else:
+        entries = []
+    return [entry.strip() for entry in entries if entry.strip()]
+
+
+def _read_oauth_allowlist(cur: sqlite3.Cursor) -> Dict[str, frozenset]:
+    cur.execute("SELECT provider, claim FROM oauth_allowlist")
+    grouped: Dict[str, set] = {provider: set() for provider in OAUTH_ALLOWLIST_FIELDS}
+    for row in cur.fetchall():
+        grouped.setdefault(row["provider"], set()).add(row["claim"].lower())
+    return {provider: frozenset(claims) for provider, claims in grouped.items()}
+
+
+_oauth_allowlist = _VersionedSnapshot("oauth_allowlist", _read_oauth_allowlist)
+
+
+def snapshot_stats() -> Dict[str, Dict[str, Any]]:
+    return {snapshot.name: snapshot.stats() for snapshot in (_settings, _oauth_allowlist)}
+
+
+def get_oauth_allowlist() -> Dict[str, frozenset]:
+    return _oauth_allowlist.get()
+
+
+def add_oauth_allowlist_entry(provider: str, claim: str) -> bool:
+    with _oauth_allowlist.write() as cur:
+        cur.execute(
+            "INSERT OR IGNORE INTO oauth_allowlist (provider, claim, created_at) VALUES (?, ?, ?)",
+            (provider, claim, _utc_now()),
+        )
+        return bool(cur.rowcount)
+
+
+def remove_oauth_allowlist_entry(provider: str, claim: str) -> bool:
+    with _oauth_allowlist.write() as cur:
+        cur.execute("DELETE FROM oauth_allowlist WHERE provider = ? AND claim = ?", (provider, claim))
+        return bool(cur.rowcount)
+
+
+def replace_oauth_allowlist(provider: str, claims: Iterable[str]) -> Dict[str, int]:
+    wanted = set(claims)
+    with _oauth_allowlist.write() as cur:
+        cur.execute("SELECT claim FROM oauth_allowlist WHERE provider = ?", (provider,))
+        existing = {row["claim"] for row in cur.fetchall()}
+        removed = existing - wanted
+        added = wanted - existing
+        if removed:
+            cur.executemany(
+                "DELETE FROM oauth_allowlist WHERE provider = ? AND claim = ?",
+                [(provider, claim) for claim in removed],
+            )
+        if added:
+            now = _utc_now()
+            cur.executemany(
+                "INSERT INTO oauth_allowlist (provider, claim, created_at) VALUES (?, ?, ?)",
+                [(provider, claim, now) for claim in added],
+            )
+    return {"added": len(added), "removed": len(removed)}
+
+
+_UPSERT_KUMA_HISTORY_SQL = """
+INSERT INTO kuma_history (
+    resolution, bucket, monitor_id, samples, up, down, response_sum, response_samples, response_max
+)
+VALUES (?, ?, ?, 1, ?, ?, ?, ?, ?)
+ON CONFLICT (resolution, bucket, monitor_id) DO UPDATE SET
+    samples = samples + 1,
+    up = up + excluded.up,
+    down = down + excluded.down,
+    response_sum = response_sum + excluded.response_sum,
+    response_samples = response_samples + excluded.response_samples,
+    response_max = MAX(COALESCE(response_max, excluded.response_max), COALESCE(excluded.response_max, response_max))
+"""
+
+
+def _kuma_monitor_ids(cur: sqlite3.Cursor, names: List[str]) -> Dict[str, int]:
+    cur.executemany("INSERT OR IGNORE INTO kuma_monitors (name) VALUES (?)", [(name,) for name in names])
     cur.execute(
-        """
-        UPDATE widgets SET enabled = ?, updated_at = ? WHERE widget_key = ?
-        """,
-        (1 if enabled else 0, _utc_now(), widget_key),
+        "SELECT id, name FROM kuma_monitors WHERE name IN (SELECT value FROM json_each(?))",
+        (json.dumps(names),),
     )
-    conn.commit()
-    conn.close()
+    return {row["name"]: int(row["id"]) for row in cur.fetchall()}
+
+
+def record_kuma_samples(timestamp: int, samples: Iterable[Tuple[str, int, Optional[float]]]) -> int:
+    latest: Dict[str, Tuple[int, Optional[float]]] = {}
+    for name, status, response_ms in samples:
+        latest[name] = (status, response_ms)
+    if not latest:
+        return 0
+    with transaction() as cur:
+        ids = _kuma_monitor_ids(cur, list(latest))
+        rows = []
+        for name, (status, response_ms) in latest.items():
+            response = int(round(response_ms)) if response_ms is not None else None
+            values = (
+                ids[name],
+                int(status == KUMA_STATUS_UP),
+                int(status == KUMA_STATUS_DOWN),
+                response or 0,
+                int(response is not None),
+                response,
+            )
+            for resolution in KUMA_HISTORY_RETENTION_SEC:
+                rows.append((resolution, timestamp - timestamp % resolution, *values))
+        cur.executemany(_UPSERT_KUMA_HISTORY_SQL, rows)
+        for resolution, retention in KUMA_HISTORY_RETENTION_SEC.items():
+            cur.execute(
+                "DELETE FROM kuma_history WHERE resolution = ? AND bucket < ?",
+                (resolution, timestamp - retention),
+            )
+        _bump_cache_version(cur, "kuma_history")
+    return len(latest)
+
+
+def list_kuma_history(resolution: int, start: int, names: Optional[Iterable[str]] = None) -> List[Dict[str, Any]]:
+    clauses = ["kuma_history.resolution = ?", "kuma_history.bucket >= ?"]
+    params: List[Any] = [resolution, start]
+    if names is not None:
+        clauses.append("kuma_monitors.name IN (SELECT value FROM json_each(?))")
+        params.append(json.dumps(list(names)))
+    with cursor() as cur:
+        cur.execute(
+            """
+            SELECT
+                kuma_monitors.name,
+                kuma_history.bucket,
+                kuma_history.samples,
+                kuma_history.up,
+                kuma_history.down,
+                kuma_history.response_sum,
+                kuma_history.response_samples,
+                kuma_history.response_max
+            FROM kuma_history
+            JOIN kuma_monitors ON kuma_monitors.id = kuma_history.monitor_id
+            """
+            f"WHERE {' AND '.join(clauses)} ORDER BY kuma_monitors.name, kuma_history.bucket",
+            params,
+        )
+        rows = cur.fetchall()
+    return [
+        {
+            "name": row["name"],
+            "bucket": int(row["bucket"]),
+            "samples": int(row["samples"]),
+            "up": int(row["up"]),
+            "down": int(row["down"]),
+            "response_sum": int(row["response_sum"]),
+            "response_samples": int(row["response_samples"]),
+            "response_max": row["response_max"],
+        }
+        for row in rows
+    ]
@@ -1,27 +1,40 @@
-import base64
-import binascii
+import asyncio
+import bisect
 import calendar
+import email.utils
+import functools
 import hashlib
+import itertools
 import json
 import logging
 import os
+import random
 import re
 import secrets
-import urllib.error
+import signal
+import threading
+import time
 import urllib.parse
-import urllib.request
 import uuid
+from collections import OrderedDict
+from contextlib import contextmanager
 from datetime import datetime, timedelta, timezone
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
 
+import httpx
 from fastapi import Depends, FastAPI, Form, HTTPException, Request
-from fastapi.responses import HTMLResponse, JSONResponse, RedirectResponse
+from fastapi.responses import HTMLResponse, JSONResponse, RedirectResponse, Response, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 from starlette.middleware.sessions import SessionMiddleware
 from authlib.integrations.starlette_client import OAuth, OAuthError
 
-from . import db
+from . import db, metrics, passwords, tracing, upstream
+from .breaker import STATE_VALUES, BreakerRegistry, CircuitOpenError
+from .cache import TTLCache
+from .cron import cron_expression, occurrence_cache
+from .prometheus import KumaMetricsParser, parse_kuma_metrics
+from .stream import StreamBroker
 
 APP_TITLE = "Uptime Atlas"
 SESSION_SECRET_ENV = "UPTIME_ATLAS_SESSION_SECRET"
@@ -35,6 +48,37 @@ DISCORD_CLIENT_SECRET_ENV = "UPTIME_ATLAS_DISCORD_CLIENT_SECRET"
 ALLOWED_GOOGLE_EMAILS_ENV = "UPTIME_ATLAS_GOOGLE_ALLOWED_EMAILS"
 ALLOWED_DISCORD_IDS_ENV = "UPTIME_ATLAS_DISCORD_ALLOWED_IDS"
 ALLOWED_STEAM_IDS_ENV = "UPTIME_ATLAS_STEAM_ALLOWED_IDS"
+METRICS_TOKEN_ENV = "UPTIME_ATLAS_METRICS_TOKEN"
+KUMA_HISTORY_SAMPLE_ENV = "UPTIME_ATLAS_KUMA_HISTORY_SAMPLE_SEC"
+PELICAN_SYNC_DEFAULT_INTERVAL_SEC = 300
+PELICAN_SYNC_MIN_INTERVAL_SEC = 30
+PELICAN_SYNC_JITTER_RATIO = 0.1
+PELICAN_SYNC_RETRY_SEC = 30
+PELICAN_SYNC_MAX_BACKOFF_SEC = 1800
+PELICAN_FETCH_DEFAULT_CONCURRENCY = 6
+PELICAN_SCHEDULE_SOURCE_SEP = "#"
+PELICAN_MAX_OCCURRENCES_PER_SCHEDULE = 2500
+PELICAN_SERVER_FIELDS = ("server_id", "server_name", "base_url", "api_key")
+KUMA_CACHE_TTL_SEC = 15
+KUMA_CACHE_STALE_SEC = 300
+ENCODED_PAYLOAD_CACHE_SIZE = 16
+KUMA_AGGREGATE_WAIT_SEC = 1.5
+KUMA_INSTANCE_FIELDS = ("base_url", "status_page_slug", "name", "auth_header")
+KUMA_STATUS_SEVERITY = {0: 4, 2: 3, 3: 2, 1: 1}
+KUMA_HISTORY_SAMPLE_SEC = 60
+KUMA_HISTORY_MIN_GAP_SEC = 45
+KUMA_HISTORY_RANGES = {
+    "1h": (3600, 60),
+    "6h": (6 * 3600, 60),
+    "24h": (86400, 3600),
+    "7d": (7 * 86400, 3600),
+    "30d": (30 * 86400, 86400),
+    "90d": (90 * 86400, 86400),
+    "1y": (365 * 86400, 86400),
+}
+KUMA_HISTORY_DEFAULT_RANGE = "24h"
+STREAM_POLL_SEC = 5
+UPSTREAM_RETRY_AFTER_STATUSES = frozenset({429, 503})
 
 DEFAULT_WIDGETS = [
     {
@@ -83,6 +127,7 @@ DEFAULT_SETTINGS = {
         "status_page_slug": "",
         "metrics_path": "/metrics",
         "auth_header": "",
+        "instances": "",
         "timeout_sec": 6,
     },
     "pelican_config": {
@@ -91,7 +136,10 @@ DEFAULT_SETTINGS = {
         "api_key": "",
         "server_id": "",
         "server_name": "Server",
+        "servers": "",
+        "fetch_concurrency": PELICAN_FETCH_DEFAULT_CONCURRENCY,
         "timeout_sec": 6,
+        "sync_interval_sec": PELICAN_SYNC_DEFAULT_INTERVAL_SEC,
     },
     "discord_config": {
         "enabled": False,
@@ -99,11 +147,11 @@ DEFAULT_SETTINGS = {
         "channel_id": "",
         "guild_id": "",
     },
-    "oauth_allowlist": {
-        "google_emails": "",
-        "discord_ids": "",
-        "steam_ids": "",
-    },
+}
+OAUTH_ALLOWLIST_ENVS = {
+    "google": ALLOWED_GOOGLE_EMAILS_ENV,
+    "discord": ALLOWED_DISCORD_IDS_ENV,
+    "steam": ALLOWED_STEAM_IDS_ENV,
 }
 
 app = FastAPI(title=APP_TITLE)
@@ -115,11 +163,19 @@ if not session_secret:
     session_secret = secrets.token_hex(32)
 
 app.add_middleware(SessionMiddleware, secret_key=session_secret, max_age=SESSION_MAX_AGE_SECONDS)
+app.add_middleware(metrics.MetricsMiddleware, skip_routes={"/api/stream", "/metrics"})
+app.add_middleware(tracing.TracingMiddleware, skip_paths={"/api/stream", "/metrics"})
 
 app.mount("/static", StaticFiles(directory=os.path.join(os.path.dirname(__file__), "static")), name="static")
 
 templates = Jinja2Templates(directory=os.path.join(os.path.dirname(__file__), "templates"))
 
+
+def _render(name: str, context: Dict[str, Any]) -> HTMLResponse:
+    with tracing.span("template", name):
+        return templates.TemplateResponse(name, context)
+
+
 oauth = OAuth()
 
 if os.environ.get(GOOGLE_CLIENT_ID_ENV) and os.environ.get(GOOGLE_CLIENT_SECRET_ENV):
@@ -143,23 +199,22 @@ if os.environ.get(DISCORD_CLIENT_ID_ENV) and os.environ.get(DISCORD_CLIENT_SECRE
     )
 
 
-def _hash_password(password: str) -> str:
-    salt = secrets.token_bytes(16)
-    dk = hashlib.pbkdf2_hmac("sha256", password.encode("utf-8"), salt, 120_000)
-    return base64.b64encode(salt + dk).decode("utf-8")
+def _password_busy() -> HTTPException:
+    return HTTPException(status_code=503, detail="Too many password operations", headers={"Retry-After": "1"})
 
 
-def _verify_password(password: str, stored_hash: str) -> bool:
+async def _hash_password(password: str) -> str:
     try:
-        raw = base64.b64decode(stored_hash.encode("utf-8"))
-    except (ValueError, binascii.Error):
-        return False
-    if len(raw) < 17:
-        return False
-    salt = raw[:16]
-    expected = raw[16:]
-    dk = hashlib.pbkdf2_hmac("sha256", password.encode("utf-8"), salt, 120_000)
-    return secrets.compare_digest(dk, expected)
+        return await passwords.hash_password_async(password)
+    except passwords.PasswordHasherBusy as exc:
+        raise _password_busy() from exc
+
+
+async def _check_password(password: str, stored_hash: str) -> bool:
+    try:
+        return await passwords.verify_password_async(password, stored_hash)
+    except passwords.PasswordHasherBusy as exc:
+        raise _password_busy() from exc
 
 
 def _ensure_defaults() -> None:
@@ -185,12 +240,12 @@ def _ensure_defaults() -> None:
         env_user = os.environ.get(ADMIN_USER_ENV)
         env_password = os.environ.get(ADMIN_PASSWORD_ENV)
         if env_user and env_password:
-            db.create_user(env_user, _hash_password(env_password), role="root")
+            db.create_user(env_user, passwords.hash_password(env_password), role="root")
             logger.info("Bootstrap admin created from env vars.")
         else:
             bootstrap_user = "root"
             bootstrap_password = secrets.token_urlsafe(14)
-            db.create_user(bootstrap_user, _hash_password(bootstrap_password), role="root")
+            db.create_user(bootstrap_user, passwords.hash_password(bootstrap_password), role="root")
             print(
                 "[Uptime Atlas] Bootstrap admin created. "
                 f"Username: {bootstrap_user} Password: {bootstrap_password}",
@@ -202,7 +257,35 @@ def _ensure_defaults() -> None:
 
 @app.on_event("startup")
 async def startup() -> None:
-    _ensure_defaults()
+    await db.run("ensure_defaults", _ensure_defaults)
+    upstream.start()
+    _pelican_sync_runtime["lock"] = asyncio.Lock()
+    _pelican_sync_runtime["wake"] = asyncio.Event()
+    _pelican_sync_runtime["task"] = asyncio.create_task(_pelican_sync_loop())
+    _stream_runtime["wake"] = asyncio.Event()
+    _stream_runtime["task"] = asyncio.create_task(_stream_loop())
+    _kuma_history_runtime["task"] = asyncio.create_task(_kuma_history_loop())
+    _stream_broker.on_subscribe = _wake_stream
+    _close_stream_on_exit_signal()
+
+
+@app.on_event("shutdown")
+async def shutdown() -> None:
+    _stream_broker.close()
+    for runtime in (_stream_runtime, _pelican_sync_runtime, _kuma_history_runtime):
+        task = runtime.get("task")
+        if task is None:
+            continue
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+        runtime["task"] = None
+    await upstream.close()
+    passwords.shutdown_executor()
+    db.shutdown_executor()
+    db.close_connections()
 
 
 def _is_admin(request: Request) -> bool:
@@ -217,32 +300,31 @@ def _is_authenticated(request: Request) -> bool:
     return bool(request.session.get("user"))
 
 
-def _allowlist(value: Optional[str]) -> List[str]:
-    if not value:
-        return []
-    return [entry.strip() for entry in value.split(",") if entry.strip()]
+@functools.lru_cache(maxsize=16)
+def _compile_allowlist(value: Optional[str]) -> frozenset:
+    return frozenset(entry.lower() for entry in db.split_allowlist(value))
 
 
 def _oauth_allowed(provider: str, claim: Optional[str]) -> bool:
     if not claim:
         return False
-    allow_settings = db.get_setting("oauth_allowlist")
-    if not isinstance(allow_settings, dict):
-        allow_settings = {}
-    if provider == "google":
-        allowed = _allowlist(os.environ.get(ALLOWED_GOOGLE_EMAILS_ENV))
-        allowed += _allowlist(allow_settings.get("google_emails"))
-    elif provider == "discord":
-        allowed = _allowlist(os.environ.get(ALLOWED_DISCORD_IDS_ENV))
-        allowed += _allowlist(allow_settings.get("discord_ids"))
-    elif provider == "steam":
-        allowed = _allowlist(os.environ.get(ALLOWED_STEAM_IDS_ENV))
-        allowed += _allowlist(allow_settings.get("steam_ids"))
-    else:
-        allowed = []
-    if not allowed:
+    env_name = OAUTH_ALLOWLIST_ENVS.get(provider)
+    if env_name is None:
+        return True
+    env_allowed = _compile_allowlist(os.environ.get(env_name))
+    stored_allowed = db.get_oauth_allowlist().get(provider, frozenset())
+    if not env_allowed and not stored_allowed:
         return True
-    return claim in allowed
+    claim = claim.lower()
+    return claim in env_allowed or claim in stored_allowed
+
+
+def _oauth_allowlist_fields() -> Dict[str, str]:
+    allowlist = db.get_oauth_allowlist()
+    return {
+        field: ",".join(sorted(allowlist.get(provider, ())))
+        for provider, field in db.OAUTH_ALLOWLIST_FIELDS.items()
+    }
 
 
 def _login_user(request: Request, user: Dict[str, Any]) -> None:
@@ -267,16 +349,51 @@ def require_login(request: Request) -> None:
 
 
 def _load_settings() -> Dict[str, Any]:
-    settings = db.get_all_settings()
-    for key, value in DEFAULT_SETTINGS.items():
-        if key not in settings:
-            settings[key] = value
-            continue
-        if isinstance(value, dict) and isinstance(settings.get(key), dict):
-            merged = value.copy()
-            merged.update(settings[key])
-            settings[key] = merged
-    return settings
+    return db.get_all_settings_with_defaults(DEFAULT_SETTINGS)
+
+
+def _etag_for(*parts: Any) -> str:
+    encoded = json.dumps(parts, sort_keys=True, default=str, separators=(",", ":")).encode("utf-8")
+    return f'"{hashlib.sha1(encoded).hexdigest()[:32]}"'
+
+
+def _encode_json(payload: Any) -> Tuple[bytes, str]:
+    cached = _encoded_payloads.get(id(payload))
+    if cached is not None and cached[0] is payload:
+        return cached[1], cached[2]
+    body = json.dumps(payload, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+    etag = f'"{hashlib.sha1(body).hexdigest()[:32]}"'
+    _encoded_payloads[id(payload)] = (payload, body, etag)
+    while len(_encoded_payloads) > ENCODED_PAYLOAD_CACHE_SIZE:
+        _encoded_payloads.popitem(last=False)
+    return body, etag
+
+
+def _etag_matches(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    for candidate in header.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate in {etag, "*"}:
+            return True
+    return False
+
+
+def _etag_headers(etag: str) -> Dict[str, str]:
+    return {"ETag": etag, "Cache-Control": "no-cache"}
+
+
+def _not_modified(request: Request, etag: str) -> Optional[Response]:
+    if _etag_matches(request, etag):
+        return Response(status_code=304, headers=_etag_headers(etag))
+    return None
+
+
+def _json_response(payload: Any, etag: str) -> JSONResponse:
+    return JSONResponse(payload, headers=_etag_headers(etag))
 
 
 def _load_widgets() -> List[Dict[str, Any]]:
@@ -290,96 +407,156 @@ def _load_widgets() -> List[Dict[str, Any]]:
     return ordered
 
 
-def _fetch_json(url: str, headers: Optional[Dict[str, str]] = None, timeout: int = 6) -> Any:
-    req = urllib.request.Request(url, headers=headers or {})
-    with urllib.request.urlopen(req, timeout=timeout) as resp:
-        data = resp.read().decode("utf-8")
-        return json.loads(data)
+def _http_span(method: str, url: str) -> Any:
+    parsed = urllib.parse.urlsplit(url)
+    return tracing.span("http", f"{method} {parsed.netloc}{parsed.path}")
+
 
+_upstream_breakers = BreakerRegistry()
 
-def _fetch_text(url: str, headers: Optional[Dict[str, str]] = None, timeout: int = 6) -> str:
-    req = urllib.request.Request(url, headers=headers or {})
-    with urllib.request.urlopen(req, timeout=timeout) as resp:
-        return resp.read().decode("utf-8")
+
+def _upstream_host(url: str) -> str:
+    return urllib.parse.urlsplit(url).netloc or url
+
+
+def _upstream_instance(base_url: str) -> str:
+    parsed = urllib.parse.urlsplit(base_url)
+    return f"{parsed.netloc}{parsed.path.rstrip('/')}" or base_url
+
+
+@contextmanager
+def _upstream_guard(url: str, breaker_key: Optional[str] = None) -> Iterator[None]:
+    host = breaker_key or _upstream_host(url)
+    breaker = _upstream_breakers.get(host)
+    if not breaker.allow():
+        metrics.UPSTREAM_CIRCUIT_REJECTED.inc(host=host)
+        raise CircuitOpenError(host, breaker.retry_after())
+    opens = breaker.opens
+    try:
+        yield
+    except httpx.HTTPStatusError as exc:
+        status = exc.response.status_code
+        if status == 429 or status >= 500:
+            retry_after = None
+            if status in UPSTREAM_RETRY_AFTER_STATUSES:
+                retry_after = _retry_after_seconds(exc.response.headers.get("Retry-After"))
+            breaker.record_failure(f"http_{status}", retry_after)
+        else:
+            breaker.record_success()
+        raise
+    except httpx.TransportError as exc:
+        breaker.record_failure(type(exc).__name__)
+        raise
+    else:
+        breaker.record_success()
+    finally:
+        if breaker.opens != opens:
+            metrics.UPSTREAM_CIRCUIT_OPENS.inc(host=host)
+            logger.warning(
+                "Circuit for %s opened (%s); retry in %.0fs.", host, breaker.last_failure, breaker.retry_after()
+            )
+
+
+async def _upstream_request(
+    method: str,
+    url: str,
+    timeout: int,
+    consumer: Optional[Callable[[bytes], None]] = None,
+    breaker_key: Optional[str] = None,
+    **kwargs: Any,
+) -> Tuple[httpx.Response, bytes]:
+    with _http_span(method, url), _upstream_guard(url, breaker_key):
+        async with upstream.session() as client:
+            async with client.stream(method, url, timeout=timeout, **kwargs) as resp:
+                resp.raise_for_status()
+                return resp, await upstream.read_limited(resp, consumer)
+
+
+async def _fetch_json(
+    url: str,
+    headers: Optional[Dict[str, str]] = None,
+    timeout: int = 6,
+    breaker_key: Optional[str] = None,
+) -> Any:
+    _, content = await _upstream_request("GET", url, timeout, breaker_key=breaker_key, headers=headers or {})
+    return json.loads(content)
+
+
+async def _fetch_text(url: str, headers: Optional[Dict[str, str]] = None, timeout: int = 6) -> str:
+    resp, content = await _upstream_request("GET", url, timeout, headers=headers or {})
+    return upstream.decode_text(resp, content)
+
+
+async def _fetch_stream(
+    url: str,
+    consumer: Callable[[bytes], None],
+    headers: Optional[Dict[str, str]] = None,
+    timeout: int = 6,
+    breaker_key: Optional[str] = None,
+) -> None:
+    await _upstream_request("GET", url, timeout, consumer, breaker_key, headers=headers or {})
 
 
 def _steam_openid_endpoint() -> str:
     return "https://steamcommunity.com/openid/login"
 
 
-def _request_json(
+async def _request_json(
     url: str,
     method: str = "GET",
     headers: Optional[Dict[str, str]] = None,
     payload: Optional[Dict[str, Any]] = None,
     timeout: int = 6,
 ) -> Any:
-    req_headers = headers.copy() if headers else {}
-    data = None
-    if payload is not None:
-        data = json.dumps(payload).encode("utf-8")
-        req_headers.setdefault("Content-Type", "application/json")
-    req = urllib.request.Request(url, data=data, headers=req_headers, method=method)
-    with urllib.request.urlopen(req, timeout=timeout) as resp:
-        body = resp.read().decode("utf-8")
-        return json.loads(body)
+    _, content = await _upstream_request(method, url, timeout, headers=headers or {}, json=payload)
+    return json.loads(content)
 
 
-def _request_form(url: str, payload: Dict[str, str], timeout: int = 6) -> str:
-    data = urllib.parse.urlencode(payload).encode("utf-8")
-    req = urllib.request.Request(url, data=data, method="POST")
-    with urllib.request.urlopen(req, timeout=timeout) as resp:
-        return resp.read().decode("utf-8")
+async def _request_form(url: str, payload: Dict[str, str], timeout: int = 6) -> str:
+    resp, content = await _upstream_request("POST", url, timeout, data=payload)
+    return upstream.decode_text(resp, content)
 
 
-def _request_raw(
+async def _request_raw(
     url: str,
     method: str = "GET",
     headers: Optional[Dict[str, str]] = None,
     timeout: int = 6,
 ) -> str:
-    req = urllib.request.Request(url, headers=headers or {}, method=method)
-    with urllib.request.urlopen(req, timeout=timeout) as resp:
-        return resp.read().decode("utf-8")
+    resp, content = await _upstream_request(method, url, timeout, headers=headers or {})
+    return upstream.decode_text(resp, content)
 
 
-def _parse_prometheus_metrics(payload: str) -> List[Dict[str, Any]]:
-    monitors: List[Dict[str, Any]] = []
-    for line in payload.splitlines():
-        if not line.startswith("monitor_status{"):
-            continue
-        try:
-            label_block, value = line.split("}")
-            labels_raw = label_block[len("monitor_status{") :]
-            label_pairs = []
-            current = ""
-            in_quotes = False
-            for char in labels_raw:
-                if char == '"':
-                    in_quotes = not in_quotes
-                if char == "," and not in_quotes:
-                    label_pairs.append(current)
-                    current = ""
-                else:
-                    current += char
-            if current:
-                label_pairs.append(current)
-            labels: Dict[str, str] = {}
-            for pair in label_pairs:
-                if "=" not in pair:
-                    continue
-                key, raw_val = pair.split("=", 1)
-                labels[key.strip()] = raw_val.strip().strip('"')
-            status_value = value.strip().split(" ")[-1]
-            status = int(float(status_value))
-            name = labels.get("monitor_name") or labels.get("monitor") or "Unknown"
-            monitors.append({"name": name, "status": status, "type": labels.get("monitor_type")})
-        except ValueError:
-            continue
-    return monitors
+def _parse_prometheus_metrics(payload: Union[str, bytes, Iterable[bytes]]) -> List[Dict[str, Any]]:
+    return parse_kuma_metrics(payload)
 
 
-def _fetch_kuma_summary(config: Dict[str, Any]) -> Dict[str, Any]:
+def _instrument_upstream(target: str) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
+    def decorator(func: Callable[..., Any]) -> Callable[..., Any]:
+        @functools.wraps(func)
+        async def wrapper(*args: Any, **kwargs: Any) -> Dict[str, Any]:
+            started = time.perf_counter()
+            try:
+                result = await func(*args, **kwargs)
+            except Exception:
+                metrics.UPSTREAM_SECONDS.observe(time.perf_counter() - started, target=target)
+                metrics.UPSTREAM_ERRORS.inc(target=target, reason="exception")
+                raise
+            reason = "" if result.get("ok") else str(result.get("reason") or "error")
+            if reason == "disabled" or reason.startswith("missing_"):
+                return result
+            metrics.UPSTREAM_SECONDS.observe(time.perf_counter() - started, target=target)
+            if reason:
+                metrics.UPSTREAM_ERRORS.inc(target=target, reason=reason)
+            return result
+
+        return wrapper
+
+    return decorator
+
+
+@_instrument_upstream("kuma")
+async def _fetch_kuma_summary(config: Dict[str, Any]) -> Dict[str, Any]:
     if not config.get("enabled"):
         return {"ok": False, "reason": "disabled"}
     base_url = (config.get("base_url") or "").rstrip("/")
@@ -390,11 +567,12 @@ def _fetch_kuma_summary(config: Dict[str, Any]) -> Dict[str, Any]:
     auth_header = (config.get("auth_header") or "").strip()
     if auth_header:
         headers["Authorization"] = auth_header
+    breaker_key = _upstream_instance(base_url)
     try:
         slug = (config.get("status_page_slug") or "").strip()
         if slug:
             url = f"{base_url}/api/status-page/{slug}"
-            data = _fetch_json(url, headers=headers, timeout=timeout)
+            data = await _fetch_json(url, headers=headers, timeout=timeout, breaker_key=breaker_key)
             status_list = data.get("statusList") or {}
             if isinstance(status_list, list):
                 status_list = {str(idx): value for idx, value in enumerate(status_list)}
@@ -415,88 +593,395 @@ def _fetch_kuma_summary(config: Dict[str, Any]) -> Dict[str, Any]:
         if not metrics_path.startswith("/"):
             metrics_path = "/" + metrics_path
         url = f"{base_url}{metrics_path}"
-        payload = _fetch_text(url, headers=headers, timeout=timeout)
-        monitors = _parse_prometheus_metrics(payload)
+        parser = KumaMetricsParser()
+        await _fetch_stream(url, parser.feed, headers=headers, timeout=timeout, breaker_key=breaker_key)
+        monitors = parser.close()
         return {"ok": True, "source": "metrics", "monitors": monitors}
-    except urllib.error.HTTPError as exc:
+    except CircuitOpenError as exc:
+        return {"ok": False, "reason": "circuit_open", "retry_after": round(exc.retry_after, 1)}
+    except upstream.ResponseTooLarge:
+        return {"ok": False, "reason": "response_too_large"}
+    except httpx.HTTPStatusError as exc:
         retry_after = None
-        if getattr(exc, "code", None) == 429:
-            retry_after = exc.headers.get("Retry-After") if exc.headers else None
-        payload: Dict[str, Any] = {"ok": False, "reason": f"http_{exc.code}"}
+        if exc.response.status_code in UPSTREAM_RETRY_AFTER_STATUSES:
+            retry_after = exc.response.headers.get("Retry-After")
+        payload: Dict[str, Any] = {"ok": False, "reason": f"http_{exc.response.status_code}"}
         if retry_after:
             payload["retry_after"] = retry_after
         return payload
-    except urllib.error.URLError:
+    except httpx.HTTPError:
         return {"ok": False, "reason": "unreachable"}
     except json.JSONDecodeError:
         return {"ok": False, "reason": "invalid_json"}
 
 
+_kuma_cache = TTLCache(KUMA_CACHE_TTL_SEC, stale_sec=KUMA_CACHE_STALE_SEC, max_entries=64)
+_kuma_aggregates: "OrderedDict[Tuple[int, ...], Tuple[Tuple[Any, ...], Dict[str, Any]]]" = OrderedDict()
+_encoded_payloads: "OrderedDict[int, Tuple[Any, bytes, str]]" = OrderedDict()
+
+
+def _retry_after_seconds(value: Any) -> Optional[float]:
+    if value is None:
+        return None
+    text = str(value).strip()
+    try:
+        return max(float(text), 0.0)
+    except ValueError:
+        pass
+    try:
+        when = email.utils.parsedate_to_datetime(text)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max((when - datetime.now(timezone.utc)).total_seconds(), 0.0)
+
+
+def _kuma_instances(config: Dict[str, Any]) -> List[Dict[str, Any]]:
+    shared = {
+        "enabled": True,
+        "metrics_path": config.get("metrics_path") or "/metrics",
+        "timeout_sec": config.get("timeout_sec") or 6,
+    }
+    entries: List[Dict[str, Any]] = []
+    if (config.get("base_url") or "").strip():
+        entries.append(config)
+    raw = config.get("instances") or []
+    for entry in raw.splitlines() if isinstance(raw, str) else raw:
+        if isinstance(entry, str):
+            line = entry.strip()
+            if not line or line.startswith("#"):
+                continue
+            entry = dict(zip(KUMA_INSTANCE_FIELDS, (part.strip() for part in line.split("|"))))
+        if isinstance(entry, dict):
+            entries.append(entry)
+    instances: List[Dict[str, Any]] = []
+    seen: set = set()
+    for entry in entries:
+        base_url = str(entry.get("base_url") or "").strip().rstrip("/")
+        slug = str(entry.get("status_page_slug") or "").strip()
+        if not base_url or (base_url, slug) in seen:
+            continue
+        seen.add((base_url, slug))
+        host = urllib.parse.urlsplit(base_url).netloc or base_url
+        instances.append(
+            {
+                **shared,
+                "base_url": base_url,
+                "status_page_slug": slug,
+                "auth_header": str(entry.get("auth_header") or "").strip(),
+                "name": str(entry.get("name") or "").strip() or (f"{host}/{slug}" if slug else host),
+            }
+        )
+    return instances
+
+
+def _kuma_history_samples(summary: Dict[str, Any]) -> List[Tuple[str, int, Optional[float]]]:
+    if "instances" not in summary and summary.get("stale"):
+        return []
+    fresh = {part["name"] for part in summary.get("instances") or [] if part.get("ok") and not part.get("stale")}
+    samples = []
+    for monitor in summary.get("monitors") or []:
+        name = monitor.get("name")
+        status = monitor.get("status")
+        if not name or not isinstance(status, int) or status not in KUMA_STATUS_SEVERITY:
+            continue
+        if "instances" in summary and not fresh.intersection(monitor.get("instances") or ()):
+            continue
+        samples.append((name, status, monitor.get("response_time_ms")))
+    return samples
+
+
+async def _record_kuma_history(summary: Dict[str, Any]) -> None:
+    runtime = _kuma_history_runtime
+    now = time.monotonic()
+    if not summary.get("ok") or summary is runtime["summary"] or now - runtime["recorded"] < KUMA_HISTORY_MIN_GAP_SEC:
+        return
+    try:
+        samples = _kuma_history_samples(summary)
+        if samples:
+            runtime.update(summary=summary, recorded=now)
+            await db.run("record_kuma_samples", db.record_kuma_samples, int(time.time()), samples)
+    except Exception:
+        logger.exception("Recording Kuma history failed.")
+
+
+async def _cached_kuma_instance(config: Dict[str, Any]) -> Dict[str, Any]:
+    key = json.dumps(config, sort_keys=True, default=str)
+
+    async def load() -> Dict[str, Any]:
+        summary = await _fetch_kuma_summary(config)
+        if summary.get("ok"):
+            summary["fetched_at"] = _to_utc_iso(datetime.now(timezone.utc))
+            return summary
+        retry_after = _retry_after_seconds(summary.get("retry_after"))
+        if retry_after:
+            _kuma_cache.defer(key, retry_after)
+        previous = _kuma_cache.peek(key)
+        if not previous or not previous.get("ok"):
+            return summary
+        stale = dict(previous)
+        stale["stale"] = True
+        stale["reason"] = summary.get("reason")
+        if "retry_after" in summary:
+            stale["retry_after"] = summary["retry_after"]
+        return stale
+
+    return await _kuma_cache.get(key, load)
+
+
+def _merge_kuma_summaries(instances: List[Dict[str, Any]], parts: List[Dict[str, Any]]) -> Dict[str, Any]:
+    monitors: Dict[str, Dict[str, Any]] = {}
+    statuses: List[Dict[str, Any]] = []
+    for instance, part in zip(instances, parts):
+        statuses.append(
+            {
+                "name": instance["name"],
+                "ok": bool(part.get("ok")),
+                "reason": part.get("reason"),
+                "stale": bool(part.get("stale")),
+                "source": part.get("source"),
+                "monitors": len(part.get("monitors") or []),
+            }
+        )
+        for monitor in part.get("monitors") or []:
+            name = monitor.get("name")
+            existing = monitors.get(name)
+            if existing is None:
+                monitors[name] = {**monitor, "instances": [instance["name"]]}
+                continue
+            existing["instances"].append(instance["name"])
+            if KUMA_STATUS_SEVERITY.get(monitor.get("status"), 0) > KUMA_STATUS_SEVERITY.get(existing.get("status"), 0):
+                existing.update({key: value for key, value in monitor.items() if key != "instances"})
+    ok_parts = [part for part in parts if part.get("ok")]
+    merged: Dict[str, Any] = {
+        "ok": bool(ok_parts),
+        "source": "aggregate",
+        "monitors": list(monitors.values()),
+        "instances": statuses,
+    }
+    if not ok_parts:
+        merged["reason"] = parts[0].get("reason") if parts else "no_instances"
+    elif len(ok_parts) < len(parts) or any(part.get("stale") for part in ok_parts):
+        merged["stale"] = True
+    fetched = [part["fetched_at"] for part in ok_parts if part.get("fetched_at")]
+    if fetched:
+        merged["fetched_at"] = min(fetched)
+    return merged
+
+
+async def _cached_kuma_summary(config: Dict[str, Any]) -> Dict[str, Any]:
+    summary = await _merged_kuma_summary(config)
+    await _record_kuma_history(summary)
+    return summary
+
+
+async def _merged_kuma_summary(config: Dict[str, Any]) -> Dict[str, Any]:
+    instances = _kuma_instances(config) if config.get("enabled") else []
+    if len(instances) <= 1:
+        return await _cached_kuma_instance(instances[0] if instances else config)
+    tasks = [asyncio.ensure_future(_cached_kuma_instance(instance)) for instance in instances]
+    await asyncio.wait(tasks, timeout=KUMA_AGGREGATE_WAIT_SEC)
+    parts: List[Dict[str, Any]] = []
+    for instance, task in zip(instances, tasks):
+        if task.done():
+            error = task.exception()
+            if error is not None:
+                logger.warning("Kuma instance %s failed: %r", instance["name"], error)
+            parts.append({"ok": False, "reason": "error"} if error is not None else task.result())
+            continue
+        task.add_done_callback(_consume_task_exception)
+        previous = _kuma_cache.peek(json.dumps(instance, sort_keys=True, default=str))
+        parts.append({**previous, "stale": True} if previous else {"ok": False, "reason": "pending"})
+    key = tuple(id(part) for part in parts)
+    cached = _kuma_aggregates.get(key)
+    if cached is not None and all(old is new for old, new in zip(cached[0], parts)):
+        return cached[1]
+    merged = _merge_kuma_summaries(instances, parts)
+    _kuma_aggregates[key] = (tuple(parts), merged)
+    while len(_kuma_aggregates) > ENCODED_PAYLOAD_CACHE_SIZE:
+        _kuma_aggregates.popitem(last=False)
+    return merged
+
+
+def _consume_task_exception(task: "asyncio.Future[Any]") -> None:
+    if not task.cancelled():
+        task.exception()
+
+
 def _pelican_headers(api_key: str) -> Dict[str, str]:
     return {
         "Authorization": f"Bearer {api_key}",
         "Accept": "Application/vnd.pterodactyl.v1+json",
     }
 
-def _fetch_pelican_schedules(config: Dict[str, Any]) -> Dict[str, Any]:
-    if not config.get("enabled"):
-        return {"ok": False, "reason": "disabled", "schedules": []}
-    base_url = (config.get("base_url") or "").rstrip("/")
-    if not base_url:
-        return {"ok": False, "reason": "missing_base_url", "schedules": []}
+def _pelican_servers(config: Dict[str, Any]) -> List[Dict[str, Any]]:
+    base_url = (config.get("base_url") or "").strip().rstrip("/")
     api_key = (config.get("api_key") or "").strip()
-    if not api_key:
-        return {"ok": False, "reason": "missing_api_key", "schedules": []}
-    server_id = (config.get("server_id") or "").strip()
-    if not server_id:
-        return {"ok": False, "reason": "missing_server_id", "schedules": []}
     timeout = int(config.get("timeout_sec") or 6)
+    entries: List[Any] = []
+    server_id = (config.get("server_id") or "").strip()
+    if server_id:
+        entries.append({"server_id": server_id, "server_name": config.get("server_name"), "legacy": True})
+    raw = config.get("servers") or []
+    for entry in raw.splitlines() if isinstance(raw, str) else raw:
+        if isinstance(entry, str):
+            line = entry.strip()
+            if not line or line.startswith("#"):
+                continue
+            entry = dict(zip(PELICAN_SERVER_FIELDS, (part.strip() for part in line.split("|"))))
+        if isinstance(entry, dict):
+            entries.append(entry)
+    servers: List[Dict[str, Any]] = []
+    seen: set = set()
+    for entry in entries:
+        server_id = str(entry.get("server_id") or "").strip()
+        url = (str(entry.get("base_url") or "").strip() or base_url).rstrip("/")
+        if not server_id or (url, server_id) in seen:
+            continue
+        seen.add((url, server_id))
+        servers.append(
+            {
+                "server_id": server_id,
+                "server_name": str(entry.get("server_name") or "").strip() or "Server",
+                "base_url": url,
+                "api_key": str(entry.get("api_key") or "").strip() or api_key,
+                "timeout_sec": timeout,
+                "source": "" if entry.get("legacy") else f"{urllib.parse.urlsplit(url).netloc}/{server_id}",
+            }
+        )
+    return servers
+
+
+def _pelican_schedule_source(schedule_id: str) -> str:
+    source, sep, _ = schedule_id.rpartition(PELICAN_SCHEDULE_SOURCE_SEP)
+    return source if sep else ""
+
+
+def _pelican_schedule(entry: Any, server: Dict[str, Any]) -> Dict[str, Any]:
+    attrs = entry.get("attributes", {}) if isinstance(entry, dict) else {}
+    cron_source = attrs.get("cron") if isinstance(attrs.get("cron"), dict) else attrs
 
-    url = f"{base_url}/api/client/servers/{server_id}/schedules"
+    def _cron_value(value: Any) -> str:
+        if value is None or value == "":
+            return "*"
+        return str(value)
+
+    cron = {
+        "minute": _cron_value(cron_source.get("minute")),
+        "hour": _cron_value(cron_source.get("hour")),
+        "day_of_month": _cron_value(cron_source.get("day_of_month")),
+        "month": _cron_value(cron_source.get("month")),
+        "day_of_week": _cron_value(cron_source.get("day_of_week")),
+    }
+    cron_expression = " ".join(
+        cron.get(key, "*") for key in ("minute", "hour", "day_of_month", "month", "day_of_week")
+    )
+    schedule_id = attrs.get("id") or attrs.get("uuid") or (entry.get("id") if isinstance(entry, dict) else None)
+    if schedule_id and server["source"]:
+        schedule_id = f"{server['source']}{PELICAN_SCHEDULE_SOURCE_SEP}{schedule_id}"
+    return {
+        "id": schedule_id,
+        "name": attrs.get("name") or "Schedule",
+        "cron": cron,
+        "cron_expression": cron_expression,
+        "is_active": attrs.get("is_active"),
+        "only_when_online": attrs.get("only_when_online"),
+        "updated_at": attrs.get("updated_at"),
+        "server_name": server["server_name"],
+        "source": server["source"],
+    }
+
+
+@_instrument_upstream("pelican")
+async def _fetch_pelican_server(server: Dict[str, Any]) -> Dict[str, Any]:
+    if not server["base_url"]:
+        return {"ok": False, "reason": "missing_base_url", "schedules": []}
+    if not server["api_key"]:
+        return {"ok": False, "reason": "missing_api_key", "schedules": []}
+    timeout = server["timeout_sec"]
+    url = f"{server['base_url']}/api/client/servers/{server['server_id']}/schedules"
     try:
-        data = _request_json(url, headers=_pelican_headers(api_key), timeout=timeout)
-        raw_list = data.get("data", []) if isinstance(data, dict) else []
-        schedules: List[Dict[str, Any]] = []
-        for entry in raw_list:
-            attrs = entry.get("attributes", {}) if isinstance(entry, dict) else {}
-            cron_source = attrs.get("cron") if isinstance(attrs.get("cron"), dict) else attrs
-            def _cron_value(value: Any) -> str:
-                if value is None or value == "":
-                    return "*"
-                return str(value)
-
-            cron = {
-                "minute": _cron_value(cron_source.get("minute")),
-                "hour": _cron_value(cron_source.get("hour")),
-                "day_of_month": _cron_value(cron_source.get("day_of_month")),
-                "month": _cron_value(cron_source.get("month")),
-                "day_of_week": _cron_value(cron_source.get("day_of_week")),
-            }
-            cron_expression = " ".join(
-                cron.get(key, "*") for key in ("minute", "hour", "day_of_month", "month", "day_of_week")
-            )
-            schedules.append(
-                {
-                    "id": attrs.get("id") or attrs.get("uuid") or entry.get("id"),
-                    "name": attrs.get("name") or "Schedule",
-                    "cron": cron,
-                    "cron_expression": cron_expression,
-                    "is_active": attrs.get("is_active"),
-                    "only_when_online": attrs.get("only_when_online"),
-                    "updated_at": attrs.get("updated_at"),
-                }
-            )
-        return {
-            "ok": True,
-            "schedules": schedules,
-            "source": "pelican",
-        }
-    except urllib.error.HTTPError as exc:
-        return {"ok": False, "reason": f"http_{exc.code}", "schedules": []}
-    except urllib.error.URLError:
+        data = await asyncio.wait_for(
+            _request_json(url, headers=_pelican_headers(server["api_key"]), timeout=timeout),
+            timeout,
+        )
+    except asyncio.TimeoutError:
+        _upstream_breakers.get(_upstream_host(url)).record_failure("timeout")
+        return {"ok": False, "reason": "timeout", "schedules": []}
+    except CircuitOpenError as exc:
+        return {"ok": False, "reason": "circuit_open", "retry_after": round(exc.retry_after, 1), "schedules": []}
+    except upstream.ResponseTooLarge:
+        return {"ok": False, "reason": "response_too_large", "schedules": []}
+    except httpx.HTTPStatusError as exc:
+        payload: Dict[str, Any] = {"ok": False, "reason": f"http_{exc.response.status_code}", "schedules": []}
+        if exc.response.status_code in UPSTREAM_RETRY_AFTER_STATUSES:
+            retry_after = _retry_after_seconds(exc.response.headers.get("Retry-After"))
+            if retry_after is not None:
+                payload["retry_after"] = round(retry_after, 1)
+        return payload
+    except httpx.HTTPError:
         return {"ok": False, "reason": "unreachable", "schedules": []}
     except json.JSONDecodeError:
         return {"ok": False, "reason": "invalid_json", "schedules": []}
+    raw_list = data.get("data", []) if isinstance(data, dict) else []
+    return {"ok": True, "schedules": [_pelican_schedule(entry, server) for entry in raw_list]}
+
+
+async def _fetch_pelican_schedules(config: Dict[str, Any]) -> Dict[str, Any]:
+    if not config.get("enabled"):
+        return {"ok": False, "reason": "disabled", "schedules": []}
+    servers = _pelican_servers(config)
+    if not servers:
+        if not (config.get("base_url") or "").strip():
+            return {"ok": False, "reason": "missing_base_url", "schedules": []}
+        if not (config.get("api_key") or "").strip():
+            return {"ok": False, "reason": "missing_api_key", "schedules": []}
+        return {"ok": False, "reason": "missing_server_id", "schedules": []}
+    try:
+        concurrency = max(int(config.get("fetch_concurrency") or PELICAN_FETCH_DEFAULT_CONCURRENCY), 1)
+    except (TypeError, ValueError):
+        concurrency = PELICAN_FETCH_DEFAULT_CONCURRENCY
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def fetch(server: Dict[str, Any]) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        async with semaphore:
+            started = time.perf_counter()
+            result = await _fetch_pelican_server(server)
+        status = {
+            "server_id": server["server_id"],
+            "server_name": server["server_name"],
+            "panel": urllib.parse.urlsplit(server["base_url"]).netloc,
+            "ok": bool(result.get("ok")),
+            "reason": result.get("reason"),
+            "schedules": len(result.get("schedules") or []),
+            "duration_ms": round((time.perf_counter() - started) * 1000, 1),
+        }
+        return result, status
+
+    outcomes = await asyncio.gather(*(fetch(server) for server in servers))
+    schedules: List[Dict[str, Any]] = []
+    failed_sources: List[str] = []
+    for (result, _), server in zip(outcomes, servers):
+        if result.get("ok"):
+            schedules.extend(result["schedules"])
+        else:
+            failed_sources.append(server["source"])
+    statuses = [status for _, status in outcomes]
+    if len(failed_sources) == len(servers):
+        reason = outcomes[0][0].get("reason")
+        failure: Dict[str, Any] = {"ok": False, "reason": reason, "schedules": [], "servers": statuses}
+        waits = [result["retry_after"] for result, _ in outcomes if result.get("retry_after") is not None]
+        if len(waits) == len(servers):
+            failure["retry_after"] = min(waits)
+        return failure
+    return {
+        "ok": True,
+        "schedules": schedules,
+        "source": "pelican",
+        "servers": statuses,
+        "failed_sources": failed_sources,
+    }
 
 
 def _calendar_window(now: Optional[datetime] = None) -> Tuple[datetime, datetime]:
@@ -538,181 +1023,50 @@ def _parse_schedule_label(name: str, server_name: str) -> Tuple[str, str, str]:
     return game_name, event_name, kind
 
 
-def _parse_cron_field(
-    value: Any,
-    min_value: int,
-    max_value: int,
-    mapping: Optional[Dict[str, int]] = None,
-    normalize: Optional[Any] = None,
-    wrap: bool = False,
-) -> Dict[str, Any]:
-    raw = "" if value is None else str(value).strip().lower()
-    if not raw or raw in {"*", "?"}:
-        return {"all": True, "values": []}
-    normalize_fn = normalize or (lambda num: num)
-    mapping = mapping or {}
-    values: set[int] = set()
-
-    def resolve_token(token: str) -> Optional[int]:
-        if not token:
-            return None
-        token = token.strip().lower()
-        if token in mapping:
-            return int(mapping[token])
-        if token == "*":
-            return None
-        try:
-            return int(token)
-        except ValueError:
-            return None
-
-    def add_value(num: int) -> None:
-        normalized = normalize_fn(num)
-        if not isinstance(normalized, int):
-            return
-        if normalized < min_value or normalized > max_value:
-            return
-        values.add(normalized)
-
-    for part in [chunk.strip() for chunk in raw.split(",") if chunk.strip()]:
-        range_part, step_part = (part.split("/", 1) + [""])[:2]
-        step = 1
-        if step_part:
-            try:
-                step = int(step_part)
-            except ValueError:
-                continue
-            if step <= 0:
-                continue
-
-        if range_part == "*":
-            start = min_value
-            end = max_value
-        elif "-" in range_part:
-            start_token, end_token = (segment.strip() for segment in range_part.split("-", 1))
-            start_value = resolve_token(start_token)
-            end_value = resolve_token(end_token)
-            if start_value is None or end_value is None:
-                continue
-            start = start_value
-            end = end_value
-        else:
-            single = resolve_token(range_part)
-            if single is None:
-                continue
-            start = single
-            end = single
-
-        if start > end and wrap:
-            for value in range(start, max_value + 1, step):
-                add_value(value)
-            for value in range(min_value, end + 1, step):
-                add_value(value)
-            continue
-
-        for value in range(start, end + 1, step):
-            add_value(value)
-
-    return {"all": False, "values": sorted(values)}
-
-
-def _build_time_slots(hour_field: Dict[str, Any], minute_field: Dict[str, Any]) -> List[Tuple[int, int]]:
-    hour_values = hour_field.get("values", [])
-    minute_values = minute_field.get("values", [])
-    if hour_field.get("all") and minute_field.get("all"):
-        return [(0, 0)]
-    if hour_field.get("all") and minute_values:
-        return [(0, int(minute_values[0]))]
-    if minute_field.get("all") and hour_values:
-        return [(int(hour_values[0]), 0)]
-    if hour_field.get("all") or minute_field.get("all"):
-        return [(0, 0)]
-    combos = [(int(hour), int(minute)) for hour in hour_values for minute in minute_values]
-    if not combos:
-        return []
-    if len(combos) > 8:
-        return [combos[0]]
-    return combos
-
-
 def _generate_schedule_occurrences(
     cron: Dict[str, Any],
     window_start: datetime,
     window_end: datetime,
+    limit: Optional[int] = None,
+    label: str = "",
+    since: Optional[datetime] = None,
 ) -> List[datetime]:
-    month_map = {
-        "jan": 1,
-        "feb": 2,
-        "mar": 3,
-        "apr": 4,
-        "may": 5,
-        "jun": 6,
-        "jul": 7,
-        "aug": 8,
-        "sep": 9,
-        "oct": 10,
-        "nov": 11,
-        "dec": 12,
-    }
-    weekday_map = {"sun": 0, "mon": 1, "tue": 2, "wed": 3, "thu": 4, "fri": 5, "sat": 6}
-    month_field = _parse_cron_field(cron.get("month", "*"), 1, 12, mapping=month_map)
-    day_of_week_field = _parse_cron_field(
-        cron.get("day_of_week", "*"),
-        0,
-        6,
-        mapping=weekday_map,
-        normalize=lambda value: 0 if value == 7 else value,
-        wrap=True,
-    )
-    hour_field = _parse_cron_field(cron.get("hour", "*"), 0, 23)
-    minute_field = _parse_cron_field(cron.get("minute", "*"), 0, 59)
+    expression = cron_expression(cron)
+    occurrences = occurrence_cache.get(expression, window_start, window_end)
+    if limit is not None and len(occurrences) > limit:
+        first = min(bisect.bisect_left(occurrences, since) if since else 0, len(occurrences) - limit)
+        logger.warning(
+            "Schedule %s (%s) fires %d times in the calendar window; keeping %d from %s.",
+            label or "?",
+            expression,
+            len(occurrences),
+            limit,
+            _to_utc_iso(occurrences[first]),
+        )
+        occurrences = occurrences[first : first + limit]
+    return list(occurrences)
 
-    occurrences: List[datetime] = []
-    cursor = window_start.date()
-    end_date = window_end.date()
 
-    while cursor < end_date:
-        if not month_field["all"] and cursor.month not in month_field["values"]:
-            cursor += timedelta(days=1)
-            continue
-        last_day = calendar.monthrange(cursor.year, cursor.month)[1]
-        day_of_month_field = _parse_cron_field(cron.get("day_of_month", "*"), 1, last_day)
-        day = cursor.day
-        utc_date = datetime(cursor.year, cursor.month, cursor.day, tzinfo=timezone.utc)
-        dow = (utc_date.weekday() + 1) % 7
-
-        dom_all = day_of_month_field["all"]
-        dow_all = day_of_week_field["all"]
-        dom_matches = dom_all or day in day_of_month_field["values"]
-        dow_matches = dow_all or dow in day_of_week_field["values"]
-
-        if dom_all and dow_all:
-            matches = True
-        elif dom_all:
-            matches = dow_matches
-        elif dow_all:
-            matches = dom_matches
-        else:
-            matches = dom_matches or dow_matches
+def _occurrence_cap_start(now: Optional[datetime] = None) -> datetime:
+    current = now or datetime.now(timezone.utc)
+    return datetime(current.year, current.month, current.day, tzinfo=timezone.utc)
+
 
-        if matches:
-            for hour, minute in _build_time_slots(hour_field, minute_field):
-                occurrence = datetime(cursor.year, cursor.month, cursor.day, hour, minute, tzinfo=timezone.utc)
-                if window_start <= occurrence < window_end:
-                    occurrences.append(occurrence)
+def _occurrences_capped(schedule: Dict[str, Any], window_start: datetime, window_end: datetime) -> bool:
+    expression = cron_expression(schedule.get("cron") or {})
+    return len(occurrence_cache.get(expression, window_start, window_end)) > PELICAN_MAX_OCCURRENCES_PER_SCHEDULE
 
-        cursor += timedelta(days=1)
 
-    return occurrences
+PAIR_MAX_DURATION = timedelta(hours=36)
 
 
 def _pair_schedule_occurrences(items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-    grouped: Dict[Tuple[str, str], Dict[str, List[Dict[str, Any]]]] = {}
+    grouped: Dict[Tuple[str, str, str], Dict[str, List[Dict[str, Any]]]] = {}
     events: List[Dict[str, Any]] = []
     for item in items:
         kind = item.get("kind")
         if kind in {"start", "stop"}:
-            key = (item["game_name"], item["event_name"])
+            key = (item.get("source", ""), item["game_name"], item["event_name"])
             grouped.setdefault(key, {"starts": [], "stops": []})
             if kind == "start":
                 grouped[key]["starts"].append(item)
@@ -724,43 +1078,27 @@ def _pair_schedule_occurrences(items: List[Dict[str, Any]]) -> List[Dict[str, An
     for group in grouped.values():
         starts = sorted(group["starts"], key=lambda value: value["occurrence"])
         stops = sorted(group["stops"], key=lambda value: value["occurrence"])
-        used_stops: set[int] = set()
+        unmatched_stops: List[Dict[str, Any]] = []
+        cursor = 0
         for start in starts:
-            chosen_index = None
-            for idx, stop in enumerate(stops):
-                if idx in used_stops:
-                    continue
-                if stop["occurrence"] <= start["occurrence"]:
-                    continue
-                if stop["occurrence"] - start["occurrence"] > timedelta(hours=36):
-                    continue
-                chosen_index = idx
-                break
-            if chosen_index is not None:
-                stop = stops[chosen_index]
-                used_stops.add(chosen_index)
-                events.append(
-                    {
-                        "schedule_id": start["schedule_id"],
-                        "game_name": start["game_name"],
-                        "event_name": start["event_name"],
-                        "occurrence": start["occurrence"],
-                        "stop_occurrence": stop["occurrence"],
-                    }
-                )
-            else:
-                events.append(
-                    {
-                        "schedule_id": start["schedule_id"],
-                        "game_name": start["game_name"],
-                        "event_name": start["event_name"],
-                        "occurrence": start["occurrence"],
-                        "stop_occurrence": None,
-                    }
-                )
-        for idx, stop in enumerate(stops):
-            if idx in used_stops:
-                continue
+            while cursor < len(stops) and stops[cursor]["occurrence"] <= start["occurrence"]:
+                unmatched_stops.append(stops[cursor])
+                cursor += 1
+            stop_occurrence = None
+            if cursor < len(stops) and stops[cursor]["occurrence"] - start["occurrence"] <= PAIR_MAX_DURATION:
+                stop_occurrence = stops[cursor]["occurrence"]
+                cursor += 1
+            events.append(
+                {
+                    "schedule_id": start["schedule_id"],
+                    "game_name": start["game_name"],
+                    "event_name": start["event_name"],
+                    "occurrence": start["occurrence"],
+                    "stop_occurrence": stop_occurrence,
+                }
+            )
+        unmatched_stops.extend(stops[cursor:])
+        for stop in unmatched_stops:
             events.append(
                 {
                     "schedule_id": stop["schedule_id"],
@@ -774,22 +1112,108 @@ def _pair_schedule_occurrences(items: List[Dict[str, Any]]) -> List[Dict[str, An
     return events
 
 
-def _sync_pelican_events(config: Dict[str, Any], force: bool = False) -> Dict[str, Any]:
-    window_start, window_end = _calendar_window()
-    result = _fetch_pelican_schedules(config)
+def _pelican_event_row(event: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "schedule_id": event["schedule_id"],
+        "game_name": event["game_name"],
+        "event_name": event["event_name"],
+        "start_utc": _to_utc_iso(event["occurrence"]),
+        "stop_utc": _to_utc_iso(event["stop_occurrence"]) if event.get("stop_occurrence") else None,
+        "description": "",
+        "created_by": "Pelican",
+    }
+
+
+async def _sync_pelican_events(config: Dict[str, Any], force: bool = False) -> Dict[str, Any]:
+    result = await _fetch_pelican_schedules(config)
     if not result.get("ok"):
         return result
-    schedules = result.get("schedules") or []
+    changes = await db.run(
+        "store_pelican_events",
+        _store_pelican_events,
+        config,
+        result.get("schedules") or [],
+        force,
+        result.get("failed_sources") or [],
+    )
+    result["events"] = changes.pop("total")
+    result["changes"] = changes
+    return result
+
+
+def _schedule_fingerprints(
+    schedules: List[Dict[str, Any]],
+    server_name: str,
+    window_start: datetime,
+    window_end: datetime,
+    since: Optional[datetime] = None,
+) -> Dict[str, str]:
+    groups: Dict[Tuple[str, ...], List[Dict[str, Any]]] = {}
+    for schedule in schedules:
+        schedule_id = schedule.get("id")
+        if not schedule_id:
+            continue
+        label_server = schedule.get("server_name") or server_name
+        game_name, event_name, kind = _parse_schedule_label(schedule.get("name") or "Schedule", label_server)
+        if kind in {"start", "stop"}:
+            group_key: Tuple[str, ...] = ("pair", schedule.get("source") or "", game_name, event_name)
+        else:
+            group_key = ("single", str(schedule_id))
+        groups.setdefault(group_key, []).append(schedule)
+    fingerprints: Dict[str, str] = {}
+    for members in groups.values():
+        window = [_to_utc_iso(window_start), _to_utc_iso(window_end), members[0].get("server_name") or server_name]
+        if since and any(_occurrences_capped(schedule, window_start, window_end) for schedule in members):
+            window.append(_to_utc_iso(since))
+        parts = sorted(
+            [
+                str(schedule.get("id")),
+                schedule.get("name") or "Schedule",
+                schedule.get("cron_expression") or json.dumps(schedule.get("cron") or {}, sort_keys=True),
+                str(schedule.get("updated_at") or ""),
+            ]
+            for schedule in members
+        )
+        digest = hashlib.sha1(json.dumps([window, parts]).encode("utf-8")).hexdigest()
+        for schedule in members:
+            fingerprints[str(schedule.get("id"))] = digest
+    return fingerprints
+
+
+def _store_pelican_events(
+    config: Dict[str, Any],
+    schedules: List[Dict[str, Any]],
+    force: bool,
+    failed_sources: Iterable[str] = (),
+) -> Dict[str, int]:
+    window_start, window_end = _calendar_window()
+    since = _occurrence_cap_start()
     server_name = (config.get("server_name") or "Server").strip() or "Server"
+    fingerprints = _schedule_fingerprints(schedules, server_name, window_start, window_end, since)
+    failed = set(failed_sources)
+    stored = db.get_schedule_fingerprints() if failed or not force else {}
+    changed = {
+        schedule_id
+        for schedule_id, fingerprint in fingerprints.items()
+        if force or stored.get(schedule_id) != fingerprint
+    }
+    preserved = {
+        schedule_id: fingerprint
+        for schedule_id, fingerprint in stored.items()
+        if schedule_id not in fingerprints and _pelican_schedule_source(schedule_id) in failed
+    }
+    fingerprints.update(preserved)
     occurrences: List[Dict[str, Any]] = []
     for schedule in schedules:
         schedule_id = schedule.get("id")
-        if not schedule_id:
+        if not schedule_id or str(schedule_id) not in changed:
             continue
         name = schedule.get("name") or "Schedule"
         cron = schedule.get("cron") or {}
-        game_name, event_name, kind = _parse_schedule_label(name, server_name)
-        for occurrence in _generate_schedule_occurrences(cron, window_start, window_end):
+        game_name, event_name, kind = _parse_schedule_label(name, schedule.get("server_name") or server_name)
+        for occurrence in _generate_schedule_occurrences(
+            cron, window_start, window_end, PELICAN_MAX_OCCURRENCES_PER_SCHEDULE, name, since
+        ):
             occurrences.append(
                 {
                     "schedule_id": str(schedule_id),
@@ -797,38 +1221,44 @@ def _sync_pelican_events(config: Dict[str, Any], force: bool = False) -> Dict[st
                     "event_name": event_name,
                     "kind": kind,
                     "occurrence": occurrence,
+                    "source": schedule.get("source") or "",
                 }
             )
 
     events = _pair_schedule_occurrences(occurrences)
-    start_iso = _to_utc_iso(window_start)
-    end_iso = _to_utc_iso(window_end)
-    db.delete_calendar_events_in_range(start_iso, end_iso, exclude_local=True, include_deleted=force)
-    for event in events:
-        game_id = db.get_or_create_game_id(event["game_name"])
-        db.upsert_calendar_event(
-            schedule_id=event["schedule_id"],
-            game_id=game_id,
-            event_name=event["event_name"],
-            start_utc=_to_utc_iso(event["occurrence"]),
-            stop_utc=_to_utc_iso(event["stop_occurrence"]) if event.get("stop_occurrence") else None,
-            description="",
-            created_by="Pelican",
-        )
-    result["events"] = len(events)
-    return result
+    counts = db.reconcile_calendar_events(
+        _to_utc_iso(window_start),
+        _to_utc_iso(window_end),
+        [_pelican_event_row(event) for event in events],
+        changed,
+        fingerprints,
+        include_deleted=force,
+    )
+    counts["changed_schedules"] = len(changed)
+    counts["skipped_schedules"] = len(fingerprints) - len(changed) - len(preserved)
+    counts["preserved_schedules"] = len(preserved)
+    return counts
 
 
-def _resync_pelican_source(config: Dict[str, Any], game: Dict[str, Any]) -> Dict[str, Any]:
-    result = _fetch_pelican_schedules(config)
+async def _resync_pelican_source(config: Dict[str, Any], game: Dict[str, Any]) -> Dict[str, Any]:
+    result = await _fetch_pelican_schedules(config)
     if not result.get("ok"):
         return result
+    if result.get("failed_sources"):
+        return {"ok": False, "reason": "partial_failure", "servers": result.get("servers", [])}
     game_name = (game.get("name") or "").strip()
     if not game_name:
         return {"ok": False, "reason": "missing_game"}
-    target_name = game_name.lower()
+    events = await db.run(
+        "store_pelican_source_events", _store_pelican_source_events, config, game, result.get("schedules") or []
+    )
+    return {"ok": True, "events": events}
+
+
+def _store_pelican_source_events(config: Dict[str, Any], game: Dict[str, Any], schedules: List[Dict[str, Any]]) -> int:
+    target_name = (game.get("name") or "").strip().lower()
     window_start, window_end = _calendar_window()
-    schedules = result.get("schedules") or []
+    since = _occurrence_cap_start()
     server_name = (config.get("server_name") or "Server").strip() or "Server"
     occurrences: List[Dict[str, Any]] = []
     for schedule in schedules:
@@ -837,10 +1267,12 @@ def _resync_pelican_source(config: Dict[str, Any], game: Dict[str, Any]) -> Dict
             continue
         name = schedule.get("name") or "Schedule"
         cron = schedule.get("cron") or {}
-        parsed_game, event_name, kind = _parse_schedule_label(name, server_name)
+        parsed_game, event_name, kind = _parse_schedule_label(name, schedule.get("server_name") or server_name)
         if parsed_game.strip().lower() != target_name:
             continue
-        for occurrence in _generate_schedule_occurrences(cron, window_start, window_end):
+        for occurrence in _generate_schedule_occurrences(
+            cron, window_start, window_end, PELICAN_MAX_OCCURRENCES_PER_SCHEDULE, name, since
+        ):
             occurrences.append(
                 {
                     "schedule_id": str(schedule_id),
@@ -848,29 +1280,266 @@ def _resync_pelican_source(config: Dict[str, Any], game: Dict[str, Any]) -> Dict
                     "event_name": event_name,
                     "kind": kind,
                     "occurrence": occurrence,
+                    "source": schedule.get("source") or "",
                 }
             )
 
     events = _pair_schedule_occurrences(occurrences)
-    db.delete_calendar_events_by_game(int(game["id"]))
-    for event in events:
-        db.upsert_calendar_event(
-            schedule_id=event["schedule_id"],
-            game_id=int(game["id"]),
-            event_name=event["event_name"],
-            start_utc=_to_utc_iso(event["occurrence"]),
-            stop_utc=_to_utc_iso(event["stop_occurrence"]) if event.get("stop_occurrence") else None,
-            description="",
-            created_by="Pelican",
-        )
-    return {"ok": True, "events": len(events)}
+    db.replace_calendar_events_for_game(int(game["id"]), [_pelican_event_row(event) for event in events])
+    return len(events)
+
+
+_pelican_sync_state: Dict[str, Any] = {
+    "ok": False,
+    "reason": "pending",
+    "events": 0,
+    "changes": {},
+    "failures": 0,
+    "last_sync": None,
+    "last_success": None,
+    "next_sync": None,
+    "failed_servers": [],
+}
+_pelican_sync_runtime: Dict[str, Any] = {"task": None, "wake": None, "lock": None}
+_stream_broker = StreamBroker()
+_stream_runtime: Dict[str, Any] = {"task": None, "wake": None, "calendar_etag": None}
+_kuma_history_runtime: Dict[str, Any] = {"task": None, "summary": None, "recorded": float("-inf")}
+
+
+def _pelican_sync_interval(config: Dict[str, Any]) -> float:
+    try:
+        interval = float(config.get("sync_interval_sec") or PELICAN_SYNC_DEFAULT_INTERVAL_SEC)
+    except (TypeError, ValueError):
+        interval = PELICAN_SYNC_DEFAULT_INTERVAL_SEC
+    return max(interval, PELICAN_SYNC_MIN_INTERVAL_SEC)
+
+
+def _pelican_sync_delay(config: Dict[str, Any], failures: int) -> float:
+    if failures:
+        delay = min(PELICAN_SYNC_RETRY_SEC * 2 ** (failures - 1), PELICAN_SYNC_MAX_BACKOFF_SEC)
+    else:
+        delay = _pelican_sync_interval(config)
+    jitter = delay * PELICAN_SYNC_JITTER_RATIO
+    return max(1.0, delay + random.uniform(-jitter, jitter))
+
+
+def _observe_pelican_sync(result: Dict[str, Any], seconds: float) -> None:
+    if result.get("ok"):
+        outcome = "ok"
+    elif result.get("reason") == "disabled":
+        outcome = "disabled"
+    else:
+        outcome = "error"
+    metrics.PELICAN_SYNC_SECONDS.observe(seconds, result=outcome)
+    if outcome != "ok":
+        return
+    metrics.PELICAN_SYNC_EVENTS.set(int(result.get("events") or 0))
+    metrics.PELICAN_SYNC_LAST_SUCCESS.set(time.time())
+    for change in ("inserted", "updated", "deleted", "unchanged"):
+        metrics.PELICAN_SYNC_CHANGES.inc(int((result.get("changes") or {}).get(change) or 0), change=change)
+
+
+def _calendar_sync_status() -> Dict[str, Any]:
+    state = _pelican_sync_state
+    keys = ("ok", "reason", "last_sync", "last_success", "next_sync", "changes", "failed_servers")
+    return {key: state[key] for key in keys}
+
+
+async def _calendar_etag() -> str:
+    window_start, _ = _calendar_window()
+    versions = await db.run("get_cache_versions", db.get_cache_versions, ("epoch", "calendar_events"))
+    return _etag_for("calendar", versions, _to_utc_iso(window_start), _calendar_sync_status())
+
+
+async def _load_calendar_payload() -> Dict[str, Any]:
+    window_start, window_end = _calendar_window()
+    status = _calendar_sync_status()
+    events = await db.run(
+        "list_calendar_events",
+        db.list_calendar_events,
+        start_utc=_to_utc_iso(window_start),
+        end_utc=_to_utc_iso(window_end),
+    )
+    sources = await db.run("list_games_with_stats", db.list_games_with_stats)
+    sources = [source for source in sources if source["active_count"]]
+    payload = {
+        "ok": bool(status["ok"]),
+        "reason": status["reason"],
+        "events": events,
+        "sources": sources,
+        "last_sync": status["last_sync"],
+        "last_success": status["last_success"],
+        "next_sync": status["next_sync"],
+        "changes": status["changes"],
+    }
+    if not status["ok"]:
+        payload["stale"] = True
+    return payload
+
+
+async def _publish_kuma() -> None:
+    config = (await db.run("load_settings", _load_settings)).get("kuma_config", {})
+    summary = await _cached_kuma_summary(config)
+    previous = _stream_broker.snapshot("kuma")
+    _stream_broker.set_snapshot("kuma", summary)
+    if previous is None:
+        _stream_broker.publish("kuma", {**summary, "full": True})
+        return
+    if previous is summary:
+        return
+    old_monitors = {monitor.get("name"): monitor for monitor in previous.get("monitors") or []}
+    new_monitors = {monitor.get("name"): monitor for monitor in summary.get("monitors") or []}
+    changed = [monitor for name, monitor in new_monitors.items() if old_monitors.get(name) != monitor]
+    removed = [name for name in old_monitors if name not in new_monitors]
+    header = {key: value for key, value in summary.items() if key not in {"monitors", "fetched_at"}}
+    previous_header = {key: value for key, value in previous.items() if key not in {"monitors", "fetched_at"}}
+    if changed or removed or header != previous_header:
+        _stream_broker.publish("kuma", {**header, "changed": changed, "removed": removed})
+
+
+async def _publish_calendar() -> None:
+    etag = await _calendar_etag()
+    if etag == _stream_runtime.get("calendar_etag"):
+        return
+    payload = await _load_calendar_payload()
+    _stream_runtime["calendar_etag"] = etag
+    previous = _stream_broker.snapshot("calendar")
+    _stream_broker.set_snapshot("calendar", payload)
+    if previous is None:
+        _stream_broker.publish("calendar", {**payload, "full": True})
+        return
+    old_events = {event["id"]: event for event in previous.get("events") or []}
+    new_events = {event["id"]: event for event in payload["events"]}
+    delta = {key: value for key, value in payload.items() if key != "events"}
+    delta["upserted"] = [event for event_id, event in new_events.items() if old_events.get(event_id) != event]
+    delta["removed"] = [event_id for event_id in old_events if event_id not in new_events]
+    _stream_broker.publish("calendar", delta)
+
+
+async def _stream_loop() -> None:
+    wake: asyncio.Event = _stream_runtime["wake"]
+    while True:
+        if _stream_broker.subscribers:
+            for publisher in (_publish_kuma, _publish_calendar):
+                try:
+                    await publisher()
+                except Exception:
+                    logger.exception("Stream publisher %s failed.", publisher.__name__)
+        try:
+            await asyncio.wait_for(wake.wait(), timeout=STREAM_POLL_SEC)
+        except asyncio.TimeoutError:
+            pass
+        wake.clear()
+
+
+def _close_stream_on_exit_signal() -> None:
+    if threading.current_thread() is not threading.main_thread():
+        return
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        previous = signal.getsignal(sig)
+        if not callable(previous):
+            continue
+
+        def handler(signum: int, frame: Any, previous: Callable[..., Any] = previous) -> None:
+            loop.call_soon_threadsafe(_stream_broker.close)
+            previous(signum, frame)
+
+        signal.signal(sig, handler)
+
+
+def _wake_stream() -> None:
+    wake = _stream_runtime.get("wake")
+    if wake is not None:
+        wake.set()
+
+
+async def _run_pelican_sync(config: Dict[str, Any], force: bool = False) -> Dict[str, Any]:
+    lock = _pelican_sync_runtime.get("lock") or asyncio.Lock()
+    async with lock:
+        started = time.perf_counter()
+        try:
+            with tracing.span("sync", "pelican"):
+                result = await _sync_pelican_events(config, force=force)
+        except Exception:
+            logger.exception("Pelican sync failed.")
+            result = {"ok": False, "reason": "sync_error"}
+        _observe_pelican_sync(result, time.perf_counter() - started)
+    state = _pelican_sync_state
+    state["ok"] = bool(result.get("ok"))
+    state["reason"] = result.get("reason")
+    state["last_sync"] = _to_utc_iso(datetime.now(timezone.utc))
+    state["failed_servers"] = [status["server_name"] for status in result.get("servers", []) if not status["ok"]]
+    if state["ok"]:
+        state["events"] = int(result.get("events") or 0)
+        state["changes"] = result.get("changes") or {}
+        state["failures"] = 0
+        state["last_success"] = state["last_sync"]
+    elif result.get("reason") == "disabled":
+        state["failures"] = 0
+    else:
+        state["failures"] += 1
+    _wake_stream()
+    return result
+
+
+async def _pelican_sync_loop() -> None:
+    wake: asyncio.Event = _pelican_sync_runtime["wake"]
+    while True:
+        try:
+            config = (await db.run("load_settings", _load_settings)).get("pelican_config", {})
+        except Exception:
+            logger.exception("Loading Pelican settings for sync failed.")
+            config = {}
+            result: Dict[str, Any] = {"ok": False, "reason": "settings_error"}
+            _pelican_sync_state.update(ok=False, reason=result["reason"])
+            _pelican_sync_state["failures"] += 1
+        else:
+            result = await _run_pelican_sync(config)
+        delay = max(_pelican_sync_delay(config, _pelican_sync_state["failures"]), float(result.get("retry_after") or 0))
+        _pelican_sync_state["next_sync"] = _to_utc_iso(datetime.now(timezone.utc) + timedelta(seconds=delay))
+        try:
+            await asyncio.wait_for(wake.wait(), timeout=delay)
+        except asyncio.TimeoutError:
+            pass
+        wake.clear()
+
+
+def _kuma_history_sample_sec() -> float:
+    try:
+        interval = float(os.environ.get(KUMA_HISTORY_SAMPLE_ENV, KUMA_HISTORY_SAMPLE_SEC))
+    except ValueError:
+        return float(KUMA_HISTORY_SAMPLE_SEC)
+    return max(interval, KUMA_HISTORY_MIN_GAP_SEC) if interval > 0 else 0.0
+
+
+async def _kuma_history_loop() -> None:
+    interval = _kuma_history_sample_sec()
+    if not interval:
+        return
+    while True:
+        await asyncio.sleep(interval)
+        if time.monotonic() - _kuma_history_runtime["recorded"] < interval:
+            continue
+        try:
+            config = (await db.run("load_settings", _load_settings)).get("kuma_config", {})
+            if config.get("enabled"):
+                await _cached_kuma_summary(config)
+        except Exception:
+            logger.exception("Kuma history sampling failed.")
+
+
+def _wake_pelican_sync() -> None:
+    wake = _pelican_sync_runtime.get("wake")
+    if wake is not None:
+        wake.set()
 
 
 @app.get("/", response_class=HTMLResponse)
 async def dashboard(request: Request) -> HTMLResponse:
-    widgets = _load_widgets()
-    settings = _load_settings()
-    return templates.TemplateResponse(
+    widgets = await db.run("load_widgets", _load_widgets)
+    settings = await db.run("load_settings", _load_settings)
+    return _render(
         "dashboard.html",
         {
             "request": request,
@@ -888,15 +1557,16 @@ async def dashboard(request: Request) -> HTMLResponse:
 async def admin_dashboard(request: Request) -> HTMLResponse:
     if not _is_admin(request):
         return RedirectResponse("/admin/login", status_code=303)
-    widgets = _load_widgets()
-    settings = _load_settings()
-    return templates.TemplateResponse(
+    widgets = await db.run("load_widgets", _load_widgets)
+    settings = await db.run("load_settings", _load_settings)
+    return _render(
         "admin.html",
         {
             "request": request,
             "title": APP_TITLE,
             "widgets": widgets,
             "settings": settings,
+            "breakers": _upstream_breakers.snapshot(),
             "is_admin": True,
             "is_authenticated": True,
             "is_root": _is_root(request),
@@ -909,14 +1579,14 @@ async def admin_dashboard(request: Request) -> HTMLResponse:
 async def login_page(request: Request) -> HTMLResponse:
     if _is_admin(request):
         return RedirectResponse("/admin", status_code=303)
-    return templates.TemplateResponse(
+    return _render(
         "login.html",
         {
             "request": request,
             "title": APP_TITLE,
             "is_admin": False,
             "is_authenticated": _is_authenticated(request),
-            "setup_available": not db.has_users(),
+            "setup_available": not await db.run("has_users", db.has_users),
             "oauth_google_enabled": "google" in oauth._clients,
             "oauth_discord_enabled": "discord" in oauth._clients,
             "oauth_steam_enabled": True,
@@ -927,18 +1597,32 @@ async def login_page(request: Request) -> HTMLResponse:
 
 @app.post("/admin/login")
 async def login(request: Request, username: str = Form(...), password: str = Form(...)) -> RedirectResponse:
-    user = db.get_user_by_username(username)
-    if not user or not _verify_password(password, user["password_hash"]):
+    user = await db.run("get_user_by_username", db.get_user_by_username, username)
+    try:
+        valid = bool(user) and await passwords.verify_password_async(password, user["password_hash"])
+    except passwords.PasswordHasherBusy:
+        return RedirectResponse("/admin/login?error=busy", status_code=303)
+    if not valid:
         return RedirectResponse("/admin/login?error=1", status_code=303)
+    if passwords.needs_rehash(user["password_hash"]):
+        try:
+            await db.run(
+                "update_user_password",
+                db.update_user_password,
+                user["username"],
+                await passwords.hash_password_async(password),
+            )
+        except passwords.PasswordHasherBusy:
+            logger.info("Password rehash for %s deferred; hasher busy.", user["username"])
     _login_user(request, user)
     return RedirectResponse("/admin" if _is_admin(request) else "/", status_code=303)
 
 
 @app.get("/admin/setup", response_class=HTMLResponse)
 async def setup_page(request: Request) -> HTMLResponse:
-    if db.has_users():
+    if await db.run("has_users", db.has_users):
         return RedirectResponse("/admin/login", status_code=303)
-    return templates.TemplateResponse(
+    return _render(
         "setup.html",
         {
             "request": request,
@@ -958,11 +1642,18 @@ async def setup_user(
     confirm_password: str = Form(...),
     timezone: str = Form("America/New_York"),
 ) -> RedirectResponse:
-    if db.has_users():
+    if await db.run("has_users", db.has_users):
         return RedirectResponse("/admin/login", status_code=303)
     if password != confirm_password:
         return RedirectResponse("/admin/setup?error=1", status_code=303)
-    db.create_user(username, _hash_password(password), role="root", timezone=timezone or "America/New_York")
+    await db.run(
+        "create_user",
+        db.create_user,
+        username,
+        await _hash_password(password),
+        role="root",
+        timezone=timezone or "America/New_York",
+    )
     _login_user(request, {"username": username, "role": "root", "timezone": timezone or "America/New_York"})
     return RedirectResponse("/admin", status_code=303)
 
@@ -979,8 +1670,9 @@ async def logout(request: Request) -> RedirectResponse:
 async def profile_page(request: Request) -> HTMLResponse:
     if not _is_authenticated(request):
         return RedirectResponse("/admin/login", status_code=303)
-    settings = _load_settings()
-    return templates.TemplateResponse(
+    settings = await db.run("load_settings", _load_settings)
+    oauth_allowlist = await db.run("oauth_allowlist_fields", _oauth_allowlist_fields) if _is_root(request) else {}
+    return _render(
         "profile.html",
         {
             "request": request,
@@ -990,6 +1682,7 @@ async def profile_page(request: Request) -> HTMLResponse:
             "is_root": _is_root(request),
             "user_timezone": request.session.get("timezone", "America/New_York"),
             "settings": settings,
+            "oauth_allowlist": oauth_allowlist,
         },
     )
 
@@ -1025,18 +1718,27 @@ async def oauth_callback(provider: str, request: Request) -> RedirectResponse:
             return RedirectResponse("/admin/login?error=oauth", status_code=303)
         check_payload = params.copy()
         check_payload["openid.mode"] = "check_authentication"
+        started = time.perf_counter()
         try:
-            response = _request_form(_steam_openid_endpoint(), check_payload, timeout=6)
-        except urllib.error.URLError:
+            response = await _request_form(_steam_openid_endpoint(), check_payload, timeout=6)
+        except CircuitOpenError:
+            metrics.UPSTREAM_ERRORS.inc(target="steam_openid", reason="circuit_open")
             return RedirectResponse("/admin/login?error=oauth", status_code=303)
+        except httpx.HTTPError:
+            metrics.UPSTREAM_ERRORS.inc(target="steam_openid", reason="unreachable")
+            return RedirectResponse("/admin/login?error=oauth", status_code=303)
+        finally:
+            metrics.UPSTREAM_SECONDS.observe(time.perf_counter() - started, target="steam_openid")
         if "is_valid:true" not in response:
             return RedirectResponse("/admin/login?error=oauth", status_code=303)
         claimed_id = params.get("openid.claimed_id", "")
         steam_id = claimed_id.rstrip("/").split("/")[-1] if claimed_id else ""
-        if not _oauth_allowed("steam", steam_id):
+        if not await db.run("oauth_allowed", _oauth_allowed, "steam", steam_id):
             return RedirectResponse("/admin/login?error=oauth_denied", status_code=303)
         username = f"steam:{steam_id}"
-        user = db.get_or_create_user(username, _hash_password(secrets.token_urlsafe(24)), role="user")
+        user = await db.run(
+            "get_or_create_user", db.get_or_create_user, username, passwords.make_unusable_password(), role="user"
+        )
         _login_user(request, user)
         return RedirectResponse("/admin" if _is_admin(request) else "/", status_code=303)
 
@@ -1053,75 +1755,156 @@ async def oauth_callback(provider: str, request: Request) -> RedirectResponse:
         userinfo = await client.parse_id_token(request, token)
         email = userinfo.get("email")
         subject = userinfo.get("sub")
-        if not _oauth_allowed("google", email):
+        if not await db.run("oauth_allowed", _oauth_allowed, "google", email):
             return RedirectResponse("/admin/login?error=oauth_denied", status_code=303)
         username = f"google:{subject}"
     elif provider == "discord":
         resp = await client.get("users/@me", token=token)
         userinfo = resp.json()
         discord_id = userinfo.get("id")
-        if not _oauth_allowed("discord", discord_id):
+        if not await db.run("oauth_allowed", _oauth_allowed, "discord", discord_id):
             return RedirectResponse("/admin/login?error=oauth_denied", status_code=303)
         username = f"discord:{discord_id}"
     else:
         return RedirectResponse("/admin/login?error=oauth", status_code=303)
 
-    user = db.get_or_create_user(username, _hash_password(secrets.token_urlsafe(24)), role="user")
+    user = await db.run(
+        "get_or_create_user", db.get_or_create_user, username, passwords.make_unusable_password(), role="user"
+    )
     _login_user(request, user)
     return RedirectResponse("/admin" if _is_admin(request) else "/", status_code=303)
 
 
 @app.get("/api/bootstrap")
-async def bootstrap() -> JSONResponse:
-    return JSONResponse({"widgets": _load_widgets(), "settings": _load_settings()})
+async def bootstrap(request: Request) -> Response:
+    versions = await db.run("get_cache_versions", db.get_cache_versions, ("epoch", "widgets", "settings"))
+    etag = _etag_for("bootstrap", versions)
+    not_modified = _not_modified(request, etag)
+    if not_modified is not None:
+        return not_modified
+    widgets = await db.run("load_widgets", _load_widgets)
+    settings = await db.run("load_settings", _load_settings)
+    return _json_response({"widgets": widgets, "settings": settings}, etag)
 
 
 @app.get("/api/kuma/summary")
-async def kuma_summary() -> JSONResponse:
-    config = _load_settings().get("kuma_config", {})
-    summary = _fetch_kuma_summary(config)
-    return JSONResponse(summary)
+async def kuma_summary(request: Request) -> Response:
+    config = (await db.run("load_settings", _load_settings)).get("kuma_config", {})
+    summary = await _cached_kuma_summary(config)
+    body, etag = _encode_json(summary)
+    not_modified = _not_modified(request, etag)
+    if not_modified is not None:
+        return not_modified
+    return Response(body, media_type="application/json", headers=_etag_headers(etag))
+
+
+def _uptime_pct(up: int, down: int) -> Optional[float]:
+    return round(up * 100 / (up + down), 3) if up + down else None
+
+
+def _average(total: int, count: int) -> Optional[float]:
+    return round(total / count, 1) if count else None
+
+
+def _kuma_history_series(rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    series: List[Dict[str, Any]] = []
+    for name, group in itertools.groupby(rows, key=lambda row: row["name"]):
+        points: List[List[Any]] = []
+        samples = up = down = response_sum = response_samples = 0
+        response_max: Optional[int] = None
+        for row in group:
+            samples += row["samples"]
+            up += row["up"]
+            down += row["down"]
+            response_sum += row["response_sum"]
+            response_samples += row["response_samples"]
+            if row["response_max"] is not None:
+                response_max = max(response_max or 0, row["response_max"])
+            points.append(
+                [
+                    row["bucket"],
+                    _uptime_pct(row["up"], row["down"]),
+                    _average(row["response_sum"], row["response_samples"]),
+                ]
+            )
+        series.append(
+            {
+                "name": name,
+                "uptime_pct": _uptime_pct(up, down),
+                "samples": samples,
+                "avg_response_ms": _average(response_sum, response_samples),
+                "max_response_ms": response_max,
+                "points": points,
+            }
+        )
+    return series
+
+
+@app.get("/api/kuma/history")
+async def kuma_history(request: Request) -> Response:
+    window = request.query_params.get("range") or KUMA_HISTORY_DEFAULT_RANGE
+    if window not in KUMA_HISTORY_RANGES:
+        raise HTTPException(status_code=400, detail=f"Range must be one of {', '.join(KUMA_HISTORY_RANGES)}")
+    span_sec, resolution = KUMA_HISTORY_RANGES[window]
+    names = sorted(set(request.query_params.getlist("monitor"))) or None
+    now = int(time.time())
+    start = now - span_sec
+    start -= start % resolution
+    versions = await db.run("get_cache_versions", db.get_cache_versions, ("epoch", "kuma_history"))
+    etag = _etag_for("kuma_history", versions, window, start, names)
+    not_modified = _not_modified(request, etag)
+    if not_modified is not None:
+        return not_modified
+    rows = await db.run("list_kuma_history", db.list_kuma_history, resolution, start, names)
+    payload = {
+        "ok": True,
+        "range": window,
+        "resolution_sec": resolution,
+        "start": start,
+        "end": now,
+        "fields": ["bucket", "uptime_pct", "avg_response_ms"],
+        "monitors": _kuma_history_series(rows),
+    }
+    return _json_response(payload, etag)
 
 
 @app.get("/api/pelican/schedules")
 async def pelican_schedules() -> JSONResponse:
-    config = _load_settings().get("pelican_config", {})
-    result = _fetch_pelican_schedules(config)
+    config = (await db.run("load_settings", _load_settings)).get("pelican_config", {})
+    result = await _fetch_pelican_schedules(config)
     return JSONResponse(result)
 
 
 @app.post("/api/pelican/resync")
 async def pelican_resync(_: None = Depends(require_admin)) -> JSONResponse:
-    config = _load_settings().get("pelican_config", {})
-    result = _sync_pelican_events(config, force=True)
+    config = (await db.run("load_settings", _load_settings)).get("pelican_config", {})
+    result = await _run_pelican_sync(config, force=True)
     return JSONResponse(
         {
             "ok": bool(result.get("ok")),
             "reason": result.get("reason"),
             "events": result.get("events", 0),
+            "changes": result.get("changes", {}),
+            "servers": result.get("servers", []),
         }
     )
 
 @app.get("/api/calendar/events")
-async def calendar_events() -> JSONResponse:
-    config = _load_settings().get("pelican_config", {})
-    sync_result = _sync_pelican_events(config)
-    window_start, window_end = _calendar_window()
-    events = db.list_calendar_events(
-        start_utc=_to_utc_iso(window_start),
-        end_utc=_to_utc_iso(window_end),
+async def calendar_events(request: Request) -> Response:
+    etag = await _calendar_etag()
+    not_modified = _not_modified(request, etag)
+    if not_modified is not None:
+        return not_modified
+    return _json_response(await _load_calendar_payload(), etag)
+
+
+@app.get("/api/stream")
+async def stream(request: Request) -> StreamingResponse:
+    return StreamingResponse(
+        _stream_broker.events(request.is_disconnected),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
     )
-    sources = db.list_games_with_stats()
-    sources = [source for source in sources if source["active_count"]]
-    payload = {
-        "ok": bool(sync_result.get("ok")),
-        "reason": sync_result.get("reason"),
-        "events": events,
-        "sources": sources,
-    }
-    if not sync_result.get("ok"):
-        payload["stale"] = True
-    return JSONResponse(payload)
 
 
 @app.post("/api/calendar/events")
@@ -1150,8 +1933,10 @@ async def create_calendar_event(request: Request, _: None = Depends(require_admi
             raise HTTPException(status_code=400, detail="Invalid time format")
     schedule_id = f"local_{uuid.uuid4().hex}"
     created_by = str(request.session.get("user") or "").strip()
-    game_id = db.get_or_create_game_id(game_name)
-    event_id = db.insert_calendar_event(
+    game_id = await db.run("get_or_create_game_id", db.get_or_create_game_id, game_name)
+    event_id = await db.run(
+        "insert_calendar_event",
+        db.insert_calendar_event,
         schedule_id=schedule_id,
         game_id=game_id,
         event_name=event_name,
@@ -1162,6 +1947,7 @@ async def create_calendar_event(request: Request, _: None = Depends(require_admi
     )
     if not event_id:
         raise HTTPException(status_code=500, detail="Failed to create event")
+    _wake_stream()
     return JSONResponse(
         {
             "ok": True,
@@ -1184,39 +1970,128 @@ async def create_calendar_event(request: Request, _: None = Depends(require_admi
 async def delete_calendar_event(
     event_id: int, request: Request, _: None = Depends(require_login)
 ) -> JSONResponse:
-    event = db.get_calendar_event_by_id(event_id)
+    event = await db.run("get_calendar_event_by_id", db.get_calendar_event_by_id, event_id)
     if not event or event.get("is_deleted"):
         raise HTTPException(status_code=404, detail="Event not found")
     if not _is_admin(request):
         creator = event.get("created_by")
         if not creator or creator != request.session.get("user"):
             raise HTTPException(status_code=403, detail="Not authorized")
-    db.mark_calendar_event_deleted(event_id)
+    await db.run("mark_calendar_event_deleted", db.mark_calendar_event_deleted, event_id)
+    _wake_stream()
     return JSONResponse({"ok": True})
 
 
 @app.delete("/api/calendar/sources/{game_id}")
 async def delete_calendar_source(game_id: int, _: None = Depends(require_admin)) -> JSONResponse:
-    game = db.get_game_by_id(game_id)
+    game = await db.run("get_game_by_id", db.get_game_by_id, game_id)
     if not game:
         raise HTTPException(status_code=404, detail="Source not found")
-    updated = db.mark_calendar_events_deleted_by_game(game_id)
+    updated = await db.run("mark_calendar_events_deleted_by_game", db.mark_calendar_events_deleted_by_game, game_id)
+    _wake_stream()
     return JSONResponse({"ok": True, "deleted": updated})
 
 
 @app.post("/api/calendar/sources/{game_id}/resync")
 async def resync_calendar_source(game_id: int, _: None = Depends(require_admin)) -> JSONResponse:
-    game = db.get_game_by_id(game_id)
+    game = await db.run("get_game_by_id", db.get_game_by_id, game_id)
     if not game:
         raise HTTPException(status_code=404, detail="Source not found")
-    config = _load_settings().get("pelican_config", {})
-    result = _resync_pelican_source(config, game)
+    config = (await db.run("load_settings", _load_settings)).get("pelican_config", {})
+    result = await _resync_pelican_source(config, game)
+    _wake_stream()
     return JSONResponse(result)
 
 
+def _cache_stats() -> Dict[str, Dict[str, Any]]:
+    return {
+        "kuma_summary": _kuma_cache.stats(),
+        "cron_occurrences": occurrence_cache.stats(),
+        **db.snapshot_stats(),
+    }
+
+
+metrics.gauge(
+    "uptime_atlas_cache_hit_ratio",
+    "Share of lookups served from an in-process cache.",
+    ("cache",),
+    collect=lambda: {(name,): stats["hit_ratio"] for name, stats in _cache_stats().items()},
+)
+metrics.gauge(
+    "uptime_atlas_stream_subscribers",
+    "Connected /api/stream clients.",
+    collect=lambda: {(): _stream_broker.subscribers},
+)
+metrics.gauge(
+    "uptime_atlas_upstream_circuit_state",
+    "Upstream circuit breaker state by host (0 closed, 1 half-open, 2 open).",
+    ("host",),
+    collect=lambda: {(host,): STATE_VALUES[state] for host, state in _upstream_breakers.states().items()},
+)
+
+
+@app.get("/api/cache/stats")
+async def cache_stats(_: None = Depends(require_admin)) -> JSONResponse:
+    return JSONResponse({**_cache_stats(), "stream": _stream_broker.stats()})
+
+
+@app.get("/api/upstream/breakers")
+async def list_upstream_breakers(_: None = Depends(require_admin)) -> JSONResponse:
+    return JSONResponse({"breakers": _upstream_breakers.snapshot()})
+
+
+@app.post("/api/upstream/breakers/reset")
+async def reset_upstream_breakers(request: Request, _: None = Depends(require_admin)) -> JSONResponse:
+    payload = await request.json()
+    if not isinstance(payload, dict):
+        raise HTTPException(status_code=400, detail="Invalid payload")
+    host = str(payload.get("host") or "").strip() or None
+    _upstream_breakers.reset(host)
+    _wake_pelican_sync()
+    _wake_stream()
+    return JSONResponse({"ok": True, "breakers": _upstream_breakers.snapshot()})
+
+
+@app.get("/api/traces")
+async def list_traces(_: None = Depends(require_admin)) -> JSONResponse:
+    return JSONResponse(tracing.TRACER.snapshot())
+
+
+@app.post("/api/traces/profile")
+async def arm_trace_profile(request: Request, _: None = Depends(require_admin)) -> JSONResponse:
+    payload = await request.json()
+    if not isinstance(payload, dict):
+        raise HTTPException(status_code=400, detail="Invalid payload")
+    path = str(payload.get("path") or "").strip()
+    if not path.startswith("/"):
+        raise HTTPException(status_code=400, detail="Path must start with /")
+    engine = tracing.TRACER.arm_profile(path, str(payload.get("engine") or "cprofile"))
+    return JSONResponse({"ok": True, "path": path, "engine": engine})
+
+
+@app.delete("/api/traces")
+async def clear_traces(_: None = Depends(require_admin)) -> JSONResponse:
+    tracing.TRACER.clear()
+    return JSONResponse({"ok": True})
+
+
+@app.get("/metrics")
+async def metrics_endpoint(request: Request) -> Response:
+    token = os.environ.get(METRICS_TOKEN_ENV)
+    authorization = request.headers.get("authorization", "").encode()
+    if not (token and secrets.compare_digest(authorization, f"Bearer {token}".encode())) and not _is_admin(request):
+        raise HTTPException(status_code=401, detail="Not authenticated")
+    return Response(metrics.render(), media_type=metrics.CONTENT_TYPE)
+
+
 @app.get("/api/widgets")
-async def widgets_api() -> JSONResponse:
-    return JSONResponse({"widgets": _load_widgets()})
+async def widgets_api(request: Request) -> Response:
+    versions = await db.run("get_cache_versions", db.get_cache_versions, ("epoch", "widgets"))
+    etag = _etag_for("widgets", versions)
+    not_modified = _not_modified(request, etag)
+    if not_modified is not None:
+        return not_modified
+    return _json_response({"widgets": await db.run("load_widgets", _load_widgets)}, etag)
 
 
 @app.post("/api/widgets/create")
@@ -1229,18 +2104,20 @@ async def create_widget(request: Request, _: None = Depends(require_admin)) -> J
     if not template:
         raise HTTPException(status_code=400, detail="Unknown widget")
 
-    widgets = db.get_widgets()
+    widgets = await db.run("get_widgets", db.get_widgets)
     existing = next((widget for widget in widgets if widget.get("widget_key") == widget_key), None)
     if existing:
         if not existing.get("enabled", True):
-            db.update_widget_enabled(widget_key, True)
+            await db.run("update_widget_enabled", db.update_widget_enabled, widget_key, True)
             return JSONResponse({"ok": True, "action": "enabled"})
         return JSONResponse({"ok": True, "action": "exists"})
 
     max_y = 0
     if widgets:
         max_y = max(widget["y"] + widget["h"] - 1 for widget in widgets)
-    db.upsert_widget(
+    await db.run(
+        "upsert_widget",
+        db.upsert_widget,
         widget_key=widget_key,
         enabled=True,
         x=1,
@@ -1272,7 +2149,7 @@ async def update_layout(request: Request, _: None = Depends(require_admin)) -> J
             }
         )
     if normalized:
-        db.update_widget_layouts(normalized)
+        await db.run("update_widget_layouts", db.update_widget_layouts, normalized)
     return JSONResponse({"ok": True})
 
 
@@ -1280,7 +2157,7 @@ async def update_layout(request: Request, _: None = Depends(require_admin)) -> J
 async def update_widget_enabled(widget_key: str, request: Request, _: None = Depends(require_admin)) -> JSONResponse:
     payload = await request.json()
     enabled = bool(payload.get("enabled")) if isinstance(payload, dict) else False
-    db.update_widget_enabled(widget_key, enabled)
+    await db.run("update_widget_enabled", db.update_widget_enabled, widget_key, enabled)
     return JSONResponse({"ok": True, "enabled": enabled})
 
 
@@ -1297,18 +2174,22 @@ async def update_settings(request: Request, _: None = Depends(require_admin)) ->
             continue
         merged = default_value.copy()
         merged.update(value)
-        db.set_setting(key, merged)
+        await db.run("set_setting", db.set_setting, key, merged)
+    if "pelican_config" in payload:
+        _wake_pelican_sync()
+    if "kuma_config" in payload:
+        _wake_stream()
     return JSONResponse({"ok": True})
 
 
 @app.get("/api/settings")
 async def get_settings(_: None = Depends(require_admin)) -> JSONResponse:
-    return JSONResponse(_load_settings())
+    return JSONResponse(await db.run("load_settings", _load_settings))
 
 
 @app.get("/api/users")
 async def list_users(_: None = Depends(require_root)) -> JSONResponse:
-    return JSONResponse({"users": db.list_users()})
+    return JSONResponse({"users": await db.run("list_users", db.list_users)})
 
 
 @app.post("/api/users/{username}/role")
@@ -1319,7 +2200,7 @@ async def update_user_role(username: str, request: Request, _: None = Depends(re
     role = payload.get("role")
     if role not in {"user", "admin", "root"}:
         raise HTTPException(status_code=400, detail="Invalid role")
-    db.update_user_role(username, role)
+    await db.run("update_user_role", db.update_user_role, username, role)
     return JSONResponse({"ok": True, "role": role})
 
 
@@ -1331,7 +2212,7 @@ async def update_user_timezone(username: str, request: Request, _: None = Depend
     timezone = str(payload.get("timezone") or "").strip()
     if not timezone:
         raise HTTPException(status_code=400, detail="Invalid timezone")
-    db.update_user_timezone(username, timezone)
+    await db.run("update_user_timezone", db.update_user_timezone, username, timezone)
     return JSONResponse({"ok": True, "timezone": timezone})
 
 
@@ -1344,7 +2225,7 @@ async def update_profile_timezone(request: Request, _: None = Depends(require_lo
     if not timezone:
         raise HTTPException(status_code=400, detail="Invalid timezone")
     username = request.session.get("user")
-    db.update_user_timezone(username, timezone)
+    await db.run("update_user_timezone", db.update_user_timezone, username, timezone)
     request.session["timezone"] = timezone
     return JSONResponse({"ok": True, "timezone": timezone})
 
@@ -1358,19 +2239,47 @@ async def update_profile_password(request: Request, _: None = Depends(require_lo
     new_password = str(payload.get("new_password") or "")
     if not current_password or not new_password:
         raise HTTPException(status_code=400, detail="Missing password")
-    user = db.get_user_by_username(request.session.get("user"))
-    if not user or not _verify_password(current_password, user["password_hash"]):
+    user = await db.run("get_user_by_username", db.get_user_by_username, request.session.get("user"))
+    if not user or not await _check_password(current_password, user["password_hash"]):
         raise HTTPException(status_code=400, detail="Invalid current password")
-    db.update_user_password(user["username"], _hash_password(new_password))
+    await db.run("update_user_password", db.update_user_password, user["username"], await _hash_password(new_password))
     return JSONResponse({"ok": True})
 
 
+@app.get("/api/oauth/allowlist")
+async def get_oauth_allowlist(_: None = Depends(require_root)) -> JSONResponse:
+    allowlist = await db.run("get_oauth_allowlist", db.get_oauth_allowlist)
+    return JSONResponse({provider: sorted(claims) for provider, claims in allowlist.items()})
+
+
 @app.post("/api/oauth/allowlist")
 async def update_oauth_allowlist(request: Request, _: None = Depends(require_root)) -> JSONResponse:
     payload = await request.json()
     if not isinstance(payload, dict):
         raise HTTPException(status_code=400, detail="Invalid payload")
-    merged = DEFAULT_SETTINGS["oauth_allowlist"].copy()
-    merged.update({key: str(payload.get(key, "") or "") for key in merged})
-    db.set_setting("oauth_allowlist", merged)
-    return JSONResponse({"ok": True})
+    changes: Dict[str, Dict[str, int]] = {}
+    for provider, field in db.OAUTH_ALLOWLIST_FIELDS.items():
+        if field in payload:
+            claims = db.split_allowlist(payload.get(field))
+            changes[provider] = await db.run("replace_oauth_allowlist", db.replace_oauth_allowlist, provider, claims)
+    return JSONResponse({"ok": True, "changes": changes})
+
+
+@app.post("/api/oauth/allowlist/{provider}")
+async def add_oauth_allowlist_entry(provider: str, request: Request, _: None = Depends(require_root)) -> JSONResponse:
+    if provider not in db.OAUTH_ALLOWLIST_FIELDS:
+        raise HTTPException(status_code=404, detail="Unknown provider")
+    payload = await request.json()
+    claim = str(payload.get("claim") or "").strip() if isinstance(payload, dict) else ""
+    if not claim:
+        raise HTTPException(status_code=400, detail="Missing claim")
+    added = await db.run("add_oauth_allowlist_entry", db.add_oauth_allowlist_entry, provider, claim)
+    return JSONResponse({"ok": True, "added": added})
+
+
+@app.delete("/api/oauth/allowlist/{provider}/{claim}")
+async def remove_oauth_allowlist_entry(provider: str, claim: str, _: None = Depends(require_root)) -> JSONResponse:
+    if provider not in db.OAUTH_ALLOWLIST_FIELDS:
+        raise HTTPException(status_code=404, detail="Unknown provider")
+    removed = await db.run("remove_oauth_allowlist_entry", db.remove_oauth_allowlist_entry, provider, claim.strip())
+    return JSONResponse({"ok": True, "removed": removed})
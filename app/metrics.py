@@ -0,0 +1,296 @@
+import bisect
+import math
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Awaitable, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, TypeVar
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SYNC_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+LabelValues = Tuple[str, ...]
+M = TypeVar("M", bound="_Metric")
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if value == int(value) and abs(value) < 1e15:
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, help_text: str, labels: Sequence[str] = ()) -> None:
+        self.name = name
+        self.help_text = help_text
+        self.label_names = tuple(labels)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, Any]) -> LabelValues:
+        return tuple(str(labels.get(name, "")) for name in self.label_names)
+
+    def samples(self) -> Iterable[Tuple[str, str, float]]:
+        return ()
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(f"{name}{labels} {_format_value(value)}" for name, labels, value in self.samples())
+        return lines
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, help_text: str, labels: Sequence[str] = ()) -> None:
+        super().__init__(name, help_text, labels)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: Any) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: Any) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def samples(self) -> Iterable[Tuple[str, str, float]]:
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, value in items:
+            yield self.name, _format_labels(self.label_names, key), value
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def __init__(
+        self,
+        name: str,
+        help_text: str,
+        labels: Sequence[str] = (),
+        collect: Optional[Callable[[], Dict[LabelValues, float]]] = None,
+    ) -> None:
+        super().__init__(name, help_text, labels)
+        self._values: Dict[LabelValues, float] = {}
+        self._collect = collect
+
+    def set(self, value: float, **labels: Any) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = float(value)
+
+    def samples(self) -> Iterable[Tuple[str, str, float]]:
+        if self._collect is not None:
+            values = dict(self._collect())
+        else:
+            with self._lock:
+                values = dict(self._values)
+        for key, value in sorted(values.items()):
+            yield self.name, _format_labels(self.label_names, key), value
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help_text: str,
+        labels: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> None:
+        super().__init__(name, help_text, labels)
+        self.buckets = tuple(sorted(buckets))
+        self._values: Dict[LabelValues, List[float]] = {}
+
+    def observe(self, value: float, **labels: Any) -> None:
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = [0.0] * (len(self.buckets) + 2)
+                self._values[key] = state
+            state[index] += 1
+            state[-1] += value
+
+    @contextmanager
+    def time(self, **labels: Any) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def samples(self) -> Iterable[Tuple[str, str, float]]:
+        with self._lock:
+            items = sorted((key, list(state)) for key, state in self._values.items())
+        for key, state in items:
+            cumulative = 0.0
+            for bound, count in zip(self.buckets + (math.inf,), state[:-1]):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                yield f"{self.name}_bucket", _format_labels(self.label_names, key, le), cumulative
+            labels = _format_labels(self.label_names, key)
+            yield f"{self.name}_sum", labels, state[-1]
+            yield f"{self.name}_count", labels, cumulative
+
+
+class Registry:
+    def __init__(self) -> None:
+        self._metrics: Dict[str, _Metric] = {}
+
+    def register(self, metric: M) -> M:
+        self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+
+def counter(name: str, help_text: str, labels: Sequence[str] = ()) -> Counter:
+    return REGISTRY.register(Counter(name, help_text, labels))
+
+
+def gauge(
+    name: str,
+    help_text: str,
+    labels: Sequence[str] = (),
+    collect: Optional[Callable[[], Dict[LabelValues, float]]] = None,
+) -> Gauge:
+    return REGISTRY.register(Gauge(name, help_text, labels, collect))
+
+
+def histogram(
+    name: str,
+    help_text: str,
+    labels: Sequence[str] = (),
+    buckets: Sequence[float] = DEFAULT_BUCKETS,
+) -> Histogram:
+    return REGISTRY.register(Histogram(name, help_text, labels, buckets))
+
+
+HTTP_REQUEST_SECONDS = histogram(
+    "uptime_atlas_http_request_duration_seconds",
+    "HTTP request latency by route template, method and status.",
+    ("route", "method", "status"),
+)
+DB_CALL_SECONDS = histogram(
+    "uptime_atlas_db_call_duration_seconds",
+    "Time spent running a database operation on the DB executor.",
+    ("operation",),
+)
+DB_QUEUE_SECONDS = histogram(
+    "uptime_atlas_db_queue_wait_seconds",
+    "Time a database call waited for a free DB executor thread.",
+)
+DB_ERRORS = counter(
+    "uptime_atlas_db_call_errors_total",
+    "Database operations that raised.",
+    ("operation",),
+)
+UPSTREAM_SECONDS = histogram(
+    "uptime_atlas_upstream_request_duration_seconds",
+    "Latency of calls to upstream integrations.",
+    ("target",),
+)
+UPSTREAM_ERRORS = counter(
+    "uptime_atlas_upstream_errors_total",
+    "Failed calls to upstream integrations by reason.",
+    ("target", "reason"),
+)
+UPSTREAM_CIRCUIT_OPENS = counter(
+    "uptime_atlas_upstream_circuit_opens_total",
+    "Times the circuit breaker for an upstream host opened.",
+    ("host",),
+)
+UPSTREAM_CIRCUIT_REJECTED = counter(
+    "uptime_atlas_upstream_circuit_rejected_total",
+    "Upstream calls failed fast because the host's circuit was open.",
+    ("host",),
+)
+PELICAN_SYNC_SECONDS = histogram(
+    "uptime_atlas_pelican_sync_duration_seconds",
+    "Duration of Pelican calendar syncs by outcome.",
+    ("result",),
+    buckets=SYNC_BUCKETS,
+)
+PELICAN_SYNC_EVENTS = gauge(
+    "uptime_atlas_pelican_sync_events",
+    "Active Pelican events in the calendar window after the last successful sync.",
+)
+PELICAN_SYNC_CHANGES = counter(
+    "uptime_atlas_pelican_sync_changes_total",
+    "Calendar rows touched by Pelican syncs.",
+    ("change",),
+)
+PELICAN_SYNC_LAST_SUCCESS = gauge(
+    "uptime_atlas_pelican_sync_last_success_timestamp_seconds",
+    "Unix time of the last successful Pelican sync.",
+)
+
+PASSWORD_SECONDS = histogram(
+    "uptime_atlas_password_kdf_duration_seconds",
+    "Time from queueing a password hash or verify to its result, by operation.",
+    ("operation",),
+)
+PASSWORD_REJECTED = counter(
+    "uptime_atlas_password_kdf_rejected_total",
+    "Password operations refused because too many were already pending.",
+    ("operation",),
+)
+
+def render() -> str:
+    return REGISTRY.render()
+
+
+class MetricsMiddleware:
+    def __init__(self, app: Callable[..., Awaitable[None]], skip_routes: Iterable[str] = ()) -> None:
+        self.app = app
+        self.skip_routes = frozenset(skip_routes)
+
+    async def __call__(self, scope: Dict[str, Any], receive: Callable[..., Any], send: Callable[..., Any]) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        started = time.perf_counter()
+        status = 500
+
+        async def send_with_status(message: Dict[str, Any]) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            route = getattr(scope.get("route"), "path", None) or "unmatched"
+            if route not in self.skip_routes:
+                HTTP_REQUEST_SECONDS.observe(
+                    time.perf_counter() - started,
+                    route=route,
+                    method=scope.get("method", ""),
+                    status=status,
+                )
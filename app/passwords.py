@@ -0,0 +1,162 @@
+import asyncio
+import base64
+import binascii
+import hashlib
+import os
+import secrets
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional, Tuple, TypeVar
+from . import metrics
+
+PASSWORD_ALGORITHM_ENV = "UPTIME_ATLAS_PASSWORD_ALGORITHM"
+PASSWORD_ITERATIONS_ENV = "UPTIME_ATLAS_PASSWORD_ITERATIONS"
+PASSWORD_WORKERS_ENV = "UPTIME_ATLAS_PASSWORD_WORKERS"
+PASSWORD_MAX_PENDING_ENV = "UPTIME_ATLAS_PASSWORD_MAX_PENDING"
+ALGORITHMS = {"pbkdf2_sha256": "sha256", "pbkdf2_sha512": "sha512"}
+DEFAULT_ALGORITHM = "pbkdf2_sha256"
+DEFAULT_ITERATIONS = 120_000
+MIN_ITERATIONS = 10_000
+DEFAULT_WORKERS = 2
+DEFAULT_MAX_PENDING = 32
+SALT_BYTES = 16
+LEGACY_ITERATIONS = 120_000
+UNUSABLE_PREFIX = "!"
+
+T = TypeVar("T")
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+_pending = 0
+_pending_lock = threading.Lock()
+
+
+class PasswordHasherBusy(RuntimeError):
+    pass
+
+
+def _env_int(name: str, default: int, minimum: int) -> int:
+    try:
+        return max(int(os.environ.get(name, default)), minimum)
+    except ValueError:
+        return default
+
+
+def configured_algorithm() -> str:
+    algorithm = os.environ.get(PASSWORD_ALGORITHM_ENV, DEFAULT_ALGORITHM).strip().lower()
+    return algorithm if algorithm in ALGORITHMS else DEFAULT_ALGORITHM
+
+
+def configured_iterations() -> int:
+    return _env_int(PASSWORD_ITERATIONS_ENV, DEFAULT_ITERATIONS, MIN_ITERATIONS)
+
+
+def _b64encode(value: bytes) -> str:
+    return base64.b64encode(value).decode("ascii").rstrip("=")
+
+
+def _b64decode(value: str) -> bytes:
+    return base64.b64decode(value + "=" * (-len(value) % 4))
+
+
+def hash_password(password: str, algorithm: Optional[str] = None, iterations: Optional[int] = None) -> str:
+    algorithm = algorithm or configured_algorithm()
+    iterations = iterations or configured_iterations()
+    salt = secrets.token_bytes(SALT_BYTES)
+    digest = hashlib.pbkdf2_hmac(ALGORITHMS[algorithm], password.encode("utf-8"), salt, iterations)
+    return f"{algorithm}${iterations}${_b64encode(salt)}${_b64encode(digest)}"
+
+
+def make_unusable_password() -> str:
+    return UNUSABLE_PREFIX + secrets.token_urlsafe(24)
+
+
+def is_usable(encoded: str) -> bool:
+    return bool(encoded) and not encoded.startswith(UNUSABLE_PREFIX)
+
+
+def _decode(encoded: str) -> Optional[Tuple[str, int, bytes, bytes]]:
+    if "$" in encoded:
+        parts = encoded.split("$")
+        if len(parts) != 4 or parts[0] not in ALGORITHMS:
+            return None
+        try:
+            decoded = parts[0], int(parts[1]), _b64decode(parts[2]), _b64decode(parts[3])
+        except (ValueError, binascii.Error):
+            return None
+        return decoded if decoded[1] > 0 else None
+    try:
+        raw = base64.b64decode(encoded.encode("utf-8"))
+    except (ValueError, binascii.Error):
+        return None
+    if len(raw) < 17:
+        return None
+    return "legacy", LEGACY_ITERATIONS, raw[:16], raw[16:]
+
+
+def verify_password(password: str, encoded: str) -> bool:
+    if not is_usable(encoded):
+        return False
+    decoded = _decode(encoded)
+    if decoded is None:
+        return False
+    algorithm, iterations, salt, expected = decoded
+    digest_name = ALGORITHMS.get(algorithm, "sha256")
+    digest = hashlib.pbkdf2_hmac(digest_name, password.encode("utf-8"), salt, iterations)
+    return secrets.compare_digest(digest, expected)
+
+
+def needs_rehash(encoded: str) -> bool:
+    if not is_usable(encoded):
+        return False
+    decoded = _decode(encoded)
+    if decoded is None:
+        return True
+    algorithm, iterations, _, _ = decoded
+    return algorithm != configured_algorithm() or iterations < configured_iterations()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            workers = _env_int(PASSWORD_WORKERS_ENV, DEFAULT_WORKERS, 1)
+            _executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="uptime-atlas-kdf")
+        return _executor
+
+
+async def _run(operation: str, func: Callable[..., T], *args: Any) -> T:
+    global _pending
+    limit = _env_int(PASSWORD_MAX_PENDING_ENV, DEFAULT_MAX_PENDING, 1)
+    with _pending_lock:
+        if _pending >= limit:
+            metrics.PASSWORD_REJECTED.inc(operation=operation)
+            raise PasswordHasherBusy(f"{_pending} password operations already pending")
+        _pending += 1
+    started = time.perf_counter()
+    try:
+        return await asyncio.get_running_loop().run_in_executor(_get_executor(), func, *args)
+    finally:
+        with _pending_lock:
+            _pending -= 1
+        metrics.PASSWORD_SECONDS.observe(time.perf_counter() - started, operation=operation)
+
+
+async def hash_password_async(password: str) -> str:
+    return await _run("hash", hash_password, password)
+
+
+async def verify_password_async(password: str, encoded: str) -> bool:
+    if not is_usable(encoded):
+        return False
+    return await _run("verify", verify_password, password, encoded)
+
+
+def shutdown_executor() -> None:
+    global _executor
+    with _executor_lock:
+        executor = _executor
+        _executor = None
+    if executor is not None:
+        executor.shutdown(wait=True)
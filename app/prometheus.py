@@ -0,0 +1,108 @@
+import math
+import re
+from typing import Any, Dict, Iterable, List, Optional, Union
+
+KUMA_METRIC_FIELDS = {
+    b"monitor_status": "status",
+    b"monitor_response_time": "response_time_ms",
+    b"monitor_cert_days_remaining": "cert_days_remaining",
+    b"monitor_cert_is_valid": "cert_is_valid",
+}
+
+_SAMPLE_RE = re.compile(rb"^(monitor_[a-z_]+)\{(.*)\}[ \t]+([^\s}]+)", re.MULTILINE)
+_LABEL_RE = re.compile(r'([A-Za-z_][A-Za-z0-9_]*)[ \t]*=[ \t]*"([^"\\]*(?:\\.[^"\\]*)*)"')
+_ESCAPE_RE = re.compile(r"\\(.)")
+_ESCAPES = {"n": "\n", "\\": "\\", '"': '"'}
+
+
+def _parse_labels(block: bytes) -> Dict[str, str]:
+    text = block.decode("utf-8", "replace")
+    pairs = _LABEL_RE.findall(text)
+    if "\\" not in text:
+        return dict(pairs)
+    return {
+        key: _ESCAPE_RE.sub(lambda match: _ESCAPES.get(match.group(1), match.group(1)), value)
+        for key, value in pairs
+    }
+
+
+def _convert(field: str, raw: bytes) -> Optional[Any]:
+    try:
+        number = float(raw)
+    except ValueError:
+        return None
+    if math.isnan(number) or math.isinf(number):
+        return None
+    if field == "status":
+        return int(number)
+    if field == "cert_days_remaining":
+        return int(number)
+    if field == "cert_is_valid":
+        return bool(number)
+    return number
+
+
+class KumaMetricsParser:
+    def __init__(self) -> None:
+        self._buffer = b""
+        self._monitors: Dict[str, Dict[str, Any]] = {}
+        self._blocks: Dict[bytes, Dict[str, Any]] = {}
+
+    def feed(self, chunk: bytes) -> None:
+        if not chunk:
+            return
+        data = self._buffer + chunk if self._buffer else chunk
+        cut = data.rfind(b"\n") + 1
+        self._buffer = data[cut:]
+        if cut:
+            self._parse(data, cut)
+
+    def close(self) -> List[Dict[str, Any]]:
+        if self._buffer:
+            self._parse(self._buffer, len(self._buffer))
+            self._buffer = b""
+        return [monitor for monitor in self._monitors.values() if monitor["status"] is not None]
+
+    def _parse(self, data: bytes, end: int) -> None:
+        blocks = self._blocks
+        for metric, label_block, raw_value in _SAMPLE_RE.findall(data, 0, end):
+            field = KUMA_METRIC_FIELDS.get(metric)
+            if field is None:
+                continue
+            value = _convert(field, raw_value)
+            if value is None:
+                continue
+            monitor = blocks.get(label_block)
+            if monitor is None:
+                monitor = self._monitor(_parse_labels(label_block))
+                blocks[label_block] = monitor
+            monitor[field] = value
+
+    def _monitor(self, labels: Dict[str, str]) -> Dict[str, Any]:
+        name = labels.get("monitor_name") or labels.get("monitor") or "Unknown"
+        monitor = self._monitors.get(name)
+        if monitor is None:
+            monitor = {
+                "name": name,
+                "status": None,
+                "type": labels.get("monitor_type"),
+                "response_time_ms": None,
+                "cert_days_remaining": None,
+                "cert_is_valid": None,
+            }
+            self._monitors[name] = monitor
+        elif monitor["type"] is None:
+            monitor["type"] = labels.get("monitor_type")
+        return monitor
+
+
+def parse_kuma_metrics(payload: Union[str, bytes, Iterable[bytes]]) -> List[Dict[str, Any]]:
+    parser = KumaMetricsParser()
+    if isinstance(payload, str):
+        parser.feed(payload.encode("utf-8"))
+    elif isinstance(payload, (bytes, bytearray)):
+        parser.feed(bytes(payload))
+    else:
+        for chunk in payload:
+            parser.feed(chunk)
+    return parser.close()
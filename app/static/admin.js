@@ -51,7 +51,13 @@
       fetch("/api/kuma/summary")
         .then((res) => res.json())
         .then((payload) => {
-          if (payload.ok) {
+          if (payload.ok && payload.instances) {
+            const down = payload.instances.filter((instance) => !instance.ok);
+            testOutput.textContent = `Connected to ${payload.instances.length - down.length}/${payload.instances.length} instances.`;
+            if (down.length) {
+              testOutput.textContent += ` Failing: ${down.map((instance) => `${instance.name} (${instance.reason})`).join(", ")}.`;
+            }
+          } else if (payload.ok) {
             testOutput.textContent = `Connected via ${payload.source || "unknown"}.`;
           } else {
             testOutput.textContent = `Failed: ${payload.reason}`;
@@ -63,6 +69,51 @@
     });
   }
 
+  const breakerList = document.querySelector("[data-breaker-list]");
+  const breakerReset = document.querySelector("[data-reset-breakers]");
+  const renderBreakers = (breakers) => {
+    if (!breakerList) return;
+    breakerList.replaceChildren(
+      ...breakers.map((breaker) => {
+        const item = document.createElement("li");
+        item.dataset.state = breaker.state;
+        const name = document.createElement("span");
+        name.textContent = breaker.name;
+        const detail = document.createElement("span");
+        const parts = [breaker.state.replace("_", "-")];
+        if (breaker.state !== "closed") parts.push(`retry in ${Math.round(breaker.retry_after_sec)}s`);
+        if (breaker.last_failure) parts.push(breaker.last_failure);
+        detail.textContent = parts.join(" \u00b7 ");
+        item.append(name, detail);
+        return item;
+      })
+    );
+  };
+  if (breakerReset) {
+    breakerReset.addEventListener("click", () => {
+      breakerReset.disabled = true;
+      fetch("/api/upstream/breakers/reset", {
+        method: "POST",
+        headers: { "Content-Type": "application/json" },
+        body: JSON.stringify({}),
+      })
+        .then((res) => res.json())
+        .then((payload) => renderBreakers(payload.breakers || []))
+        .catch(() => null)
+        .finally(() => {
+          breakerReset.disabled = false;
+        });
+    });
+  }
+  if (breakerList) {
+    setInterval(() => {
+      fetch("/api/upstream/breakers")
+        .then((res) => res.json())
+        .then((payload) => renderBreakers(payload.breakers || []))
+        .catch(() => null);
+    }, 15000);
+  }
+
   const pelicanResyncButton = document.querySelector("[data-pelican-resync]");
   const pelicanStatus = document.querySelector("[data-pelican-status-msg]");
   if (pelicanResyncButton) {
@@ -72,6 +123,7 @@
       if (reason && reason.startsWith("missing_")) return "Resync failed: Pelican config incomplete.";
       if (reason === "http_401" || reason === "http_403") return "Resync failed: Pelican auth failed.";
       if (reason === "invalid_json") return "Resync failed: Pelican response invalid.";
+      if (reason === "circuit_open") return "Resync skipped: Pelican is backing off after repeated failures.";
       if (reason) return "Resync failed: Pelican offline.";
       return "Resync failed.";
     };
@@ -92,10 +144,14 @@
             return;
           }
           const count = Number(payload.events || 0);
+          const failed = (payload.servers || []).filter((server) => !server.ok);
           if (pelicanStatus) {
             pelicanStatus.textContent = count
               ? `Resync complete: ${count} events updated.`
               : "Resync complete.";
+            if (failed.length) {
+              pelicanStatus.textContent += ` Unreachable: ${failed.map((server) => server.server_name).join(", ")}.`;
+            }
           }
           if (window.UptimeAtlas?.refreshSchedules) window.UptimeAtlas.refreshSchedules();
           pelicanResyncButton.disabled = false;
@@ -34,6 +34,61 @@
   });
 })();
 
+(() => {
+  const validators = new Map();
+  window.UptimeAtlas = window.UptimeAtlas || {};
+  window.UptimeAtlas.fetchJSON = (url) => {
+    const cached = validators.get(url);
+    const headers = cached ? { "If-None-Match": cached.etag } : {};
+    return fetch(url, { headers, cache: "no-store" })
+      .then((res) => {
+        if (res.status === 304 && cached) return { changed: false, data: cached.data };
+        return res.json().then((data) => {
+          const etag = res.headers.get("ETag");
+          if (etag && res.ok) validators.set(url, { etag, data });
+          else validators.delete(url);
+          return { changed: true, data };
+        });
+      })
+      .catch((error) => {
+        validators.delete(url);
+        throw error;
+      });
+  };
+
+  const stream = { source: null, connected: false, handlers: {} };
+  const listen = (channel) => {
+    stream.source.addEventListener(channel, (event) => {
+      let message;
+      try {
+        message = JSON.parse(event.data);
+      } catch (error) {
+        return;
+      }
+      (stream.handlers[channel] || []).forEach((handler) => handler(message));
+    });
+  };
+  const connect = () => {
+    stream.source = new EventSource("/api/stream");
+    stream.source.addEventListener("open", () => {
+      stream.connected = true;
+    });
+    stream.source.addEventListener("error", () => {
+      stream.connected = false;
+    });
+    Object.keys(stream.handlers).forEach(listen);
+  };
+  window.UptimeAtlas.onStream = (channel, handler) => {
+    if (!("EventSource" in window)) return;
+    const isNew = !stream.handlers[channel];
+    stream.handlers[channel] = stream.handlers[channel] || [];
+    stream.handlers[channel].push(handler);
+    if (!stream.source) connect();
+    else if (isNew) listen(channel);
+  };
+  window.UptimeAtlas.streamConnected = () => stream.connected;
+})();
+
 (() => {
   const grid = document.getElementById("widgetGrid");
   if (!grid) return;
@@ -226,19 +281,41 @@
       const isUp = monitor.status === 1 || monitor.status === true;
       pill.className = `status-pill ${isUp ? "up" : "down"}`;
       pill.innerHTML = `<span>${monitor.name}</span><span>${isUp ? "Up" : "Down"}</span>`;
+      const details = [];
+      if (typeof monitor.response_time_ms === "number") details.push(`${Math.round(monitor.response_time_ms)} ms`);
+      if (typeof monitor.cert_days_remaining === "number") details.push(`cert ${monitor.cert_days_remaining}d`);
+      if (monitor.instances && monitor.instances.length) details.push(monitor.instances.join(", "));
+      if (details.length) pill.title = details.join(" · ");
       statusContainer.appendChild(pill);
     });
   };
 
   const fetchStatus = () => {
-    fetch("/api/kuma/summary")
-      .then((res) => res.json())
-      .then(render)
+    window.UptimeAtlas.fetchJSON("/api/kuma/summary")
+      .then(({ changed, data }) => {
+        if (changed) render(data);
+      })
       .catch(() => render({ ok: false, reason: "unreachable" }));
   };
 
+  let summary = null;
+  let monitorMap = new Map();
+  window.UptimeAtlas.onStream("kuma", (message) => {
+    if (message.full || !summary) {
+      summary = message;
+      monitorMap = new Map((message.monitors || []).map((monitor) => [monitor.name, monitor]));
+    } else {
+      summary = { ...summary, ...message };
+      (message.changed || []).forEach((monitor) => monitorMap.set(monitor.name, monitor));
+      (message.removed || []).forEach((name) => monitorMap.delete(name));
+    }
+    render({ ...summary, monitors: Array.from(monitorMap.values()) });
+  });
+
   fetchStatus();
-  setInterval(fetchStatus, 30000);
+  setInterval(() => {
+    if (!window.UptimeAtlas.streamConnected()) fetchStatus();
+  }, 30000);
 })();
 
 (() => {
@@ -822,6 +899,7 @@
   const statusLabel = (reason) => {
     if (!reason) return "";
     if (reason === "disabled") return "Pelican disabled";
+    if (reason === "pending") return "Pelican sync pending";
     if (reason.startsWith("missing_")) return "Pelican config incomplete";
     if (reason === "http_401" || reason === "http_403") return "Pelican auth failed";
     if (reason === "invalid_json") return "Pelican response invalid";
@@ -845,6 +923,7 @@
       }
       metaParts.push(`${eventCache.length} events · ${getTimezoneLabel()}`);
       meta.textContent = metaParts.join(" · ");
+      meta.title = payload.last_success ? `Last Pelican sync: ${new Date(payload.last_success).toLocaleString()}` : "";
     }
     refreshView();
   };
@@ -872,9 +951,10 @@
   };
 
   const fetchSchedules = () => {
-    fetch("/api/calendar/events")
-      .then((res) => res.json())
-      .then(render)
+    window.UptimeAtlas.fetchJSON("/api/calendar/events")
+      .then(({ changed, data }) => {
+        if (changed) render(data);
+      })
       .catch(() => render({ ok: false, reason: "unreachable" }));
   };
 
@@ -1186,8 +1266,25 @@
 
   cells.addEventListener("mouseleave", closeTooltip);
 
+  let streamPayload = null;
+  let streamEvents = new Map();
+  window.UptimeAtlas.onStream("calendar", (message) => {
+    if (message.full || !streamPayload) {
+      streamPayload = message;
+      streamEvents = new Map((message.events || []).map((item) => [item.id, item]));
+    } else {
+      streamPayload = { ...streamPayload, ...message };
+      (message.upserted || []).forEach((item) => streamEvents.set(item.id, item));
+      (message.removed || []).forEach((id) => streamEvents.delete(id));
+    }
+    const events = Array.from(streamEvents.values()).sort((a, b) => (a.start_utc < b.start_utc ? -1 : 1));
+    render({ ...streamPayload, events });
+  });
+
   fetchSchedules();
-  setInterval(fetchSchedules, 60000);
+  setInterval(() => {
+    if (!window.UptimeAtlas.streamConnected()) fetchSchedules();
+  }, 60000);
 })();
 
 (() => {
@@ -0,0 +1,112 @@
+import asyncio
+import itertools
+import json
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Optional, Set
+
+STREAM_QUEUE_SIZE = 32
+STREAM_HEARTBEAT_SEC = 15.0
+STREAM_RETRY_MS = 5000
+
+
+class StreamClient:
+    __slots__ = ("queue", "resync", "dropped")
+
+    def __init__(self, queue_size: int) -> None:
+        self.queue: "asyncio.Queue[Optional[str]]" = asyncio.Queue(maxsize=queue_size)
+        self.resync = True
+        self.dropped = 0
+
+
+class StreamBroker:
+    def __init__(self, queue_size: int = STREAM_QUEUE_SIZE, heartbeat_sec: float = STREAM_HEARTBEAT_SEC) -> None:
+        self.queue_size = queue_size
+        self.heartbeat_sec = heartbeat_sec
+        self._clients: Set[StreamClient] = set()
+        self._snapshots: Dict[str, Any] = {}
+        self._ids = itertools.count(1)
+        self.published = 0
+        self.dropped = 0
+        self.closed = False
+        self.on_subscribe: Optional[Callable[[], None]] = None
+
+    @property
+    def subscribers(self) -> int:
+        return len(self._clients)
+
+    def snapshot(self, channel: str) -> Optional[Any]:
+        return self._snapshots.get(channel)
+
+    def set_snapshot(self, channel: str, value: Any) -> None:
+        self._snapshots[channel] = value
+
+    def subscribe(self, client: StreamClient) -> None:
+        self._clients.add(client)
+        if self.on_subscribe is not None:
+            self.on_subscribe()
+
+    def unsubscribe(self, client: StreamClient) -> None:
+        self._clients.discard(client)
+
+    def close(self) -> None:
+        self.closed = True
+        for client in list(self._clients):
+            try:
+                client.queue.put_nowait(None)
+            except asyncio.QueueFull:
+                pass
+
+    def publish(self, channel: str, data: Any) -> None:
+        if not self._clients:
+            return
+        message = self._encode(channel, data)
+        self.published += 1
+        for client in list(self._clients):
+            try:
+                client.queue.put_nowait(message)
+            except asyncio.QueueFull:
+                self._overflow(client)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "subscribers": len(self._clients),
+            "published": self.published,
+            "dropped": self.dropped,
+            "queued": sum(client.queue.qsize() for client in self._clients),
+        }
+
+    async def events(self, is_disconnected: Callable[[], Awaitable[bool]]) -> AsyncIterator[str]:
+        client = StreamClient(self.queue_size)
+        try:
+            self.subscribe(client)
+            yield f"retry: {STREAM_RETRY_MS}\n\n"
+            while not self.closed:
+                if client.resync:
+                    client.resync = False
+                    for channel, value in list(self._snapshots.items()):
+                        yield self._encode(channel, {**value, "full": True})
+                try:
+                    message = await asyncio.wait_for(client.queue.get(), timeout=self.heartbeat_sec)
+                except asyncio.TimeoutError:
+                    if self.closed or await is_disconnected():
+                        return
+                    yield ": ping\n\n"
+                    continue
+                if message is not None and not self.closed:
+                    yield message
+        finally:
+            self.unsubscribe(client)
+
+    def _overflow(self, client: StreamClient) -> None:
+        while True:
+            try:
+                client.queue.get_nowait()
+            except asyncio.QueueEmpty:
+                break
+        client.resync = True
+        client.dropped += 1
+        self.dropped += 1
+        client.queue.put_nowait(None)
+
+    def _encode(self, channel: str, data: Any) -> str:
+        payload = json.dumps(data, separators=(",", ":"), default=str)
+        return f"id: {next(self._ids)}\nevent: {channel}\ndata: {payload}\n\n"
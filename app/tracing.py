@@ -0,0 +1,248 @@
+import contextvars
+import cProfile
+import io
+import logging
+import os
+import pstats
+import random
+import threading
+import time
+import uuid
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Deque, Dict, Iterable, Iterator, List, Optional
+
+try:
+    from pyinstrument import Profiler as PyinstrumentProfiler
+except ImportError:
+    PyinstrumentProfiler = None
+
+TRACE_SAMPLE_RATE_ENV = "UPTIME_ATLAS_TRACE_SAMPLE_RATE"
+TRACE_SLOW_MS_ENV = "UPTIME_ATLAS_TRACE_SLOW_MS"
+TRACE_BUFFER_ENV = "UPTIME_ATLAS_TRACE_BUFFER"
+DEFAULT_SLOW_MS = 500.0
+DEFAULT_BUFFER = 50
+MAX_SPANS = 256
+PROFILE_STATS_LINES = 40
+SPAN_KINDS = ("db", "http", "template", "sync")
+
+logger = logging.getLogger("uptime_atlas.tracing")
+
+_current: "contextvars.ContextVar[Optional[Trace]]" = contextvars.ContextVar("uptime_atlas_trace", default=None)
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.environ.get(name, default))
+    except ValueError:
+        return default
+
+
+class Trace:
+    __slots__ = ("id", "method", "path", "route", "status", "started_at", "started", "duration_ms", "spans", "dropped")
+
+    def __init__(self, method: str, path: str) -> None:
+        self.id = uuid.uuid4().hex[:16]
+        self.method = method
+        self.path = path
+        self.route = path
+        self.status = 0
+        self.started_at = datetime.now(timezone.utc).isoformat(timespec="milliseconds").replace("+00:00", "Z")
+        self.started = time.perf_counter()
+        self.duration_ms = 0.0
+        self.spans: List[Dict[str, Any]] = []
+        self.dropped = 0
+
+    def add_span(self, kind: str, name: str, started: float, duration: float) -> None:
+        if len(self.spans) >= MAX_SPANS:
+            self.dropped += 1
+            return
+        self.spans.append(
+            {
+                "kind": kind,
+                "name": name,
+                "start_ms": round((started - self.started) * 1000, 3),
+                "duration_ms": round(duration * 1000, 3),
+            }
+        )
+
+    def breakdown(self) -> Dict[str, Dict[str, float]]:
+        totals: Dict[str, Dict[str, float]] = {kind: {"ms": 0.0, "count": 0} for kind in SPAN_KINDS}
+        for span in self.spans:
+            entry = totals.setdefault(span["kind"], {"ms": 0.0, "count": 0})
+            entry["ms"] = round(entry["ms"] + span["duration_ms"], 3)
+            entry["count"] += 1
+        return totals
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "method": self.method,
+            "path": self.path,
+            "route": self.route,
+            "status": self.status,
+            "started_at": self.started_at,
+            "duration_ms": self.duration_ms,
+            "breakdown": self.breakdown(),
+            "spans": list(self.spans),
+            "dropped_spans": self.dropped,
+        }
+
+
+class Tracer:
+    def __init__(self) -> None:
+        self.sample_rate = 0.0
+        self.slow_ms = DEFAULT_SLOW_MS
+        self._lock = threading.Lock()
+        self._slow: Deque[Dict[str, Any]] = deque(maxlen=DEFAULT_BUFFER)
+        self._profiles: Deque[Dict[str, Any]] = deque(maxlen=DEFAULT_BUFFER)
+        self._armed: Dict[str, str] = {}
+        self.configure()
+
+    def configure(self) -> None:
+        self.sample_rate = min(max(_env_float(TRACE_SAMPLE_RATE_ENV, 0.0), 0.0), 1.0)
+        self.slow_ms = max(_env_float(TRACE_SLOW_MS_ENV, DEFAULT_SLOW_MS), 0.0)
+        size = max(int(_env_float(TRACE_BUFFER_ENV, DEFAULT_BUFFER)), 1)
+        with self._lock:
+            self._slow = deque(self._slow, maxlen=size)
+            self._profiles = deque(self._profiles, maxlen=size)
+
+    @property
+    def enabled(self) -> bool:
+        return self.sample_rate > 0 or bool(self._armed)
+
+    def arm_profile(self, path: str, engine: str = "cprofile") -> str:
+        if engine != "pyinstrument" or PyinstrumentProfiler is None:
+            engine = "cprofile"
+        with self._lock:
+            self._armed[path] = engine
+        return engine
+
+    def take_profile(self, path: str) -> Optional[str]:
+        if not self._armed:
+            return None
+        with self._lock:
+            return self._armed.pop(path, None)
+
+    def should_sample(self) -> bool:
+        return self.sample_rate > 0 and (self.sample_rate >= 1 or random.random() < self.sample_rate)
+
+    def record(self, trace: Trace, profile: Optional[Dict[str, Any]] = None) -> None:
+        slow = trace.duration_ms >= self.slow_ms
+        if slow:
+            breakdown = ", ".join(
+                f"{kind} {entry['ms']:.1f}ms/{int(entry['count'])}" for kind, entry in trace.breakdown().items()
+            )
+            logger.warning(
+                "Slow request %s %s %d %.1fms (%s)", trace.method, trace.path, trace.status, trace.duration_ms, breakdown
+            )
+        if not slow and profile is None:
+            return
+        payload = trace.to_dict()
+        with self._lock:
+            if slow:
+                self._slow.append(payload)
+            if profile is not None:
+                self._profiles.append({**profile, "trace": payload})
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "sample_rate": self.sample_rate,
+                "slow_ms": self.slow_ms,
+                "armed": dict(self._armed),
+                "pyinstrument": PyinstrumentProfiler is not None,
+                "slow": list(reversed(self._slow)),
+                "profiles": list(reversed(self._profiles)),
+            }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._slow.clear()
+            self._profiles.clear()
+
+
+TRACER = Tracer()
+
+
+def current() -> Optional[Trace]:
+    return _current.get()
+
+
+@contextmanager
+def span(kind: str, name: str) -> Iterator[None]:
+    trace = _current.get()
+    if trace is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        trace.add_span(kind, name, started, time.perf_counter() - started)
+
+
+class _Profile:
+    def __init__(self, engine: str) -> None:
+        self.engine = engine
+        if engine == "pyinstrument":
+            self._profiler: Any = PyinstrumentProfiler(async_mode="enabled")
+        else:
+            self._profiler = cProfile.Profile()
+
+    def start(self) -> None:
+        if self.engine == "pyinstrument":
+            self._profiler.start()
+        else:
+            self._profiler.enable()
+
+    def stop(self) -> Dict[str, Any]:
+        if self.engine == "pyinstrument":
+            self._profiler.stop()
+            return {"engine": self.engine, "output": self._profiler.output_text(unicode=False, color=False)}
+        self._profiler.disable()
+        stream = io.StringIO()
+        pstats.Stats(self._profiler, stream=stream).sort_stats("cumulative").print_stats(PROFILE_STATS_LINES)
+        return {"engine": self.engine, "output": stream.getvalue()}
+
+
+class TracingMiddleware:
+    def __init__(
+        self, app: Callable[..., Awaitable[None]], tracer: Tracer = TRACER, skip_paths: Iterable[str] = ()
+    ) -> None:
+        self.app = app
+        self.tracer = tracer
+        self.skip_paths = frozenset(skip_paths)
+
+    async def __call__(self, scope: Dict[str, Any], receive: Callable[..., Any], send: Callable[..., Any]) -> None:
+        if scope["type"] != "http" or not self.tracer.enabled or scope.get("path") in self.skip_paths:
+            await self.app(scope, receive, send)
+            return
+        engine = self.tracer.take_profile(scope.get("path", ""))
+        if engine is None and not self.tracer.should_sample():
+            await self.app(scope, receive, send)
+            return
+        trace = Trace(scope.get("method", ""), scope.get("path", ""))
+
+        async def send_with_status(message: Dict[str, Any]) -> None:
+            if message["type"] == "http.response.start":
+                trace.status = message["status"]
+            await send(message)
+
+        profiler = _Profile(engine) if engine else None
+        if profiler is not None:
+            try:
+                profiler.start()
+            except (RuntimeError, ValueError):
+                logger.warning("Profiler already active; tracing %s without a profile", trace.path)
+                profiler = None
+        token = _current.set(trace)
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            profile = profiler.stop() if profiler is not None else None
+            _current.reset(token)
+            trace.duration_ms = round((time.perf_counter() - trace.started) * 1000, 3)
+            trace.route = getattr(scope.get("route"), "path", None) or trace.path
+            self.tracer.record(trace, profile)
@@ -0,0 +1,96 @@
+import importlib.util
+import os
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Callable, List, Optional
+
+import httpx
+
+UPSTREAM_MAX_BYTES_ENV = "UPTIME_ATLAS_UPSTREAM_MAX_BYTES"
+UPSTREAM_MAX_CONNECTIONS_ENV = "UPTIME_ATLAS_UPSTREAM_MAX_CONNECTIONS"
+DEFAULT_MAX_BYTES = 32 * 1024 * 1024
+DEFAULT_MAX_CONNECTIONS = 32
+KEEPALIVE_EXPIRY_SEC = 60.0
+DEFAULT_TIMEOUT_SEC = 6.0
+USER_AGENT = "UptimeAtlas"
+
+_client: Optional[httpx.AsyncClient] = None
+
+
+class ResponseTooLarge(httpx.RequestError):
+    pass
+
+
+def _env_int(name: str, default: int, minimum: int) -> int:
+    try:
+        return max(int(os.environ.get(name, default)), minimum)
+    except ValueError:
+        return default
+
+
+def max_response_bytes() -> int:
+    return _env_int(UPSTREAM_MAX_BYTES_ENV, DEFAULT_MAX_BYTES, 1024)
+
+
+def http2_available() -> bool:
+    return importlib.util.find_spec("h2") is not None
+
+
+def build_client() -> httpx.AsyncClient:
+    connections = _env_int(UPSTREAM_MAX_CONNECTIONS_ENV, DEFAULT_MAX_CONNECTIONS, 1)
+    return httpx.AsyncClient(
+        http2=http2_available(),
+        follow_redirects=True,
+        timeout=DEFAULT_TIMEOUT_SEC,
+        limits=httpx.Limits(
+            max_connections=connections,
+            max_keepalive_connections=connections,
+            keepalive_expiry=KEEPALIVE_EXPIRY_SEC,
+        ),
+        headers={"User-Agent": USER_AGENT},
+    )
+
+
+def start() -> httpx.AsyncClient:
+    global _client
+    if _client is None or _client.is_closed:
+        _client = build_client()
+    return _client
+
+
+async def close() -> None:
+    global _client
+    client, _client = _client, None
+    if client is not None:
+        await client.aclose()
+
+
+@asynccontextmanager
+async def session() -> AsyncIterator[httpx.AsyncClient]:
+    if _client is not None and not _client.is_closed:
+        yield _client
+        return
+    async with build_client() as client:
+        yield client
+
+
+async def read_limited(response: httpx.Response, consumer: Optional[Callable[[bytes], None]] = None) -> bytes:
+    limit = max_response_bytes()
+    length = response.headers.get("Content-Length", "")
+    if length.isdigit() and int(length) > limit:
+        raise ResponseTooLarge(f"{response.url.host} sent {length} bytes (limit {limit})", request=response.request)
+    received = 0
+    chunks: List[bytes] = []
+    async for chunk in response.aiter_bytes():
+        received += len(chunk)
+        if received > limit:
+            raise ResponseTooLarge(f"{response.url.host} sent more than {limit} bytes", request=response.request)
+        if consumer is None:
+            chunks.append(chunk)
+        else:
+            consumer(chunk)
+    return b"".join(chunks)
+
+
+def decode_text(response: httpx.Response, content: bytes) -> str:
+    return content.decode(response.charset_encoding or "utf-8", errors="replace")
+
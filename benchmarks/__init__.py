@@ -0,0 +1 @@
+# Offline benchmarks for Uptime Atlas hot paths
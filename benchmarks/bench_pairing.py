@@ -0,0 +1,71 @@
+import argparse
+import json
+import random
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List
+
+from app.main import _pair_schedule_occurrences
+
+DEFAULT_SIZES = (1_000, 10_000, 100_000)
+
+
+def build_occurrences(count: int, seed: int = 7) -> List[Dict[str, Any]]:
+    rng = random.Random(seed)
+    base = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    items: List[Dict[str, Any]] = []
+    for index in range(count // 2):
+        start = base + timedelta(minutes=index * 2)
+        items.append(
+            {
+                "schedule_id": "start",
+                "game_name": "Game",
+                "event_name": "Session",
+                "kind": "start",
+                "occurrence": start,
+            }
+        )
+        items.append(
+            {
+                "schedule_id": "stop",
+                "game_name": "Game",
+                "event_name": "Session",
+                "kind": "stop",
+                "occurrence": start + timedelta(minutes=rng.randint(1, 90)),
+            }
+        )
+    rng.shuffle(items)
+    return items
+
+
+def run(sizes=DEFAULT_SIZES, repeat: int = 3) -> List[Dict[str, Any]]:
+    results: List[Dict[str, Any]] = []
+    for size in sizes:
+        items = build_occurrences(size)
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            _pair_schedule_occurrences(items)
+            timings.append(time.perf_counter() - started)
+        best = min(timings)
+        results.append(
+            {
+                "name": "pair_schedule_occurrences",
+                "size": size,
+                "best_sec": round(best, 6),
+                "per_item_us": round(best / size * 1_000_000, 3),
+            }
+        )
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark start/stop pairing scaling.")
+    parser.add_argument("--sizes", type=int, nargs="*", default=list(DEFAULT_SIZES))
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    print(json.dumps(run(args.sizes, args.repeat), indent=2))
+
+
+if __name__ == "__main__":
+    main()
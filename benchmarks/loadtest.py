@@ -0,0 +1,331 @@
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import ExitStack
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import httpx
+
+from .stubs import kuma_config, kuma_stub, pelican_config, pelican_stub
+
+DEFAULT_STAGES = (10, 25, 50, 100)
+DEFAULT_STAGE_SEC = 30.0
+DEFAULT_TIME_SCALE = 10.0
+KUMA_POLL_SEC = 30.0
+CALENDAR_POLL_SEC = 60.0
+PAGE_RELOAD_SEC = 600.0
+LAYOUT_SAVE_SEC = 20.0
+LOGIN_SEC = 300.0
+PAGE_ASSETS = ("/static/styles.css", "/static/app.js")
+OK_STATUSES = frozenset({200, 303, 304})
+PERCENTILES = (50, 90, 95, 99)
+ADMIN_USER = "loadtest"
+ADMIN_PASSWORD = "loadtest-password"
+SERVER_READY_SEC = 30.0
+
+Sample = Tuple[int, str, float, bool]
+
+
+class Recorder:
+    def __init__(self) -> None:
+        self.stage = 0
+        self.samples: List[Sample] = []
+        self.statuses: Dict[str, Dict[str, int]] = {}
+
+    async def request(
+        self,
+        client: httpx.AsyncClient,
+        label: str,
+        method: str,
+        url: str,
+        ok: Optional[Any] = None,
+        **kwargs: Any,
+    ) -> Optional[httpx.Response]:
+        stage = self.stage
+        started = time.perf_counter()
+        response: Optional[httpx.Response] = None
+        try:
+            response = await client.request(method, url, **kwargs)
+            status = str(response.status_code)
+            success = ok(response) if ok is not None else response.status_code in OK_STATUSES
+        except httpx.HTTPError as exc:
+            status = type(exc).__name__
+            success = False
+        self.samples.append((stage, label, time.perf_counter() - started, success))
+        counts = self.statuses.setdefault(label, {})
+        counts[status] = counts.get(status, 0) + 1
+        return response
+
+
+class Viewer:
+    def __init__(self, client: httpx.AsyncClient, recorder: Recorder, scale: float) -> None:
+        self.client = client
+        self.recorder = recorder
+        self.scale = scale
+        self.etags: Dict[str, str] = {}
+
+    async def poll(self, label: str, url: str) -> None:
+        headers = {"Cache-Control": "no-store"}
+        etag = self.etags.get(url)
+        if etag:
+            headers["If-None-Match"] = etag
+        response = await self.recorder.request(self.client, label, "GET", url, headers=headers)
+        if response is not None and response.status_code == 200 and response.headers.get("etag"):
+            self.etags[url] = response.headers["etag"]
+
+    async def page_load(self) -> None:
+        await self.recorder.request(self.client, "page", "GET", "/")
+        await asyncio.gather(*(self.recorder.request(self.client, "asset", "GET", path) for path in PAGE_ASSETS))
+        await asyncio.gather(
+            self.poll("kuma_poll", "/api/kuma/summary"),
+            self.poll("calendar_poll", "/api/calendar/events"),
+        )
+
+    async def every(self, interval: float, label: str, url: str) -> None:
+        while True:
+            await asyncio.sleep(interval / self.scale)
+            await self.poll(label, url)
+
+    async def run(self, spawn_window: float) -> None:
+        await asyncio.sleep(random.uniform(0, spawn_window))
+        await self.page_load()
+        pollers = [
+            asyncio.create_task(self.every(KUMA_POLL_SEC, "kuma_poll", "/api/kuma/summary")),
+            asyncio.create_task(self.every(CALENDAR_POLL_SEC, "calendar_poll", "/api/calendar/events")),
+        ]
+        try:
+            while True:
+                await asyncio.sleep(PAGE_RELOAD_SEC / self.scale * random.uniform(0.5, 1.5))
+                await self.page_load()
+        finally:
+            for task in pollers:
+                task.cancel()
+
+
+class Admin:
+    def __init__(self, base_url: str, recorder: Recorder, scale: float, username: str, password: str) -> None:
+        self.base_url = base_url
+        self.recorder = recorder
+        self.scale = scale
+        self.username = username
+        self.password = password
+        self.client: Optional[httpx.AsyncClient] = None
+
+    async def login(self) -> None:
+        if self.client is not None:
+            await self.client.aclose()
+        self.client = httpx.AsyncClient(base_url=self.base_url, timeout=30)
+        await self.recorder.request(
+            self.client,
+            "login",
+            "POST",
+            "/admin/login",
+            ok=lambda response: response.status_code == 303 and "error" not in response.headers.get("location", ""),
+            data={"username": self.username, "password": self.password},
+        )
+        await self.recorder.request(self.client, "admin_page", "GET", "/admin")
+
+    async def save_layout(self) -> None:
+        assert self.client is not None
+        layouts = [
+            {"widget_key": "kuma", "x": 1, "y": 1, "w": random.choice((5, 6)), "h": 4},
+            {"widget_key": "calendar", "x": 7, "y": 1, "w": 6, "h": random.choice((6, 7))},
+        ]
+        await self.recorder.request(self.client, "layout_save", "POST", "/api/widgets/layout", json={"layouts": layouts})
+
+    async def run(self, spawn_window: float) -> None:
+        await asyncio.sleep(random.uniform(0, spawn_window))
+        next_login = time.monotonic() + LOGIN_SEC / self.scale
+        try:
+            await self.login()
+            while True:
+                await asyncio.sleep(LAYOUT_SAVE_SEC / self.scale)
+                if time.monotonic() >= next_login:
+                    next_login = time.monotonic() + LOGIN_SEC / self.scale
+                    await self.login()
+                await self.save_layout()
+        finally:
+            if self.client is not None:
+                await self.client.aclose()
+
+
+def percentile(values: Sequence[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    index = max(int(round(pct / 100 * len(values) + 0.5)) - 1, 0)
+    return values[min(index, len(values) - 1)]
+
+
+def summarize(samples: Sequence[Sample], duration: float) -> Dict[str, Any]:
+    latencies = sorted(sample[2] * 1000 for sample in samples)
+    errors = sum(1 for sample in samples if not sample[3])
+    summary: Dict[str, Any] = {
+        "requests": len(samples),
+        "throughput_rps": round(len(samples) / duration, 2) if duration else 0.0,
+        "error_rate": round(errors / len(samples), 4) if samples else 0.0,
+        "errors": errors,
+    }
+    for pct in PERCENTILES:
+        summary[f"p{pct}_ms"] = round(percentile(latencies, pct), 2)
+    summary["max_ms"] = round(latencies[-1], 2) if latencies else 0.0
+    return summary
+
+
+def stage_report(recorder: Recorder, stage: int, viewers: int, admins: int, duration: float) -> Dict[str, Any]:
+    samples = [sample for sample in recorder.samples if sample[0] == stage]
+    by_label: Dict[str, List[Sample]] = {}
+    for sample in samples:
+        by_label.setdefault(sample[1], []).append(sample)
+    return {
+        "viewers": viewers,
+        "admins": admins,
+        "duration_sec": round(duration, 2),
+        **summarize(samples, duration),
+        "endpoints": {label: summarize(items, duration) for label, items in sorted(by_label.items())},
+    }
+
+
+async def configure(base_url: str, username: str, password: str, kuma_url: str, pelican_url: str) -> None:
+    async with httpx.AsyncClient(base_url=base_url, timeout=30) as client:
+        response = await client.post("/admin/login", data={"username": username, "password": password})
+        if "error" in response.headers.get("location", ""):
+            raise RuntimeError("admin login failed; check --admin-user/--admin-password")
+        response = await client.post(
+            "/api/settings",
+            json={"kuma_config": kuma_config(kuma_url), "pelican_config": pelican_config(pelican_url)},
+        )
+        response.raise_for_status()
+
+
+async def run_load(args: argparse.Namespace, base_url: str) -> Dict[str, Any]:
+    recorder = Recorder()
+    limits = httpx.Limits(max_connections=args.max_connections, max_keepalive_connections=args.max_connections)
+    spawn_window = min(KUMA_POLL_SEC / args.time_scale, args.stage_sec / 2)
+    stages: List[Dict[str, Any]] = []
+    tasks: List[asyncio.Task] = []
+    async with httpx.AsyncClient(base_url=base_url, timeout=30, limits=limits) as client:
+        try:
+            for _ in range(args.admins):
+                admin = Admin(base_url, recorder, args.time_scale, args.admin_user, args.admin_password)
+                tasks.append(asyncio.create_task(admin.run(spawn_window)))
+            viewers = 0
+            for index, target in enumerate(args.stages):
+                recorder.stage = index
+                for _ in range(max(target - viewers, 0)):
+                    tasks.append(asyncio.create_task(Viewer(client, recorder, args.time_scale).run(spawn_window)))
+                viewers = max(target, viewers)
+                started = time.perf_counter()
+                await asyncio.sleep(args.stage_sec)
+                report = stage_report(recorder, index, viewers, args.admins, time.perf_counter() - started)
+                stages.append(report)
+                print(
+                    f"viewers={viewers} rps={report['throughput_rps']} p95={report['p95_ms']}ms "
+                    f"errors={report['error_rate']:.2%}",
+                    file=sys.stderr,
+                )
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+    return {"stages": stages, "statuses": recorder.statuses}
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(directory: str, args: argparse.Namespace) -> Tuple[subprocess.Popen, str]:
+    port = _free_port()
+    env = {
+        **os.environ,
+        "UPTIME_ATLAS_DB": os.path.join(directory, "loadtest.db"),
+        "UPTIME_ATLAS_ADMIN_USER": args.admin_user,
+        "UPTIME_ATLAS_ADMIN_PASSWORD": args.admin_password,
+        "UPTIME_ATLAS_SESSION_SECRET": "loadtest",
+    }
+    command = [
+        sys.executable, "-m", "uvicorn", "app.main:app",
+        "--host", "127.0.0.1", "--port", str(port), "--workers", "1", "--log-level", "warning",
+    ]
+    process = subprocess.Popen(command, env=env)
+    base_url = f"http://127.0.0.1:{port}"
+    deadline = time.monotonic() + SERVER_READY_SEC
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"uvicorn exited with {process.returncode}")
+        try:
+            httpx.get(f"{base_url}/api/bootstrap", timeout=1)
+            return process, base_url
+        except httpx.HTTPError:
+            time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError("uvicorn did not start in time")
+
+
+def stop_server(process: subprocess.Popen) -> None:
+    process.terminate()
+    try:
+        process.wait(timeout=10)
+    except subprocess.TimeoutExpired:
+        process.kill()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Replay the dashboard traffic mix against one uvicorn worker.")
+    parser.add_argument("--stages", type=int, nargs="+", default=list(DEFAULT_STAGES), help="Viewer counts to ramp through.")
+    parser.add_argument("--stage-sec", type=float, default=DEFAULT_STAGE_SEC)
+    parser.add_argument("--time-scale", type=float, default=DEFAULT_TIME_SCALE, help="Divide client intervals by this.")
+    parser.add_argument("--admins", type=int, default=1)
+    parser.add_argument("--monitors", type=int, default=200)
+    parser.add_argument("--schedules", type=int, default=40)
+    parser.add_argument("--upstream-latency-ms", type=float, default=50.0)
+    parser.add_argument("--max-connections", type=int, default=1000)
+    parser.add_argument("--url", help="Target a running server instead of starting one.")
+    parser.add_argument("--admin-user", default=ADMIN_USER)
+    parser.add_argument("--admin-password", default=ADMIN_PASSWORD)
+    parser.add_argument("--output", help="Also write the JSON report to this file.")
+    args = parser.parse_args()
+
+    with ExitStack() as stack:
+        kuma = stack.enter_context(kuma_stub(args.monitors, args.upstream_latency_ms))
+        pelican = stack.enter_context(pelican_stub(args.schedules, args.upstream_latency_ms))
+        if args.url:
+            base_url = args.url.rstrip("/")
+        else:
+            directory = stack.enter_context(tempfile.TemporaryDirectory())
+            process, base_url = start_server(directory, args)
+            stack.callback(stop_server, process)
+        asyncio.run(configure(base_url, args.admin_user, args.admin_password, kuma.url, pelican.url))
+        result = asyncio.run(run_load(args, base_url))
+        result["upstream_hits"] = {"kuma": dict(kuma.hits), "pelican": dict(pelican.hits)}
+
+    report = {
+        "config": {
+            "stages": args.stages,
+            "stage_sec": args.stage_sec,
+            "time_scale": args.time_scale,
+            "admins": args.admins,
+            "monitors": args.monitors,
+            "schedules": args.schedules,
+            "upstream_latency_ms": args.upstream_latency_ms,
+        },
+        **result,
+    }
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as handle:
+            handle.write(text + "\n")
+    print(text)
+
+
+if __name__ == "__main__":
+    main()
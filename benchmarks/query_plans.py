@@ -0,0 +1,102 @@
+import argparse
+import json
+import os
+import re
+import sys
+import tempfile
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, List, Tuple
+
+from app import db
+
+TABLE = "calendar_events"
+_SCAN_RE = re.compile(rf"\bSCAN (?:TABLE )?{TABLE}\b")
+_TRACED_PREFIXES = ("SELECT", "UPDATE", "DELETE", "WITH")
+
+
+def seed(count: int) -> None:
+    base = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    events = []
+    for index in range(count):
+        start = base + timedelta(minutes=index * 30)
+        events.append(
+            {
+                "schedule_id": f"{'local_' if index % 10 == 0 else ''}sched_{index % 50}",
+                "game_name": f"Game {index % 5}",
+                "event_name": "Session",
+                "start_utc": start.isoformat().replace("+00:00", "Z"),
+                "stop_utc": (start + timedelta(minutes=20)).isoformat().replace("+00:00", "Z"),
+            }
+        )
+    db.upsert_calendar_events(events)
+
+
+def hot_queries() -> List[Tuple[str, Callable[[], Any]]]:
+    start = "2026-01-10T00:00:00Z"
+    end = "2026-01-20T00:00:00Z"
+    game_id = db.list_games_with_stats()[0]["id"]
+    return [
+        ("list_calendar_events", lambda: db.list_calendar_events(start, end)),
+        ("list_calendar_events_all", lambda: db.list_calendar_events(start, end, include_deleted=True)),
+        ("list_games_with_stats", db.list_games_with_stats),
+        ("mark_calendar_events_deleted_by_game", lambda: db.mark_calendar_events_deleted_by_game(game_id)),
+        ("delete_calendar_events_in_range", lambda: db.delete_calendar_events_in_range(start, end)),
+        (
+            "reconcile_calendar_events",
+            lambda: db.reconcile_calendar_events(start, end, [], ["sched_1"], {"sched_1": "x"}),
+        ),
+        ("replace_calendar_events_for_game", lambda: db.replace_calendar_events_for_game(game_id, [])),
+    ]
+
+
+def explain(conn, statement: str) -> List[str]:
+    return [row["detail"] for row in conn.execute(f"EXPLAIN QUERY PLAN {statement}").fetchall()]
+
+
+def check(rows: int) -> List[Dict[str, Any]]:
+    db.init_db()
+    seed(rows)
+    conn = db.get_connection()
+    results: List[Dict[str, Any]] = []
+    for name, call in hot_queries():
+        statements: List[str] = []
+        conn.set_trace_callback(statements.append)
+        try:
+            call()
+        finally:
+            conn.set_trace_callback(None)
+        for statement in statements:
+            text = statement.strip()
+            if TABLE not in text or not text.upper().startswith(_TRACED_PREFIXES):
+                continue
+            plan = explain(conn, text)
+            results.append(
+                {
+                    "name": name,
+                    "sql": " ".join(text.split()),
+                    "plan": plan,
+                    "scans": any(_SCAN_RE.search(detail) for detail in plan),
+                }
+            )
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=f"Fail when a hot query full-scans {TABLE}.")
+    parser.add_argument("--rows", type=int, default=2_000)
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as directory:
+        os.environ[db.DB_ENV] = os.path.join(directory, "plans.db")
+        try:
+            results = check(args.rows)
+        finally:
+            db.close_connections()
+    print(json.dumps(results, indent=2))
+    failures = [result["name"] for result in results if result["scans"]]
+    if failures:
+        print(f"full scans of {TABLE}: {', '.join(sorted(set(failures)))}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+
+PELICAN_SERVER_ID = "bench"
+PELICAN_API_KEY = "bench-key"
+METRICS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+Route = Tuple[str, bytes]
+
+
+def kuma_metrics_payload(monitors: int) -> bytes:
+    lines: List[str] = []
+    for metric, value in (
+        ("monitor_status", lambda index: 0 if index % 17 == 0 else 1),
+        ("monitor_response_time", lambda index: 20 + index % 180),
+        ("monitor_cert_days_remaining", lambda index: 10 + index % 80),
+        ("monitor_cert_is_valid", lambda index: 1),
+    ):
+        lines.append(f"# HELP {metric} Uptime Kuma {metric}")
+        lines.append(f"# TYPE {metric} gauge")
+        for index in range(monitors):
+            labels = (
+                f'monitor_name="Monitor {index}",monitor_type="http",'
+                f'monitor_url="https://host-{index}.example/",monitor_hostname="null",monitor_port="null"'
+            )
+            lines.append(f"{metric}{{{labels}}} {value(index)}")
+    return ("\n".join(lines) + "\n").encode("utf-8")
+
+
+def pelican_schedules_payload(count: int) -> Dict[str, Any]:
+    data: List[Dict[str, Any]] = []
+    for index in range(count):
+        game = index // 4
+        if index % 4 == 3:
+            name = f"Backup {game}"
+            cron = {"minute": str(index % 60), "hour": "4", "day_of_month": "*", "month": "*", "day_of_week": "*"}
+        else:
+            kind = "start" if index % 2 == 0 else "stop"
+            hour = 18 + game % 4 if kind == "start" else 23
+            name = f"Game {game}: Session {index % 4 // 2} {kind}"
+            cron = {"minute": "0", "hour": str(hour), "day_of_month": "*", "month": "*", "day_of_week": str(game % 7)}
+        data.append(
+            {
+                "object": "server_schedule",
+                "attributes": {
+                    "id": index + 1,
+                    "name": name,
+                    "cron": cron,
+                    "is_active": True,
+                    "only_when_online": False,
+                    "updated_at": "2026-01-01T00:00:00+00:00",
+                },
+            }
+        )
+    return {"object": "list", "data": data}
+
+
+class StubServer:
+    def __init__(self, routes: Dict[str, Route], latency_ms: float = 0.0) -> None:
+        self.routes = dict(routes)
+        self.latency = latency_ms / 1000
+        self.hits: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        if self._server is None:
+            raise RuntimeError("Stub server is not running")
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "StubServer":
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args: Any) -> None:
+                return
+
+            def do_GET(self) -> None:
+                path = self.path.split("?", 1)[0]
+                with stub._lock:
+                    stub.hits[path] = stub.hits.get(path, 0) + 1
+                if stub.latency:
+                    time.sleep(stub.latency)
+                route = stub.routes.get(path)
+                if route is None:
+                    self.send_response(404)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+                content_type, body = route
+                self.send_response(200)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, name="bench-stub", daemon=True)
+        self._thread.start()
+        return self
+
+    def close(self) -> None:
+        if self._server is None:
+            return
+        self._server.shutdown()
+        self._server.server_close()
+        self._server = None
+
+    def __enter__(self) -> "StubServer":
+        return self.start()
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+
+def kuma_stub(monitors: int = 200, latency_ms: float = 0.0) -> StubServer:
+    return StubServer({"/metrics": (METRICS_CONTENT_TYPE, kuma_metrics_payload(monitors))}, latency_ms)
+
+
+def pelican_stub(schedules: int = 40, latency_ms: float = 0.0) -> StubServer:
+    body = json.dumps(pelican_schedules_payload(schedules)).encode("utf-8")
+    path = f"/api/client/servers/{PELICAN_SERVER_ID}/schedules"
+    return StubServer({path: ("application/json", body)}, latency_ms)
+
+
+def kuma_config(url: str) -> Dict[str, Any]:
+    return {"enabled": True, "base_url": url, "metrics_path": "/metrics", "timeout_sec": 6}
+
+
+def pelican_config(url: str) -> Dict[str, Any]:
+    return {
+        "enabled": True,
+        "base_url": url,
+        "api_key": PELICAN_API_KEY,
+        "server_id": PELICAN_SERVER_ID,
+        "server_name": "Bench",
+        "timeout_sec": 6,
+    }
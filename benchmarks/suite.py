@@ -0,0 +1,324 @@
+import argparse
+import asyncio
+import functools
+import json
+import os
+import platform
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable, Dict, Iterator, List, Optional, Sequence
+
+from app import db, upstream
+from app.cron import compile_cron, occurrence_cache
+from app.main import (
+    _calendar_window,
+    _generate_schedule_occurrences,
+    _parse_prometheus_metrics,
+    _sync_pelican_events,
+    _to_utc_iso,
+)
+
+from . import bench_pairing
+from .stubs import kuma_metrics_payload, pelican_config, pelican_stub
+
+GROUPS = ("occurrences", "pairing", "parse_metrics", "sync", "list_calendar")
+DEFAULT_PAIRING_SIZES = (1_000, 10_000, 100_000)
+DEFAULT_MONITORS = (1_000, 10_000)
+DEFAULT_SCHEDULES = (40, 400)
+DEFAULT_ROWS = (1_000, 100_000, 1_000_000)
+DEFAULT_TOLERANCE = 0.25
+CHUNK_BYTES = 64 * 1024
+SEED_BATCH = 50_000
+NOW = datetime(2026, 3, 15, tzinfo=timezone.utc)
+CRONS = {
+    "weekly": {"minute": "0", "hour": "19", "day_of_month": "*", "month": "*", "day_of_week": "5"},
+    "daily": {"minute": "30", "hour": "4", "day_of_month": "*", "month": "*", "day_of_week": "*"},
+    "business_quarter_hours": {"minute": "*/15", "hour": "9-17", "day_of_month": "*", "month": "*", "day_of_week": "1-5"},
+    "every_5_minutes": {"minute": "*/5", "hour": "*", "day_of_month": "*", "month": "*", "day_of_week": "*"},
+}
+
+
+def timed(call: Callable[[], Any], repeat: int, setup: Optional[Callable[[], Any]] = None) -> Dict[str, float]:
+    timings: List[float] = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        started = time.perf_counter()
+        call()
+        timings.append(time.perf_counter() - started)
+    return {"best_sec": round(min(timings), 6), "median_sec": round(statistics.median(timings), 6)}
+
+
+async def timed_async(
+    call: Callable[[], Awaitable[Any]], repeat: int, setup: Optional[Callable[[], Any]] = None
+) -> Dict[str, float]:
+    timings: List[float] = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        started = time.perf_counter()
+        await call()
+        timings.append(time.perf_counter() - started)
+    return {"best_sec": round(min(timings), 6), "median_sec": round(statistics.median(timings), 6)}
+
+
+def clear_occurrence_caches() -> None:
+    occurrence_cache.clear()
+    compile_cron.cache_clear()
+
+
+def bench_occurrences(repeat: int) -> List[Dict[str, Any]]:
+    window_start, window_end = _calendar_window(NOW)
+    results: List[Dict[str, Any]] = []
+    for label, cron in CRONS.items():
+        count = len(_generate_schedule_occurrences(cron, window_start, window_end))
+        call = functools.partial(_generate_schedule_occurrences, cron, window_start, window_end)
+        for mode, setup in (("cold", clear_occurrence_caches), ("warm", None)):
+            results.append(
+                {
+                    "name": f"generate_schedule_occurrences.{label}.{mode}",
+                    "size": count,
+                    **timed(call, repeat, setup),
+                }
+            )
+    clear_occurrence_caches()
+    return results
+
+
+def bench_parse_metrics(monitors: Sequence[int], repeat: int) -> List[Dict[str, Any]]:
+    results: List[Dict[str, Any]] = []
+    for count in monitors:
+        payload = kuma_metrics_payload(count)
+        chunks = [payload[offset : offset + CHUNK_BYTES] for offset in range(0, len(payload), CHUNK_BYTES)]
+        parsed = len(_parse_prometheus_metrics(payload))
+        if parsed != count:
+            raise RuntimeError(f"parsed {parsed} monitors, expected {count}")
+        for mode, source in (("bytes", payload), ("chunked", chunks)):
+            timing = timed(lambda: _parse_prometheus_metrics(source), repeat)
+            results.append(
+                {
+                    "name": f"parse_prometheus_metrics.{mode}",
+                    "size": count,
+                    "payload_bytes": len(payload),
+                    "mb_per_sec": round(len(payload) / timing["best_sec"] / 1_000_000, 2),
+                    **timing,
+                }
+            )
+    return results
+
+
+def use_database(path: str) -> None:
+    db.close_connections()
+    os.environ[db.DB_ENV] = path
+    db.init_db()
+
+
+async def _bench_sync(directory: str, schedules: int, repeat: int) -> List[Dict[str, Any]]:
+    upstream.start()
+    try:
+        return await _bench_sync_runs(directory, schedules, repeat)
+    finally:
+        await upstream.close()
+
+
+async def _bench_sync_runs(directory: str, schedules: int, repeat: int) -> List[Dict[str, Any]]:
+    results: List[Dict[str, Any]] = []
+    with pelican_stub(schedules) as stub:
+        config = pelican_config(stub.url)
+        initial: List[float] = []
+        summary: Dict[str, Any] = {}
+        for attempt in range(repeat):
+            use_database(os.path.join(directory, f"sync-{schedules}-{attempt}.db"))
+            clear_occurrence_caches()
+            started = time.perf_counter()
+            summary = await _sync_pelican_events(config)
+            initial.append(time.perf_counter() - started)
+            if not summary.get("ok"):
+                raise RuntimeError(f"sync failed: {summary.get('reason')}")
+        base = {"size": schedules, "events": summary.get("events")}
+        results.append(
+            {
+                "name": "sync_pelican_events.initial",
+                **base,
+                "best_sec": round(min(initial), 6),
+                "median_sec": round(statistics.median(initial), 6),
+            }
+        )
+        results.append(
+            {
+                "name": "sync_pelican_events.unchanged",
+                **base,
+                **await timed_async(lambda: _sync_pelican_events(config), repeat),
+            }
+        )
+        results.append(
+            {
+                "name": "sync_pelican_events.forced",
+                **base,
+                **await timed_async(lambda: _sync_pelican_events(config, force=True), repeat, clear_occurrence_caches),
+            }
+        )
+    return results
+
+
+def bench_sync(directory: str, schedules: Sequence[int], repeat: int) -> List[Dict[str, Any]]:
+    results: List[Dict[str, Any]] = []
+    for count in schedules:
+        results.extend(asyncio.run(_bench_sync(directory, count, repeat)))
+    db.shutdown_executor()
+    return results
+
+
+def _seed_events(count: int, window_start: datetime) -> Iterator[Dict[str, Any]]:
+    base = window_start - timedelta(hours=count // 2)
+    for index in range(count):
+        start = base + timedelta(hours=index)
+        yield {
+            "schedule_id": f"{'local_' if index % 10 == 0 else ''}sched_{index % 200}",
+            "game_name": f"Game {index % 8}",
+            "event_name": "Session",
+            "start_utc": _to_utc_iso(start),
+            "stop_utc": _to_utc_iso(start + timedelta(minutes=45)),
+        }
+
+
+def seed_calendar(count: int, window_start: datetime) -> None:
+    batch: List[Dict[str, Any]] = []
+    for event in _seed_events(count, window_start):
+        batch.append(event)
+        if len(batch) >= SEED_BATCH:
+            db.upsert_calendar_events(batch)
+            batch = []
+    if batch:
+        db.upsert_calendar_events(batch)
+    db.get_connection().execute("ANALYZE")
+
+
+def bench_list_calendar(directory: str, rows: Sequence[int], repeat: int) -> List[Dict[str, Any]]:
+    window_start, window_end = _calendar_window(NOW)
+    start_utc, end_utc = _to_utc_iso(window_start), _to_utc_iso(window_end)
+    results: List[Dict[str, Any]] = []
+    for count in rows:
+        use_database(os.path.join(directory, f"calendar-{count}.db"))
+        started = time.perf_counter()
+        seed_calendar(count, window_start)
+        seed_sec = time.perf_counter() - started
+        window_rows = len(db.list_calendar_events(start_utc, end_utc))
+        results.append(
+            {
+                "name": "list_calendar_events.window",
+                "size": count,
+                "window_rows": window_rows,
+                "seed_sec": round(seed_sec, 3),
+                **timed(lambda: db.list_calendar_events(start_utc, end_utc), repeat),
+            }
+        )
+        results.append(
+            {
+                "name": "list_calendar_events.window_with_deleted",
+                "size": count,
+                "window_rows": window_rows,
+                **timed(lambda: db.list_calendar_events(start_utc, end_utc, include_deleted=True), repeat),
+            }
+        )
+    db.close_connections()
+    return results
+
+
+def environment() -> Dict[str, Any]:
+    try:
+        revision = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        revision = None
+    return {
+        "timestamp": _to_utc_iso(datetime.now(timezone.utc)),
+        "revision": revision,
+        "python": platform.python_version(),
+        "sqlite": sqlite3.sqlite_version,
+        "platform": platform.platform(),
+    }
+
+
+def run(args: argparse.Namespace) -> Dict[str, Any]:
+    groups = args.only or list(GROUPS)
+    results: List[Dict[str, Any]] = []
+    with tempfile.TemporaryDirectory() as directory:
+        previous_db = os.environ.get(db.DB_ENV)
+        try:
+            if "occurrences" in groups:
+                results.extend(bench_occurrences(args.repeat))
+            if "pairing" in groups:
+                results.extend(bench_pairing.run(args.pairing_sizes, args.repeat))
+            if "parse_metrics" in groups:
+                results.extend(bench_parse_metrics(args.monitors, args.repeat))
+            if "sync" in groups:
+                results.extend(bench_sync(directory, args.schedules, args.repeat))
+            if "list_calendar" in groups:
+                results.extend(bench_list_calendar(directory, args.rows, args.repeat))
+        finally:
+            db.close_connections()
+            if previous_db is None:
+                os.environ.pop(db.DB_ENV, None)
+            else:
+                os.environ[db.DB_ENV] = previous_db
+    return {"environment": environment(), "results": results}
+
+
+def _result_key(result: Dict[str, Any]) -> str:
+    return f"{result['name']}[{result.get('size')}]"
+
+
+def compare(report: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[Dict[str, Any]]:
+    previous = {_result_key(result): result for result in baseline.get("results", [])}
+    regressions: List[Dict[str, Any]] = []
+    for result in report["results"]:
+        before = previous.get(_result_key(result))
+        if not before or not before.get("best_sec"):
+            continue
+        ratio = result["best_sec"] / before["best_sec"]
+        result["baseline_best_sec"] = before["best_sec"]
+        result["ratio"] = round(ratio, 3)
+        if ratio > 1 + tolerance:
+            regressions.append({"key": _result_key(result), "ratio": result["ratio"]})
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Offline benchmarks for the calendar and Kuma pipelines.")
+    parser.add_argument("--only", choices=GROUPS, nargs="*")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--pairing-sizes", type=int, nargs="*", default=list(DEFAULT_PAIRING_SIZES))
+    parser.add_argument("--monitors", type=int, nargs="*", default=list(DEFAULT_MONITORS))
+    parser.add_argument("--schedules", type=int, nargs="*", default=list(DEFAULT_SCHEDULES))
+    parser.add_argument("--rows", type=int, nargs="*", default=list(DEFAULT_ROWS))
+    parser.add_argument("--output", help="Also write the JSON report to this file.")
+    parser.add_argument("--baseline", help="Compare against a previous JSON report.")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    args = parser.parse_args()
+
+    report = run(args)
+    regressions: List[Dict[str, Any]] = []
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as handle:
+            regressions = compare(report, json.load(handle), args.tolerance)
+        report["regressions"] = regressions
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as handle:
+            handle.write(text + "\n")
+    print(text)
+    if regressions:
+        keys = ", ".join(regression["key"] for regression in regressions)
+        print(f"slower than baseline by more than {args.tolerance:.0%}: {keys}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,14 @@
+import pytest
+
+from app import db
+
+
+@pytest.fixture
+def database(tmp_path, monkeypatch):
+    monkeypatch.setenv(db.DB_ENV, str(tmp_path / "uptime_atlas.db"))
+    db.close_connections()
+    for snapshot in (db._settings, db._oauth_allowlist):
+        snapshot.invalidate()
+    db.init_db()
+    yield db.get_db_path()
+    db.close_connections()
@@ -0,0 +1,89 @@
+import pytest
+
+from app.breaker import CLOSED, HALF_OPEN, OPEN, BreakerRegistry, CircuitBreaker, CircuitOpenError
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+def _breaker(clock, **kwargs):
+    return CircuitBreaker("kuma", jitter=0.0, clock=clock, **kwargs)
+
+
+def test_opens_after_threshold(clock):
+    breaker = _breaker(clock)
+    breaker.record_failure("timeout")
+    breaker.record_failure("timeout")
+    assert breaker.state == CLOSED and breaker.allow()
+    breaker.record_failure("timeout")
+    assert breaker.state == OPEN
+    assert breaker.retry_after() == 5.0
+    assert not breaker.allow()
+    with pytest.raises(CircuitOpenError) as excinfo:
+        breaker.check()
+    assert excinfo.value.retry_after == 5.0
+    assert breaker.rejected == 2
+
+
+def test_half_open_allows_single_probe(clock):
+    breaker = _breaker(clock, failure_threshold=1)
+    breaker.record_failure()
+    clock.now += 5.0
+    assert breaker.allow()
+    assert breaker.state == HALF_OPEN
+    assert not breaker.allow()
+    clock.now += 30.0
+    assert breaker.allow()
+
+
+def test_probe_success_closes(clock):
+    breaker = _breaker(clock, failure_threshold=1)
+    breaker.record_failure()
+    clock.now += 5.0
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == CLOSED and breaker.failures == 0 and breaker.trips == 0
+
+
+def test_probe_failure_doubles_backoff_up_to_max(clock):
+    breaker = _breaker(clock, failure_threshold=1, max_sec=30.0)
+    breaker.record_failure()
+    delays = []
+    for _ in range(4):
+        clock.now += breaker.retry_after()
+        assert breaker.allow()
+        breaker.record_failure()
+        delays.append(breaker.retry_after())
+    assert delays == [10.0, 20.0, 30.0, 30.0]
+    assert breaker.opens == 5
+
+
+def test_retry_after_trips_immediately(clock):
+    breaker = _breaker(clock)
+    breaker.record_failure("429", retry_after=120.0)
+    assert breaker.state == OPEN
+    assert breaker.retry_after() == 120.0
+    breaker.reset()
+    breaker.record_failure("429", retry_after=3600.0)
+    assert breaker.retry_after() == 300.0
+
+
+def test_registry_reuses_and_resets(clock):
+    registry = BreakerRegistry(lambda name: CircuitBreaker(name, failure_threshold=1, jitter=0.0, clock=clock))
+    assert registry.get("a") is registry.get("a")
+    registry.get("a").record_failure()
+    registry.get("b").record_failure()
+    assert registry.states() == {"a": OPEN, "b": OPEN}
+    registry.reset("a")
+    assert registry.states() == {"a": CLOSED, "b": OPEN}
+    assert [entry["name"] for entry in registry.snapshot()] == ["a", "b"]
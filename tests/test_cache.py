@@ -0,0 +1,128 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from app import cache
+from app.cache import TTLCache
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(cache, "time", SimpleNamespace(monotonic=fake))
+    return fake
+
+
+class Loader:
+    def __init__(self, *values) -> None:
+        self.values = list(values)
+        self.calls = 0
+        self.release = asyncio.Event()
+
+    async def __call__(self):
+        self.calls += 1
+        await self.release.wait()
+        value = self.values.pop(0)
+        if isinstance(value, Exception):
+            raise value
+        return value
+
+
+async def _settle():
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+def test_concurrent_misses_share_one_load(clock):
+    async def scenario():
+        ttl = TTLCache(15)
+        loader = Loader("a")
+        waiters = [asyncio.ensure_future(ttl.get("k", loader)) for _ in range(5)]
+        await _settle()
+        loader.release.set()
+        assert await asyncio.gather(*waiters) == ["a"] * 5
+        assert loader.calls == 1
+        assert ttl.stats()["coalesced"] == 4
+
+    asyncio.run(scenario())
+
+
+def test_stale_hit_served_while_refreshing(clock):
+    async def scenario():
+        ttl = TTLCache(15, stale_sec=300)
+        first = Loader("old")
+        first.release.set()
+        await ttl.get("k", first)
+        clock.now += 20
+        refresh = Loader("new")
+        assert await ttl.get("k", refresh) == "old"
+        assert await ttl.get("k", refresh) == "old"
+        await _settle()
+        assert refresh.calls == 1
+        refresh.release.set()
+        await _settle()
+        assert await ttl.get("k", refresh) == "new"
+        assert ttl.stats()["stale_hits"] == 2
+
+    asyncio.run(scenario())
+
+
+def test_failed_refresh_keeps_stale_value(clock):
+    async def scenario():
+        ttl = TTLCache(15, stale_sec=300)
+        first = Loader("old")
+        first.release.set()
+        await ttl.get("k", first)
+        clock.now += 20
+        failing = Loader(RuntimeError("upstream down"), "new")
+        failing.release.set()
+        assert await ttl.get("k", failing) == "old"
+        await _settle()
+        assert ttl.peek("k") == "old"
+        assert await ttl.get("k", failing) == "old"
+        await _settle()
+        assert failing.calls == 2
+        assert await ttl.get("k", failing) == "new"
+
+    asyncio.run(scenario())
+
+
+def test_miss_after_stale_window_reloads(clock):
+    async def scenario():
+        ttl = TTLCache(15, stale_sec=30)
+        loader = Loader("old", "new")
+        loader.release.set()
+        await ttl.get("k", loader)
+        clock.now += 60
+        assert await ttl.get("k", loader) == "new"
+        assert ttl.stats()["misses"] == 2
+
+    asyncio.run(scenario())
+
+
+def test_defer_postpones_refresh_until_retry_after(clock):
+    async def scenario():
+        ttl = TTLCache(15, stale_sec=30)
+        loader = Loader("old", "new")
+        loader.release.set()
+        await ttl.get("k", loader)
+        clock.now += 20
+        ttl.defer("k", 120)
+        clock.now += 100
+        assert await ttl.get("k", loader) == "old"
+        await _settle()
+        assert loader.calls == 1
+        clock.now += 25
+        assert await ttl.get("k", loader) == "new"
+        assert loader.calls == 2
+
+    asyncio.run(scenario())
@@ -0,0 +1,86 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.cron import MONTH_NAMES, WEEKDAY_NAMES, CronExpression, cron_expression, parse_field
+
+UTC = timezone.utc
+
+
+def _reference(expression: str, start: datetime, end: datetime):
+    fields = expression.split()
+    _, minutes = parse_field(fields[0], 0, 59)
+    _, hours = parse_field(fields[1], 0, 23)
+    days_any, days = parse_field(fields[2], 1, 31)
+    _, months = parse_field(fields[3], 1, 12, mapping=MONTH_NAMES)
+    weekdays_any, weekdays = parse_field(
+        fields[4], 0, 6, mapping=WEEKDAY_NAMES, normalize=lambda value: 0 if value == 7 else value, wrap=True
+    )
+    value = start
+    while value < end:
+        day_ok = bool(days >> value.day & 1)
+        weekday_ok = bool(weekdays >> ((value.weekday() + 1) % 7) & 1)
+        if days_any or weekdays_any:
+            day_match = day_ok and weekday_ok
+        else:
+            day_match = day_ok or weekday_ok
+        if day_match and minutes >> value.minute & 1 and hours >> value.hour & 1 and months >> value.month & 1:
+            yield value
+        value += timedelta(minutes=1)
+
+
+@pytest.mark.parametrize(
+    "expression",
+    [
+        "0 19 * * 5",
+        "*/15 9-17 * * 1-5",
+        "0 12 13 * 5",
+        "30 4 * * 7",
+        "0 0 1,15 * *",
+        "0 0 31 * *",
+        "0 6 * jan,feb *",
+        "5 */6 * * fri-mon",
+        "0 0 * * *",
+    ],
+)
+def test_iter_between_matches_minute_scan(expression):
+    start = datetime(2026, 1, 20, 7, 13, tzinfo=UTC)
+    end = start + timedelta(days=45)
+    assert list(CronExpression(expression).iter_between(start, end)) == list(_reference(expression, start, end))
+
+
+def test_iter_between_is_half_open():
+    cron = CronExpression("0 * * * *")
+    start = datetime(2026, 3, 1, 10, 0, tzinfo=UTC)
+    end = datetime(2026, 3, 1, 13, 0, tzinfo=UTC)
+    assert list(cron.iter_between(start, end)) == [start + timedelta(hours=hour) for hour in range(3)]
+    assert list(cron.iter_between(end, start)) == []
+
+
+def test_day_of_month_or_day_of_week():
+    cron = CronExpression("0 12 13 * 5")
+    fires = [value.date() for value in cron.iter_between(datetime(2026, 2, 1, tzinfo=UTC), datetime(2026, 3, 1, tzinfo=UTC))]
+    assert datetime(2026, 2, 13).date() in fires
+    assert datetime(2026, 2, 6).date() in fires
+    assert len(fires) == 4
+
+
+def test_next_after_fires_strictly_later():
+    cron = CronExpression("0 19 * * 5")
+    friday = datetime(2026, 10, 16, 19, 0, tzinfo=UTC)
+    assert cron.next_after(friday - timedelta(seconds=30)) == friday
+    assert cron.next_after(friday) == friday + timedelta(days=7)
+
+
+def test_next_after_rolls_over_year_and_leap_day():
+    assert CronExpression("0 0 1 1 *").next_after(datetime(2026, 6, 1, tzinfo=UTC)) == datetime(2027, 1, 1, tzinfo=UTC)
+    assert CronExpression("0 0 29 2 *").next_after(datetime(2026, 3, 1, tzinfo=UTC)) == datetime(2028, 2, 29, tzinfo=UTC)
+
+
+def test_next_after_returns_none_when_never_firing():
+    assert CronExpression("0 0 31 2 *").next_after(datetime(2026, 1, 1, tzinfo=UTC)) is None
+    assert CronExpression("0 0 * * 9").next_after(datetime(2026, 1, 1, tzinfo=UTC)) is None
+
+
+def test_cron_expression_fills_blank_fields():
+    assert cron_expression({"minute": "0", "hour": " 9 ", "day_of_week": "1, 3"}) == "0 9 * * 1,3"
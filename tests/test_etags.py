@@ -0,0 +1,64 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from app import db, main
+
+
+async def _idle() -> None:
+    return None
+
+
+@pytest.fixture
+def client(database, monkeypatch):
+    monkeypatch.setattr(main, "_pelican_sync_loop", _idle)
+    monkeypatch.setattr(main, "_kuma_history_loop", _idle)
+    with TestClient(main.app) as test_client:
+        yield test_client
+
+
+def test_matching_etag_returns_empty_304(client):
+    first = client.get("/api/widgets")
+    etag = first.headers["ETag"]
+    assert first.status_code == 200 and first.json()["widgets"]
+    second = client.get("/api/widgets", headers={"If-None-Match": etag})
+    assert second.status_code == 304
+    assert second.content == b""
+    assert second.headers["ETag"] == etag
+
+
+@pytest.mark.parametrize(
+    "header, status",
+    [
+        ("W/{etag}", 304),
+        ('"stale", {etag}', 304),
+        ('"stale",W/{etag}', 304),
+        ("*", 304),
+        ('"stale"', 200),
+        ('W/"stale", "other"', 200),
+    ],
+)
+def test_if_none_match_lists(client, header, status):
+    etag = client.get("/api/widgets").headers["ETag"]
+    response = client.get("/api/widgets", headers={"If-None-Match": header.format(etag=etag)})
+    assert response.status_code == status
+
+
+def test_settings_write_changes_bootstrap_etag(client):
+    etag = client.get("/api/bootstrap").headers["ETag"]
+    assert client.get("/api/bootstrap", headers={"If-None-Match": etag}).status_code == 304
+    db.set_setting("theme", {"mode": "dark"})
+    response = client.get("/api/bootstrap", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+
+
+def test_event_write_changes_calendar_etag(client):
+    etag = client.get("/api/calendar/events").headers["ETag"]
+    assert client.get("/api/calendar/events", headers={"If-None-Match": etag}).status_code == 304
+    window_start, _ = main._calendar_window()
+    db.insert_calendar_event(
+        "local_1", db.get_or_create_game_id("Game"), "Raid", main._to_utc_iso(window_start), None, "", "test"
+    )
+    response = client.get("/api/calendar/events", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
@@ -0,0 +1,121 @@
+import asyncio
+from collections import OrderedDict
+
+import httpx
+import pytest
+
+from app import main, upstream
+from app.breaker import BreakerRegistry
+from app.cache import TTLCache
+
+FIRST = "http://kuma.test:3001"
+SECOND = "http://kuma.test:3002"
+THIRD = "http://kuma.test/second"
+CONFIG = {
+    "enabled": True,
+    "instances": f"{FIRST} | | First\n{SECOND} | | Second\n{THIRD} | | Third",
+}
+
+
+class Panels:
+    def __init__(self) -> None:
+        self.status = {FIRST: 200, SECOND: 200, THIRD: 200}
+        self.hold = {FIRST: None, SECOND: None, THIRD: None}
+        self.calls = {FIRST: 0, SECOND: 0, THIRD: 0}
+
+    async def __call__(self, request: httpx.Request) -> httpx.Response:
+        base = str(request.url).rsplit("/metrics", 1)[0]
+        self.calls[base] += 1
+        if self.hold[base] is not None:
+            await self.hold[base].wait()
+        name = base.rsplit(":", 1)[-1] if base != THIRD else "third"
+        body = f'monitor_status{{monitor_name="Shared"}} 1\nmonitor_status{{monitor_name="Only {name}"}} 1\n'
+        return httpx.Response(self.status[base], content=body.encode())
+
+
+@pytest.fixture
+def panels(monkeypatch):
+    handler = Panels()
+    monkeypatch.setattr(upstream, "build_client", lambda: httpx.AsyncClient(transport=httpx.MockTransport(handler)))
+    monkeypatch.setattr(main, "_upstream_breakers", BreakerRegistry())
+    monkeypatch.setattr(main, "_kuma_cache", TTLCache(0, stale_sec=300))
+    monkeypatch.setattr(main, "_kuma_aggregates", OrderedDict())
+    monkeypatch.setattr(main, "KUMA_AGGREGATE_WAIT_SEC", 0.05)
+    return handler
+
+
+async def _settle():
+    for _ in range(20):
+        await asyncio.sleep(0)
+
+
+def _instances(summary):
+    return {part["name"]: (part["ok"], part["reason"], part["stale"]) for part in summary["instances"]}
+
+
+def test_down_instance_is_reported_and_others_still_merge(panels):
+    panels.status[SECOND] = 500
+    summary = asyncio.run(main._merged_kuma_summary(CONFIG))
+    assert summary["ok"] and summary["stale"]
+    assert _instances(summary) == {
+        "First": (True, None, False),
+        "Second": (False, "http_500", False),
+        "Third": (True, None, False),
+    }
+    monitors = {monitor["name"]: monitor["instances"] for monitor in summary["monitors"]}
+    assert monitors["Shared"] == ["First", "Third"]
+    assert "Only 3002" not in monitors
+
+
+def test_failing_instance_keeps_last_good_summary_as_stale(panels):
+    async def scenario():
+        await main._merged_kuma_summary(CONFIG)
+        panels.status[SECOND] = 503
+        await main._merged_kuma_summary(CONFIG)
+        await _settle()
+        return await main._merged_kuma_summary(CONFIG)
+
+    summary = asyncio.run(scenario())
+    assert summary["ok"] and summary["stale"]
+    assert _instances(summary)["Second"] == (True, "http_503", True)
+    assert _instances(summary)["First"][0] is True
+    assert "Only 3002" in {monitor["name"] for monitor in summary["monitors"]}
+
+
+def test_slow_instance_is_pending_then_served_from_previous(panels, monkeypatch):
+    monkeypatch.setattr(main, "_kuma_cache", TTLCache(0))
+
+    async def scenario():
+        panels.hold[THIRD] = asyncio.Event()
+        first = await main._merged_kuma_summary(CONFIG)
+        panels.hold[THIRD].set()
+        await _settle()
+        panels.hold[THIRD] = asyncio.Event()
+        second = await main._merged_kuma_summary(CONFIG)
+        panels.hold[THIRD].set()
+        await _settle()
+        return first, second
+
+    first, second = asyncio.run(scenario())
+    assert _instances(first)["Third"] == (False, "pending", False)
+    assert first["ok"] and first["stale"]
+    assert _instances(second)["Third"] == (True, None, True)
+    assert "Only third" in {monitor["name"] for monitor in second["monitors"]}
+
+
+def test_breakers_are_keyed_per_instance_on_a_shared_host(panels):
+    panels.status[FIRST] = 500
+    instances = main._kuma_instances(CONFIG)
+
+    async def scenario():
+        for _ in range(3):
+            await main._fetch_kuma_summary(instances[0])
+        return [await main._fetch_kuma_summary(instance) for instance in instances]
+
+    first, second, third = asyncio.run(scenario())
+    assert first["reason"] == "circuit_open"
+    assert second["ok"] and third["ok"]
+    assert panels.calls[FIRST] == 3
+    states = main._upstream_breakers.states()
+    assert set(states) == {"kuma.test:3001", "kuma.test:3002", "kuma.test/second"}
+    assert states["kuma.test:3001"] != states["kuma.test:3002"]
@@ -0,0 +1,57 @@
+import asyncio
+
+import pytest
+
+from app import db, main
+
+
+@pytest.fixture
+def history(database, monkeypatch):
+    monkeypatch.setattr(main, "_kuma_history_runtime", {"task": None, "summary": None, "recorded": float("-inf")})
+    return lambda: {(row["name"], row["up"], row["down"]) for row in db.list_kuma_history(60, 0)}
+
+
+def _record(summary):
+    asyncio.run(main._record_kuma_history(summary))
+
+
+def _instance(name):
+    return {"name": name}
+
+
+def test_monitor_shared_by_instances_is_counted_once(history):
+    parts = [
+        {"ok": True, "monitors": [{"name": "web", "status": 1}, {"name": "db", "status": 1}]},
+        {"ok": True, "monitors": [{"name": "web", "status": 0}]},
+    ]
+    _record(main._merge_kuma_summaries([_instance("a"), _instance("b")], parts))
+    assert history() == {("web", 0, 1), ("db", 1, 0)}
+
+
+def test_stale_instances_are_not_sampled(history):
+    parts = [
+        {"ok": True, "monitors": [{"name": "web", "status": 1}]},
+        {"ok": True, "stale": True, "monitors": [{"name": "db", "status": 0}]},
+    ]
+    _record(main._merge_kuma_summaries([_instance("a"), _instance("b")], parts))
+    _record({"ok": True, "stale": True, "monitors": [{"name": "cache", "status": 1}]})
+    assert history() == {("web", 1, 0)}
+
+
+def test_bad_statuses_never_raise(history):
+    _record({"ok": True, "monitors": [{"name": "web", "status": [1]}, {"name": "db", "status": 1}]})
+    assert history() == {("db", 1, 0)}
+
+
+def test_same_summary_is_recorded_once(history, monkeypatch):
+    summary = {"ok": True, "monitors": [{"name": "web", "status": 1}]}
+    _record(summary)
+    monkeypatch.setitem(main._kuma_history_runtime, "recorded", float("-inf"))
+    _record(summary)
+    assert db.list_kuma_history(60, 0)[0]["samples"] == 1
+
+
+@pytest.mark.parametrize("value, expected", [("0", 0.0), ("10", 45.0), ("300", 300.0), ("soon", 60.0)])
+def test_sample_interval_from_env(monkeypatch, value, expected):
+    monkeypatch.setenv(main.KUMA_HISTORY_SAMPLE_ENV, value)
+    assert main._kuma_history_sample_sec() == expected
@@ -0,0 +1,41 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from app import db, main, passwords
+
+
+async def _idle() -> None:
+    return None
+
+
+@pytest.fixture
+def client(database, monkeypatch):
+    monkeypatch.setattr(main, "_pelican_sync_loop", _idle)
+    monkeypatch.setattr(main, "_kuma_history_loop", _idle)
+    monkeypatch.delenv(main.METRICS_TOKEN_ENV, raising=False)
+    with TestClient(main.app) as test_client:
+        yield test_client
+
+
+def test_metrics_require_auth_by_default(client):
+    assert client.get("/metrics").status_code == 401
+    assert client.get("/metrics", headers={"Authorization": "Bearer "}).status_code == 401
+
+
+def test_metrics_accept_token(client, monkeypatch):
+    monkeypatch.setenv(main.METRICS_TOKEN_ENV, "scrape-token")
+    assert client.get("/metrics", headers={"Authorization": "Bearer wrong"}).status_code == 401
+    response = client.get("/metrics", headers={"Authorization": "Bearer scrape-token"})
+    assert response.status_code == 200
+    assert "uptime_atlas_http_request_duration_seconds" in response.text
+
+
+def test_metrics_accept_admin_session_and_label_db_operations(client):
+    db.create_user("ops", passwords.hash_password("secret-pass", iterations=passwords.MIN_ITERATIONS), role="admin")
+    login = client.post("/admin/login", data={"username": "ops", "password": "secret-pass"}, follow_redirects=False)
+    assert login.headers["location"] == "/admin"
+    client.get("/api/widgets")
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert 'uptime_atlas_db_call_duration_seconds_count{operation="load_widgets"}' in response.text
+    assert "function=" not in response.text
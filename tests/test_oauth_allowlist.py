@@ -0,0 +1,83 @@
+import json
+import sqlite3
+
+from app import db, main
+
+
+def _set_env(monkeypatch, provider, value):
+    monkeypatch.setenv(main.OAUTH_ALLOWLIST_ENVS[provider], value)
+
+
+def _external(path, sql, params=(), bump=True):
+    conn = sqlite3.connect(path, isolation_level=None)
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        conn.execute(sql, params)
+        if bump:
+            conn.execute(
+                "INSERT INTO cache_versions (name, version) VALUES ('oauth_allowlist', 1) "
+                "ON CONFLICT(name) DO UPDATE SET version = version + 1"
+            )
+        conn.execute("COMMIT")
+    finally:
+        conn.close()
+
+
+def test_migration_moves_blob_once(database):
+    legacy = {"google_emails": "a@example.com, b@example.com", "discord_ids": "42", "steam_ids": ""}
+    _external(
+        database,
+        "INSERT INTO settings (key, value, updated_at) VALUES ('oauth_allowlist', ?, '')",
+        (json.dumps(legacy),),
+        bump=False,
+    )
+    db.init_db()
+    db.init_db()
+    assert db.get_setting("oauth_allowlist") is None
+    with db.cursor() as cur:
+        cur.execute("SELECT provider, claim FROM oauth_allowlist ORDER BY provider, claim")
+        rows = [tuple(row) for row in cur.fetchall()]
+    assert rows == [("discord", "42"), ("google", "a@example.com"), ("google", "b@example.com")]
+
+
+def test_open_when_nothing_configured(database, monkeypatch):
+    for env_name in main.OAUTH_ALLOWLIST_ENVS.values():
+        monkeypatch.delenv(env_name, raising=False)
+    assert main._oauth_allowed("google", "anyone@example.com")
+    assert not main._oauth_allowed("google", "")
+
+
+def test_env_or_table_entry_is_enough(database, monkeypatch):
+    _set_env(monkeypatch, "google", "env@example.com")
+    db.add_oauth_allowlist_entry("google", "table@example.com")
+    assert main._oauth_allowed("google", "env@example.com")
+    assert main._oauth_allowed("google", "table@example.com")
+    assert not main._oauth_allowed("google", "other@example.com")
+    monkeypatch.delenv(main.OAUTH_ALLOWLIST_ENVS["discord"], raising=False)
+    db.add_oauth_allowlist_entry("discord", "42")
+    assert main._oauth_allowed("discord", "42")
+    assert not main._oauth_allowed("discord", "43")
+    _set_env(monkeypatch, "steam", "7656")
+    assert main._oauth_allowed("steam", "7656")
+    assert not main._oauth_allowed("steam", "7657")
+
+
+def test_lookups_ignore_case(database, monkeypatch):
+    _set_env(monkeypatch, "google", "Env@Example.com")
+    db.add_oauth_allowlist_entry("google", "Table@Example.com")
+    assert main._oauth_allowed("google", "ENV@example.COM")
+    assert main._oauth_allowed("google", "table@example.com")
+
+
+def test_version_bump_invalidates_snapshot(database, monkeypatch):
+    _set_env(monkeypatch, "google", "")
+    db.add_oauth_allowlist_entry("google", "a@example.com")
+    assert not main._oauth_allowed("google", "b@example.com")
+    insert = "INSERT INTO oauth_allowlist (provider, claim, created_at) VALUES ('google', ?, '')"
+    _external(database, insert, ("b@example.com",), bump=False)
+    assert not main._oauth_allowed("google", "b@example.com")
+    _external(database, insert, ("c@example.com",))
+    assert main._oauth_allowed("google", "b@example.com")
+    assert main._oauth_allowed("google", "c@example.com")
+    db.remove_oauth_allowlist_entry("google", "c@example.com")
+    assert not main._oauth_allowed("google", "c@example.com")
@@ -0,0 +1,54 @@
+from datetime import datetime, timedelta, timezone
+
+from app.cron import OccurrenceCache, compile_cron
+
+UTC = timezone.utc
+START = datetime(2026, 1, 1, tzinfo=UTC)
+
+
+def _expected(expression, start, end):
+    return tuple(compile_cron(expression).iter_between(start, end))
+
+
+def test_exact_hit_returns_cached_tuple():
+    cache = OccurrenceCache()
+    first = cache.get("0 * * * *", START, START + timedelta(days=2))
+    assert cache.get("0 * * * *", START, START + timedelta(days=2)) is first
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1
+
+
+def test_partial_hit_splices_head_middle_and_tail():
+    cache = OccurrenceCache()
+    expression = "*/20 8-20 * * *"
+    cache.get(expression, START + timedelta(days=3), START + timedelta(days=10))
+    for start, end in [
+        (START, START + timedelta(days=5)),
+        (START + timedelta(days=8), START + timedelta(days=14)),
+        (START + timedelta(days=1, hours=9, minutes=10), START + timedelta(days=20, hours=8)),
+        (START + timedelta(days=4), START + timedelta(days=6)),
+    ]:
+        assert cache.get(expression, start, end) == _expected(expression, start, end)
+    assert cache.stats()["partial_hits"] == 4
+
+
+def test_disjoint_window_is_a_miss():
+    cache = OccurrenceCache()
+    cache.get("0 0 * * *", START, START + timedelta(days=5))
+    later = START + timedelta(days=30)
+    assert cache.get("0 0 * * *", later, later + timedelta(days=5)) == _expected("0 0 * * *", later, later + timedelta(days=5))
+    assert cache.stats()["misses"] == 2 and cache.stats()["partial_hits"] == 0
+
+
+def test_evicts_least_recently_used():
+    cache = OccurrenceCache(max_entries=2)
+    windows = [(START + timedelta(days=100 * index), START + timedelta(days=100 * index + 1)) for index in range(3)]
+    cache.get("0 0 * * *", *windows[0])
+    cache.get("0 1 * * *", *windows[1])
+    cache.get("0 0 * * *", *windows[0])
+    cache.get("0 2 * * *", *windows[2])
+    stats = cache.stats()
+    assert stats["entries"] == 2 and stats["evictions"] == 1
+    cache.get("0 0 * * *", *windows[0])
+    assert cache.stats()["hits"] == 2
+    cache.clear()
+    assert cache.stats()["entries"] == 0 and cache.stats()["bytes"] == 0
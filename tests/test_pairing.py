@@ -0,0 +1,91 @@
+import random
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List
+
+import pytest
+
+from app.main import PAIR_MAX_DURATION, _pair_schedule_occurrences
+
+
+def _quadratic_pairing(items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    grouped: Dict[Any, Dict[str, List[Dict[str, Any]]]] = {}
+    events: List[Dict[str, Any]] = []
+    for item in items:
+        kind = item.get("kind")
+        if kind in {"start", "stop"}:
+            key = (item.get("source", ""), item["game_name"], item["event_name"])
+            grouped.setdefault(key, {"starts": [], "stops": []})
+            grouped[key]["starts" if kind == "start" else "stops"].append(item)
+            continue
+        events.append(item)
+    for group in grouped.values():
+        starts = sorted(group["starts"], key=lambda value: value["occurrence"])
+        stops = sorted(group["stops"], key=lambda value: value["occurrence"])
+        used_stops = set()
+        for start in starts:
+            chosen = None
+            for idx, stop in enumerate(stops):
+                if idx in used_stops or stop["occurrence"] <= start["occurrence"]:
+                    continue
+                if stop["occurrence"] - start["occurrence"] > PAIR_MAX_DURATION:
+                    continue
+                chosen = idx
+                break
+            if chosen is not None:
+                used_stops.add(chosen)
+            events.append(
+                {
+                    "schedule_id": start["schedule_id"],
+                    "game_name": start["game_name"],
+                    "event_name": start["event_name"],
+                    "occurrence": start["occurrence"],
+                    "stop_occurrence": stops[chosen]["occurrence"] if chosen is not None else None,
+                }
+            )
+        for idx, stop in enumerate(stops):
+            if idx in used_stops:
+                continue
+            events.append(
+                {
+                    "schedule_id": stop["schedule_id"],
+                    "game_name": stop["game_name"],
+                    "event_name": stop["event_name"],
+                    "occurrence": stop["occurrence"],
+                    "stop_occurrence": None,
+                }
+            )
+    return events
+
+
+def _random_items(rng: random.Random) -> List[Dict[str, Any]]:
+    base = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    items = []
+    for _ in range(rng.randint(0, 40)):
+        kind = rng.choice(["start", "stop", "stop", "custom"])
+        items.append(
+            {
+                "schedule_id": f"{kind}-{rng.randint(1, 3)}",
+                "source": rng.choice(["", "other"]),
+                "game_name": rng.choice(["Game", "Other"]),
+                "event_name": "Session",
+                "kind": kind,
+                "occurrence": base + timedelta(hours=rng.randint(0, 24 * 6)),
+            }
+        )
+    return items
+
+
+@pytest.mark.parametrize("seed", range(200))
+def test_matches_quadratic_pairing(seed):
+    items = _random_items(random.Random(seed))
+    assert _pair_schedule_occurrences(items) == _quadratic_pairing(items)
+
+
+def test_stop_beyond_limit_stays_unmatched():
+    start = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    items = [
+        {"schedule_id": "a", "game_name": "G", "event_name": "E", "kind": "start", "occurrence": start},
+        {"schedule_id": "b", "game_name": "G", "event_name": "E", "kind": "stop", "occurrence": start + PAIR_MAX_DURATION + timedelta(minutes=1)},
+    ]
+    events = _pair_schedule_occurrences(items)
+    assert [event["stop_occurrence"] for event in events] == [None, None]
@@ -0,0 +1,96 @@
+import asyncio
+import base64
+import hashlib
+import threading
+
+import pytest
+
+from app import passwords
+
+
+@pytest.fixture(autouse=True)
+def fast_kdf(monkeypatch):
+    monkeypatch.setenv(passwords.PASSWORD_ITERATIONS_ENV, str(passwords.MIN_ITERATIONS))
+    monkeypatch.delenv(passwords.PASSWORD_ALGORITHM_ENV, raising=False)
+
+
+def _legacy_hash(password: str) -> str:
+    salt = b"s" * 16
+    digest = hashlib.pbkdf2_hmac("sha256", password.encode("utf-8"), salt, passwords.LEGACY_ITERATIONS)
+    return base64.b64encode(salt + digest).decode("utf-8")
+
+
+def test_round_trip():
+    encoded = passwords.hash_password("hunter2")
+    algorithm, iterations, salt, digest = encoded.split("$")
+    assert (algorithm, int(iterations)) == ("pbkdf2_sha256", passwords.MIN_ITERATIONS)
+    assert "=" not in salt + digest
+    assert passwords.verify_password("hunter2", encoded)
+    assert not passwords.verify_password("hunter3", encoded)
+    assert not passwords.needs_rehash(encoded)
+
+
+def test_sha512_hashes_verify():
+    encoded = passwords.hash_password("hunter2", algorithm="pbkdf2_sha512")
+    assert passwords.verify_password("hunter2", encoded)
+    assert passwords.needs_rehash(encoded)
+
+
+def test_legacy_hash_verifies_and_needs_rehash():
+    encoded = _legacy_hash("hunter2")
+    assert passwords.verify_password("hunter2", encoded)
+    assert not passwords.verify_password("hunter3", encoded)
+    assert passwords.needs_rehash(encoded)
+
+
+def test_weaker_iterations_need_rehash(monkeypatch):
+    encoded = passwords.hash_password("hunter2")
+    monkeypatch.setenv(passwords.PASSWORD_ITERATIONS_ENV, str(passwords.MIN_ITERATIONS * 2))
+    assert passwords.needs_rehash(encoded)
+
+
+def test_unusable_password_never_verifies():
+    encoded = passwords.make_unusable_password()
+    assert not passwords.is_usable(encoded)
+    assert not passwords.verify_password(encoded, encoded)
+    assert not passwords.verify_password("", encoded)
+    assert not passwords.needs_rehash(encoded)
+    assert not asyncio.run(passwords.verify_password_async(encoded, encoded))
+
+
+@pytest.mark.parametrize(
+    "encoded",
+    [
+        "",
+        "short",
+        "not base64 at all!",
+        "pbkdf2_sha256$abc$c2FsdA$ZGlnZXN0",
+        "pbkdf2_sha256$0$c2FsdA$ZGlnZXN0",
+        "pbkdf2_sha256$-5$c2FsdA$ZGlnZXN0",
+        "pbkdf2_sha256$10000$c2FsdA",
+        "pbkdf2_md5$10000$c2FsdA$ZGlnZXN0",
+        "pbkdf2_sha256$10000$***$ZGlnZXN0",
+    ],
+)
+def test_malformed_hashes_return_false(encoded):
+    assert passwords.verify_password("hunter2", encoded) is False
+
+
+def test_busy_limit_rejects_extra_work(monkeypatch):
+    monkeypatch.setenv(passwords.PASSWORD_MAX_PENDING_ENV, "2")
+    release = threading.Event()
+
+    async def scenario():
+        blocked = [asyncio.ensure_future(passwords._run("hash", release.wait, 5)) for _ in range(2)]
+        await asyncio.sleep(0.05)
+        with pytest.raises(passwords.PasswordHasherBusy):
+            await passwords.hash_password_async("hunter2")
+        release.set()
+        await asyncio.gather(*blocked)
+        assert passwords.verify_password("hunter2", await passwords.hash_password_async("hunter2"))
+
+    try:
+        asyncio.run(scenario())
+    finally:
+        release.set()
+        passwords.shutdown_executor()
@@ -0,0 +1,79 @@
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from app import db, main, upstream
+from app.breaker import BreakerRegistry
+
+CONFIG = {
+    "enabled": True,
+    "base_url": "https://panel.test",
+    "api_key": "key",
+    "server_id": "a",
+    "server_name": "Main",
+    "servers": "b | Other | https://other.test | other-key",
+}
+
+
+def _schedule(schedule_id, name, updated_at="1"):
+    return {
+        "attributes": {
+            "id": schedule_id,
+            "name": name,
+            "cron": {"minute": "0", "hour": "19", "day_of_month": "*", "month": "*", "day_of_week": "*"},
+            "updated_at": updated_at,
+        }
+    }
+
+
+@pytest.fixture
+def panels(database, monkeypatch):
+    state = {
+        "panel.test": (200, [_schedule(1, "Game: Raid")]),
+        "other.test": (200, [_schedule(7, "Other: Raid")]),
+    }
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        status, schedules = state[request.url.host]
+        return httpx.Response(status, content=json.dumps({"data": schedules}).encode())
+
+    monkeypatch.setattr(upstream, "build_client", lambda: httpx.AsyncClient(transport=httpx.MockTransport(handler)))
+    monkeypatch.setattr(main, "_upstream_breakers", BreakerRegistry())
+    return state
+
+
+def _rows(schedule_id):
+    return [row for row in db.list_calendar_events() if row["schedule_id"] == schedule_id]
+
+
+def test_failed_server_keeps_rows_while_others_update(panels):
+    first = asyncio.run(main._sync_pelican_events(CONFIG))
+    assert first["ok"] and first["failed_sources"] == []
+    other_ids = {row["id"] for row in _rows("other.test/b#7")}
+    assert other_ids and _rows("1")
+
+    panels["panel.test"] = (200, [_schedule(1, "Game: Siege", updated_at="2")])
+    panels["other.test"] = (500, [])
+    second = asyncio.run(main._sync_pelican_events(CONFIG))
+
+    assert second["ok"]
+    assert second["failed_sources"] == ["other.test/b"]
+    assert [(status["server_id"], status["ok"], status["reason"]) for status in second["servers"]] == [
+        ("a", True, None),
+        ("b", False, "http_500"),
+    ]
+    assert second["changes"]["preserved_schedules"] == 1
+    assert {row["id"] for row in _rows("other.test/b#7")} == other_ids
+    assert "other.test/b#7" in db.get_schedule_fingerprints()
+    assert {row["event_name"] for row in _rows("1")} == {"Siege"}
+
+
+def test_all_servers_failing_reports_failure(panels):
+    asyncio.run(main._sync_pelican_events(CONFIG))
+    panels["panel.test"] = (500, [])
+    panels["other.test"] = (500, [])
+    result = asyncio.run(main._sync_pelican_events(CONFIG))
+    assert not result["ok"] and result["reason"] == "http_500"
+    assert _rows("1") and _rows("other.test/b#7")
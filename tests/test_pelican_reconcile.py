@@ -0,0 +1,72 @@
+from app import db, main
+
+DAILY = {"minute": "0", "hour": "19", "day_of_month": "*", "month": "*", "day_of_week": "*"}
+EXTRA = "panel.example.com/b"
+
+
+def _schedule(schedule_id, name="Game: Raid", source="", updated_at="1"):
+    return {"id": schedule_id, "name": name, "cron": DAILY, "source": source, "updated_at": updated_at}
+
+
+def _store(schedules, force=False, failed=()):
+    return main._store_pelican_events({"server_name": "Server"}, schedules, force, failed)
+
+
+def _rows(include_deleted=False):
+    window_start, window_end = main._calendar_window()
+    return db.list_calendar_events(
+        main._to_utc_iso(window_start), main._to_utc_iso(window_end), include_deleted=include_deleted
+    )
+
+
+def _ids(rows):
+    return {row["schedule_id"] for row in rows}
+
+
+def test_unchanged_fingerprint_skips_write(database):
+    first = _store([_schedule("1")])
+    assert first["inserted"] == len(_rows()) > 0
+    version = db.get_cache_versions(["calendar_events"])["calendar_events"]
+    second = _store([_schedule("1")])
+    assert second["skipped_schedules"] == 1 and second["changed_schedules"] == 0
+    assert second["inserted"] == second["updated"] == second["deleted"] == 0
+    assert db.get_cache_versions(["calendar_events"])["calendar_events"] == version
+
+
+def test_changed_schedule_updates_rows_in_place(database):
+    _store([_schedule("1")])
+    ids = {row["id"] for row in _rows()}
+    counts = _store([_schedule("1", name="Game: Siege", updated_at="2")])
+    assert counts["updated"] == len(ids)
+    assert {row["id"] for row in _rows()} == ids
+    assert {row["event_name"] for row in _rows()} == {"Siege"}
+
+
+def test_user_deleted_rows_stay_deleted_until_forced(database):
+    _store([_schedule("1")])
+    victim = _rows()[0]
+    db.mark_calendar_event_deleted(victim["id"])
+    _store([_schedule("1", updated_at="2")])
+    assert victim["id"] not in {row["id"] for row in _rows()}
+    assert victim["id"] in {row["id"] for row in _rows(include_deleted=True)}
+    _store([_schedule("1", updated_at="2")], force=True)
+    assert victim["start_utc"] in {row["start_utc"] for row in _rows()}
+
+
+def test_removed_schedule_leaves_the_calendar(database):
+    _store([_schedule("1"), _schedule("2", name="Game: Siege")])
+    counts = _store([_schedule("1")])
+    assert counts["deleted"] > 0
+    assert _ids(_rows()) == {"1"}
+    assert set(db.get_schedule_fingerprints()) == {"1"}
+
+
+def test_failed_source_rows_are_preserved(database):
+    extra_id = f"{EXTRA}#7"
+    _store([_schedule("1"), _schedule(extra_id, name="Other: Raid", source=EXTRA)])
+    extra_rows = {row["id"] for row in _rows() if row["schedule_id"] == extra_id}
+    counts = _store([_schedule("1", name="Game: Siege", updated_at="2")], failed=[EXTRA])
+    assert counts["preserved_schedules"] == 1
+    assert {row["id"] for row in _rows() if row["schedule_id"] == extra_id} == extra_rows
+    assert extra_id in db.get_schedule_fingerprints()
+    assert {row["event_name"] for row in _rows() if row["schedule_id"] == "1"} == {"Siege"}
@@ -0,0 +1,59 @@
+import pytest
+
+from app.prometheus import KumaMetricsParser, parse_kuma_metrics
+
+PAYLOAD = (
+    b"# HELP monitor_status Monitor Status (1 = UP, 0= DOWN, 2= PENDING, 3= MAINTENANCE)\n"
+    b"# TYPE monitor_status gauge\n"
+    b'monitor_status{monitor_name="Web, \\"main\\"",monitor_type="http",monitor_url="https://a/?x=1,2"} 1\n'
+    b'monitor_status{monitor_name="DB",monitor_type="port",monitor_hostname="db",monitor_port="5432"} 0 1760000000000\n'
+    b'monitor_response_time{monitor_type="http",monitor_name="Web, \\"main\\""} 42.5 1760000000000\n'
+    b'monitor_response_time{monitor_name="DB"} NaN\n'
+    b'monitor_cert_days_remaining{monitor_name="Web, \\"main\\"",monitor_type="http",monitor_url="https://a/?x=1,2"} +Inf\n'
+    b'monitor_cert_is_valid{monitor_name="Web, \\"main\\"",monitor_type="http",monitor_url="https://a/?x=1,2"} 1\n'
+    b'monitor_status{monitor_name="Path\\\\to\\nthing",monitor_type="dns"} 2'
+)
+
+
+def _by_name(monitors):
+    return {monitor["name"]: monitor for monitor in monitors}
+
+
+def test_parses_escapes_timestamps_and_non_finite_values():
+    monitors = _by_name(parse_kuma_metrics(PAYLOAD))
+    assert set(monitors) == {'Web, "main"', "DB", "Path\\to\nthing"}
+    web = monitors['Web, "main"']
+    assert (web["status"], web["type"], web["response_time_ms"]) == (1, "http", 42.5)
+    assert web["cert_days_remaining"] is None and web["cert_is_valid"] is True
+    db = monitors["DB"]
+    assert (db["status"], db["type"], db["response_time_ms"]) == (0, "port", None)
+    assert monitors["Path\\to\nthing"]["status"] == 2
+
+
+def test_families_merge_by_monitor_name_regardless_of_label_order():
+    monitors = parse_kuma_metrics(
+        b'monitor_response_time{monitor_port="443",monitor_name="Web"} 12\n'
+        b'monitor_status{monitor_type="http",monitor_name="Web",monitor_url="https://a"} 1\n'
+    )
+    assert monitors == [
+        {
+            "name": "Web",
+            "status": 1,
+            "type": "http",
+            "response_time_ms": 12.0,
+            "cert_days_remaining": None,
+            "cert_is_valid": None,
+        }
+    ]
+
+
+@pytest.mark.parametrize("size", [1, 3, 7, 64])
+def test_samples_split_across_chunks(size):
+    chunks = [PAYLOAD[index : index + size] for index in range(0, len(PAYLOAD), size)]
+    assert parse_kuma_metrics(chunks) == parse_kuma_metrics(PAYLOAD)
+
+
+def test_monitors_without_status_are_dropped():
+    parser = KumaMetricsParser()
+    parser.feed(b'monitor_response_time{monitor_name="Orphan"} 5\n')
+    assert parser.close() == []
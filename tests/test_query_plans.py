@@ -0,0 +1,7 @@
+from benchmarks import query_plans
+
+
+def test_hot_calendar_queries_use_indexes(database):
+    results = query_plans.check(500)
+    assert {result["name"] for result in results} == {name for name, _ in query_plans.hot_queries()}
+    assert [result["name"] for result in results if result["scans"]] == []
@@ -0,0 +1,56 @@
+import logging
+from datetime import datetime, timedelta, timezone
+
+from app import main
+
+NOW = datetime(2026, 10, 17, 15, 42, tzinfo=timezone.utc)
+EVERY_FIVE = {"minute": "*/5", "hour": "*", "day_of_month": "*", "month": "*", "day_of_week": "*"}
+HOURLY = {"minute": "0", "hour": "*", "day_of_month": "*", "month": "*", "day_of_week": "*"}
+
+
+def _generate(cron, now=NOW):
+    window_start, window_end = main._calendar_window(now)
+    since = main._occurrence_cap_start(now)
+    return main._generate_schedule_occurrences(
+        cron, window_start, window_end, main.PELICAN_MAX_OCCURRENCES_PER_SCHEDULE, "Busy", since
+    )
+
+
+def test_high_frequency_cron_keeps_upcoming_fires(caplog):
+    with caplog.at_level(logging.WARNING, logger=main.logger.name):
+        occurrences = _generate(EVERY_FIVE)
+    assert len(occurrences) == main.PELICAN_MAX_OCCURRENCES_PER_SCHEDULE
+    assert occurrences[0] == datetime(2026, 10, 17, tzinfo=timezone.utc)
+    assert occurrences[-1] > NOW + timedelta(days=7)
+    assert all(later - earlier == timedelta(minutes=5) for earlier, later in zip(occurrences, occurrences[1:]))
+    assert "keeping 2500 from 2026-10-17T00:00:00Z" in caplog.text
+
+
+def test_cap_near_window_end_keeps_last_fires():
+    window_start, window_end = main._calendar_window(NOW)
+    occurrences = main._generate_schedule_occurrences(
+        EVERY_FIVE, window_start, window_end, 100, "Busy", window_end - timedelta(hours=1)
+    )
+    assert len(occurrences) == 100
+    assert occurrences[-1] == window_end - timedelta(minutes=5)
+
+
+def test_hourly_cron_is_not_capped():
+    window_start, window_end = main._calendar_window(NOW)
+    occurrences = _generate(HOURLY)
+    assert occurrences[0] == window_start
+    assert len(occurrences) == (window_end - window_start) // timedelta(hours=1)
+
+
+def test_capped_fingerprint_moves_daily():
+    window_start, window_end = main._calendar_window(NOW)
+    schedules = [
+        {"id": "busy", "name": "Game - Busy", "cron": EVERY_FIVE},
+        {"id": "hourly", "name": "Game - Hourly", "cron": HOURLY},
+    ]
+    today = main._schedule_fingerprints(schedules, "Server", window_start, window_end, main._occurrence_cap_start(NOW))
+    tomorrow = main._schedule_fingerprints(
+        schedules, "Server", window_start, window_end, main._occurrence_cap_start(NOW + timedelta(days=1))
+    )
+    assert today["busy"] != tomorrow["busy"]
+    assert today["hourly"] == tomorrow["hourly"]
@@ -0,0 +1,98 @@
+import json
+import sqlite3
+import threading
+
+from app import db
+
+
+def _external_write(path, key, value, bump=True):
+    conn = sqlite3.connect(path, isolation_level=None)
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        conn.execute(
+            "INSERT INTO settings (key, value, updated_at) VALUES (?, ?, '') "
+            "ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+            (key, json.dumps(value)),
+        )
+        if bump:
+            conn.execute(
+                "INSERT INTO cache_versions (name, version) VALUES ('settings', 1) "
+                "ON CONFLICT(name) DO UPDATE SET version = version + 1"
+            )
+        conn.execute("COMMIT")
+    finally:
+        conn.close()
+
+
+def test_warm_reads_do_not_reload(database):
+    db.set_setting("theme", {"mode": "dark"})
+    assert db.get_setting("theme") == {"mode": "dark"}
+    loads = db._settings.loads
+    for _ in range(5):
+        db.get_all_settings()
+    assert db._settings.loads == loads
+
+
+def test_local_write_invalidates(database):
+    db.set_setting("theme", {"mode": "dark"})
+    db.get_setting("theme")
+    db.set_setting("theme", {"mode": "light"})
+    assert db.get_setting("theme") == {"mode": "light"}
+    assert db.get_settings(["theme", "missing"]) == {"theme": {"mode": "light"}, "missing": None}
+
+
+def test_returned_values_are_copies(database):
+    db.set_setting("theme", {"mode": "dark"})
+    db.get_setting("theme")["mode"] = "light"
+    db.get_all_settings()["theme"]["mode"] = "light"
+    assert db.get_setting("theme") == {"mode": "dark"}
+
+
+def test_external_write_reloads_only_when_version_moves(database):
+    db.set_setting("theme", {"mode": "dark"})
+    db.get_setting("theme")
+    loads = db._settings.loads
+    _external_write(database, "theme", {"mode": "stale"}, bump=False)
+    assert db.get_setting("theme") == {"mode": "dark"}
+    assert db._settings.loads == loads
+    _external_write(database, "theme", {"mode": "light"})
+    assert db.get_setting("theme") == {"mode": "light"}
+    assert db._settings.loads == loads + 1
+
+
+def test_merged_defaults_are_cached_until_settings_change(database, monkeypatch):
+    calls = []
+    merge = db._merge_setting_defaults
+
+    def counting(settings, defaults):
+        calls.append(1)
+        return merge(settings, defaults)
+
+    monkeypatch.setattr(db, "_merge_setting_defaults", counting)
+    defaults = {"theme": {"mode": "light", "accent": "blue"}, "title": "Atlas"}
+    db.set_setting("theme", {"mode": "dark"})
+    first = db.get_all_settings_with_defaults(defaults)
+    assert first["theme"] == {"mode": "dark", "accent": "blue"} and first["title"] == "Atlas"
+    first["theme"]["mode"] = "changed"
+    assert db.get_all_settings_with_defaults(defaults)["theme"]["mode"] == "dark"
+    assert len(calls) == 1
+    db.set_setting("theme", {"mode": "light"})
+    assert db.get_all_settings_with_defaults(defaults)["theme"] == {"mode": "light", "accent": "blue"}
+    assert len(calls) == 2
+
+
+def test_counters_are_exact_across_threads(database):
+    db.get_all_settings()
+    before = db._settings.stats()
+
+    def read():
+        for _ in range(500):
+            db.get_all_settings()
+
+    threads = [threading.Thread(target=read) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    after = db._settings.stats()
+    assert (after["hits"] + after["loads"]) - (before["hits"] + before["loads"]) == 4000
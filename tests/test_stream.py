@@ -0,0 +1,77 @@
+import asyncio
+
+import pytest
+
+from app.stream import StreamBroker
+
+
+async def _connected() -> bool:
+    return False
+
+
+def test_subscribes_only_while_streaming():
+    async def scenario():
+        broker = StreamBroker(heartbeat_sec=0.01)
+        events = broker.events(_connected)
+        assert broker.subscribers == 0
+        assert (await events.__anext__()).startswith("retry:")
+        assert broker.subscribers == 1
+        broker.publish("kuma", {"up": 1})
+        assert "event: kuma" in await events.__anext__()
+        await events.aclose()
+        assert broker.subscribers == 0
+
+    asyncio.run(scenario())
+
+
+def test_unstarted_stream_never_subscribes():
+    async def scenario():
+        broker = StreamBroker()
+        broker.events(_connected)
+        assert broker.subscribers == 0
+
+    asyncio.run(scenario())
+
+
+def test_overflow_resends_snapshots():
+    async def scenario():
+        broker = StreamBroker(queue_size=2)
+        broker.set_snapshot("kuma", {"up": 1})
+        events = broker.events(_connected)
+        await events.__anext__()
+        assert '"full":true' in await events.__anext__()
+        for index in range(3):
+            broker.publish("kuma", {"up": index})
+        assert broker.dropped == 1
+        assert '"full":true' in await events.__anext__()
+        await events.aclose()
+
+    asyncio.run(scenario())
+
+
+def test_close_ends_active_stream():
+    async def scenario():
+        broker = StreamBroker(heartbeat_sec=30)
+        events = broker.events(_connected)
+        await events.__anext__()
+        pending = asyncio.ensure_future(events.__anext__())
+        await asyncio.sleep(0)
+        broker.close()
+        with pytest.raises(StopAsyncIteration):
+            await asyncio.wait_for(pending, timeout=1)
+        assert broker.subscribers == 0
+
+    asyncio.run(scenario())
+
+
+def test_close_ends_stream_with_full_queue():
+    async def scenario():
+        broker = StreamBroker(queue_size=2, heartbeat_sec=30)
+        events = broker.events(_connected)
+        await events.__anext__()
+        broker.publish("kuma", {"up": 1})
+        broker.publish("kuma", {"up": 2})
+        broker.close()
+        assert [message async for message in events] == []
+
+    asyncio.run(scenario())